@@ -59,9 +59,17 @@ from cms.toolbar_pool import toolbar_pool
 from cms.utils import permissions, get_language_from_request, copy_plugins
 from cms.utils import page_permissions
 from cms.utils.i18n import get_language_list, get_language_tuple, get_language_object, force_language
-from cms.utils.admin import jsonify_request, render_admin_rows
+from cms.utils.admin import (
+    PAGE_TREE_MAX_PAGE_SIZE,
+    PAGE_TREE_PAGE_SIZE,
+    get_admin_tree_rows,
+    jsonify_request,
+    render_admin_rows,
+)
 from cms.utils.conf import get_cms_setting
+from cms.utils.deletion import delete_page_translation
 from cms.utils.helpers import current_site
+from cms.utils.page_search import get_search_page_ids
 from cms.utils.urlutils import add_url_parameters, admin_reverse
 
 require_POST = method_decorator(require_POST)
@@ -110,6 +118,7 @@ class PageAdmin(PlaceholderAdminMixin, admin.ModelAdmin):
             pat(r'^published-pages/$', self.get_published_pagelist),
             url(r'^resolve/$', self.resolve, name="cms_page_resolve"),
             url(r'^get-tree/$', self.get_tree, name="get_tree"),
+            url(r'^get-tree-data/$', self.admin_site.admin_view(self.get_tree_data), name="get_tree_data"),
         ]
 
         if plugin_pool.get_all_plugins():
@@ -628,6 +637,21 @@ class PageAdmin(PlaceholderAdminMixin, admin.ModelAdmin):
     def get_changelist(self, request, **kwargs):
         return CMSChangeList
 
+    def get_search_results(self, request, queryset, search_term):
+        # Titles, slugs and paths are matched through the search index
+        # instead of joining the titles, so no distinct is needed.
+        search_term = search_term.strip()
+
+        if not search_term:
+            return queryset, False
+
+        query = Q(pk__in=get_search_page_ids(search_term, content=False))
+        query |= Q(reverse_id__icontains=search_term)
+
+        if search_term.isdigit():
+            query |= Q(pk=search_term)
+        return queryset.filter(query), False
+
     def changelist_view(self, request, extra_context=None):
         site = current_site(request)
 
@@ -830,7 +854,7 @@ class PageAdmin(PlaceholderAdminMixin, admin.ModelAdmin):
                 placeholder.get_plugins(language=source_language).order_by('path'))
             if not placeholder.has_add_plugins_permission(request.user, plugins):
                 return HttpResponseForbidden(force_text(_('You do not have permission to copy these plugins.')))
-            copy_plugins.copy_plugins_to(plugins, placeholder, target_language)
+            copy_plugins.bulk_copy_plugins(plugins, placeholder, target_language)
         return HttpResponse("ok")
 
     @require_POST
@@ -1175,9 +1199,7 @@ class PageAdmin(PlaceholderAdminMixin, admin.ModelAdmin):
             self.log_change(request, titleobj, message)
             messages.success(request, message)
 
-            titleobj.delete()
-            for p in saved_plugins:
-                p.delete()
+            delete_page_translation(obj, language)
 
             public = obj.publisher_public
 
@@ -1279,14 +1301,75 @@ class PageAdmin(PlaceholderAdminMixin, admin.ModelAdmin):
         else:
             pages = Page.get_root_nodes().filter(site=site, publisher_is_draft=True)
 
-        pages = (
-            pages
-            .select_related('parent', 'publisher_public', 'site')
-            .prefetch_related('children')
-        )
+        pages = pages.select_related('parent', 'publisher_public', 'site')
         response = render_admin_rows(request, pages, site=site, filtered=False)
         return HttpResponse(response)
 
+    def get_tree_data(self, request):
+        """
+        Get the data of the children of given page or if no page_id is
+        provided, of the root nodes, as json.
+
+        Rows are ordered by path and returned in batches, the «next» value
+        of the response is passed back as the «after» parameter
+        to get the following rows.
+        """
+        page_id = request.GET.get('pageId', None)
+        site_id = request.GET.get('site', None)
+        after = request.GET.get('after', None)
+
+        try:
+            site_id = int(site_id)
+            site = Site.objects.get(id=site_id)
+        except (TypeError, ValueError, MultipleObjectsReturned,
+                ObjectDoesNotExist):
+            site = get_current_site(request)
+
+        try:
+            limit = int(request.GET.get('limit', PAGE_TREE_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return HttpResponseBadRequest(force_text(_('Invalid limit.')))
+
+        limit = max(1, min(limit, PAGE_TREE_MAX_PAGE_SIZE))
+
+        if page_id:
+            try:
+                page_id = int(page_id)
+            except (TypeError, ValueError):
+                return HttpResponseBadRequest(force_text(_('Invalid page id.')))
+
+            page = get_object_or_404(self.model, pk=page_id)
+            site = page.site
+            pages = page.get_children()
+        else:
+            pages = Page.get_root_nodes().filter(site=site, publisher_is_draft=True)
+
+        if not page_permissions.user_can_change_at_least_one_page(request.user, site=site):
+            return HttpResponseForbidden(force_text(_("You do not have permission to change pages")))
+
+        if after:
+            pages = pages.filter(path__gt=after)
+
+        pages = list(
+            pages
+            .select_related('publisher_public', 'site')
+            .order_by('path')[:limit + 1]
+        )
+
+        if len(pages) > limit:
+            pages = pages[:limit]
+            next_path = pages[-1].path
+        else:
+            next_path = None
+
+        rows = get_admin_tree_rows(
+            request.user,
+            pages=pages,
+            languages=get_language_list(site.pk),
+        )
+        data = {'rows': rows, 'next': next_path}
+        return HttpResponse(json.dumps(data), content_type='application/json')
+
     def add_page_type(self, request):
         site = Site.objects.get_current()
         language = request.GET.get('language') or get_language()
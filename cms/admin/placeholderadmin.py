@@ -45,6 +45,7 @@ from cms.utils.i18n import get_language_list, get_language_code, force_language
 from cms.utils.plugins import (
     requires_reload,
     has_reached_plugin_limit,
+    move_plugin_tree,
     reorder_plugins
 )
 from cms.utils.urlutils import admin_reverse
@@ -508,7 +509,7 @@ class PlaceholderAdminMixin(object):
         # Empty the clipboard
         target_placeholder.clear()
 
-        copy_plugins.copy_plugins_to(
+        copy_plugins.bulk_copy_plugins(
             old_plugins,
             to_placeholder=target_placeholder,
             to_language=target_language,
@@ -541,7 +542,7 @@ class PlaceholderAdminMixin(object):
             placeholder=target_placeholder,
         )
 
-        copy_plugins.copy_plugins_to(
+        copy_plugins.bulk_copy_plugins(
             old_plugins,
             to_placeholder=reference.placeholder_ref,
             to_language=target_language,
@@ -585,7 +586,7 @@ class PlaceholderAdminMixin(object):
             target_order=target_tree_order,
         )
 
-        copied_plugins = copy_plugins.copy_plugins_to(
+        copied_plugins = copy_plugins.bulk_copy_plugins(
             old_plugins,
             to_placeholder=target_placeholder,
             to_language=target_language,
@@ -895,7 +896,7 @@ class PlaceholderAdminMixin(object):
             target_order=target_tree_order,
         )
 
-        new_plugins = copy_plugins.copy_plugins_to(
+        new_plugins = copy_plugins.bulk_copy_plugins(
             plugins,
             to_placeholder=target_placeholder,
             to_language=target_language,
@@ -949,7 +950,7 @@ class PlaceholderAdminMixin(object):
             target_order=target_tree_order,
         )
 
-        new_plugins = copy_plugins.copy_plugins_to(
+        new_plugins = copy_plugins.bulk_copy_plugins(
             plugins,
             to_placeholder=target_placeholder,
             to_language=target_language,
@@ -992,11 +993,6 @@ class PlaceholderAdminMixin(object):
             message = force_text(_("You have no permission to move this plugin"))
             raise PermissionDenied(message)
 
-        plugin_data = {
-            'language': target_language,
-            'placeholder': target_placeholder,
-        }
-
         source_language = plugin.language
         source_placeholder = plugin.placeholder
         source_tree_order = source_placeholder.get_plugin_tree_order(
@@ -1031,27 +1027,19 @@ class PlaceholderAdminMixin(object):
             target_order=target_tree_order,
         )
 
-        if target_parent and plugin.parent != target_parent:
-            # Plugin is being moved to another tree (under another parent)
-            updated_plugin = plugin.update(refresh=True, parent=target_parent, **plugin_data)
-            updated_plugin = updated_plugin.move(target_parent, pos='last-child')
-        elif target_parent:
-            # Plugin is being moved within the same tree (different position, same parent)
-            updated_plugin = plugin.update(refresh=True, **plugin_data)
-        else:
-            # Plugin is being moved to the root (no parent)
-            target = CMSPlugin.get_last_root_node()
-            updated_plugin = plugin.update(refresh=True, parent=None, **plugin_data)
-            updated_plugin = updated_plugin.move(target, pos='right')
-
-        # Update all children to match the parent's
-        # language and placeholder
-        updated_plugin.get_descendants().update(**plugin_data)
+        # Moves the plugin and all its children to the target
+        # placeholder, language and parent
+        move_plugin_tree(
+            plugin,
+            placeholder=target_placeholder,
+            language=target_language,
+            parent=target_parent,
+        )
 
         # Avoid query by removing the plugin being moved
         # from the source order
         new_source_order = list(source_tree_order)
-        new_source_order.remove(updated_plugin.pk)
+        new_source_order.remove(plugin.pk)
 
         # Reorder all plugins in the target placeholder according to the
         # passed order
@@ -1063,8 +1051,8 @@ class PlaceholderAdminMixin(object):
             order=new_target_order,
         )
 
-        # Refresh plugin to get new tree and position values
-        updated_plugin.refresh_from_db()
+        # Fetch the plugin to get new tree and position values
+        updated_plugin = plugin.reload()
 
         self._send_post_placeholder_operation(
             request,
@@ -1087,11 +1075,6 @@ class PlaceholderAdminMixin(object):
             message = force_text(_("You have no permission to cut this plugin"))
             raise PermissionDenied(message)
 
-        plugin_data = {
-            'language': target_language,
-            'placeholder': target_placeholder,
-        }
-
         source_language = plugin.language
         source_placeholder = plugin.placeholder
         source_tree_order = source_placeholder.get_plugin_tree_order(
@@ -1114,13 +1097,11 @@ class PlaceholderAdminMixin(object):
         # Empty the clipboard
         target_placeholder.clear()
 
-        target = CMSPlugin.get_last_root_node()
-        updated_plugin = plugin.update(refresh=True, parent=None, **plugin_data)
-        updated_plugin = updated_plugin.move(target, pos='right')
+        # Moves the plugin and all its children to the clipboard
+        move_plugin_tree(plugin, placeholder=target_placeholder, language=target_language)
+        reorder_plugins(target_placeholder, parent_id=None, language=target_language, order=[plugin.pk])
 
-        # Update all children to match the parent's
-        # language and placeholder (clipboard)
-        updated_plugin.get_descendants().update(**plugin_data)
+        updated_plugin = plugin.reload()
 
         # Avoid query by removing the plugin being moved
         # from the source order
@@ -547,7 +547,7 @@ def copy_plugins_to_language(page, source_language, target_language,
         if not only_empty or not placeholder.get_plugins(language=target_language).exists():
             plugins = list(
                 placeholder.get_plugins(language=source_language).order_by('path'))
-            copied_plugins = copy_plugins.copy_plugins_to(plugins, placeholder, target_language)
+            copied_plugins = copy_plugins.bulk_copy_plugins(plugins, placeholder, target_language)
             copied += len(copied_plugins)
     return copied
 
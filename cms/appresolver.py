@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from collections import OrderedDict
 from importlib import import_module
+import sys
 
 from django.conf import settings
 from django.contrib.sites.models import Site
@@ -12,16 +13,60 @@ from django.utils import six
 from django.utils.translation import get_language, override
 
 from cms.apphook_pool import apphook_pool
+from cms.cache.routing import get_routing_version
 from cms.models.pagemodel import Page
+from cms.utils import get_site_id
 from cms.utils.compat import DJANGO_1_8, DJANGO_1_9
 from cms.utils.i18n import get_language_list
 
 APP_RESOLVERS = []
 
+# language -> {title path: [AppRegexURLResolver, ...]}
+APP_RESOLVERS_BY_PATH = {}
+
+# site_id -> (routing version, database alias, field names, {page_id: field values})
+_app_pages = {}
+
 
 def clear_app_resolvers():
-    global APP_RESOLVERS
+    global APP_RESOLVERS, APP_RESOLVERS_BY_PATH
     APP_RESOLVERS = []
+    APP_RESOLVERS_BY_PATH = {}
+    _app_pages.clear()
+
+
+def _get_path_prefixes(path):
+    """
+    Returns all the paths an apphook could be mounted on to handle «path»,
+    from the longest to the shortest one.
+    """
+    bits = path.split('/')
+    return ['/'.join(bits[:index]) for index in range(len(bits), -1, -1)]
+
+
+def _get_app_page(page_id):
+    """
+    Returns a new instance of the public page with the given «page_id»
+    out of the current site's pages with an apphook. These are all fetched
+    with a single query and kept in memory until a page of the site changes.
+    """
+    site_id = get_site_id(None)
+    version = get_routing_version(site_id)
+    cached = _app_pages.get(site_id)
+
+    if not cached or cached[0] != version:
+        fields = [field.attname for field in Page._meta.concrete_fields]
+        page_ids = [resolver.page_id for resolver in APP_RESOLVERS]
+        pages = Page.objects.public().filter(pk__in=page_ids, site=site_id)
+        values = dict((page[0], page) for page in pages.values_list(*fields))
+        cached = (version, pages.db, fields, values)
+        _app_pages[site_id] = cached
+
+    version, db, fields, values = cached
+
+    if page_id not in values:
+        raise Page.DoesNotExist
+    return Page.from_db(db, fields, values[page_id])
 
 
 def applications_page_check(request, current_page=None, path=None):
@@ -38,11 +83,16 @@ def applications_page_check(request, current_page=None, path=None):
     for lang in get_language_list():
         if path.startswith(lang + "/"):
             path = path[len(lang + "/"):]
-    for resolver in APP_RESOLVERS:
+    # Only the resolvers mounted on the path of the request, or on
+    # one of its parents, can resolve it. The deepest ones go first.
+    resolvers_by_path = APP_RESOLVERS_BY_PATH.get(get_language(), {})
+    resolvers = [resolver for prefix in _get_path_prefixes(path)
+                 for resolver in resolvers_by_path.get(prefix, [])]
+    for resolver in resolvers:
         try:
             page_id = resolver.resolve_page_id(path)
             # yes, it is application page
-            page = Page.objects.public().get(id=page_id)
+            page = _get_app_page(page_id)
             # If current page was matched, then we have some override for
             # content from cms, but keep current page. Otherwise return page
             # to which was application assigned.
@@ -58,7 +108,9 @@ def applications_page_check(request, current_page=None, path=None):
 class AppRegexURLResolver(RegexURLResolver):
     def __init__(self, *args, **kwargs):
         self.page_id = None
+        self.page_path = ''
         self.url_patterns_dict = {}
+        self.url_paths_dict = {}
         super(AppRegexURLResolver, self).__init__(*args, **kwargs)
 
     @property
@@ -212,13 +264,16 @@ def _get_app_patterns():
     If the app is still configured, but is no longer installed/available, then
     this method returns a degenerate patterns object: patterns('')
     """
+    return _get_app_resolvers(_get_hooked_titles())
+
+
+def _get_hooked_titles():
     from cms.models import Title
 
     try:
         current_site = Site.objects.get_current()
     except Site.DoesNotExist:
         current_site = None
-    included = []
 
     # we don't have a request here so get_page_queryset() can't be used,
     # so use public() queryset.
@@ -226,12 +281,22 @@ def _get_app_patterns():
 
     title_qs = Title.objects.public().filter(page__site=current_site)
 
-    hooked_applications = OrderedDict()
-
-    # Loop over all titles with an application hooked to them
+    # All titles with an application hooked to them
     titles = (title_qs.exclude(page__application_urls=None)
                       .exclude(page__application_urls='')
                       .order_by('-page__path').select_related())
+    return titles
+
+
+def _get_app_resolvers(titles):
+    """
+    Builds (and registers) one resolver for each page of the
+    given apphooked «titles».
+    """
+    included = []
+    hooked_applications = OrderedDict()
+
+    # Loop over all titles with an application hooked to them
     # TODO: Need to be fixed for django-treebeard when forward ported to 3.1
     for title in titles:
         path = title.path
@@ -250,22 +315,62 @@ def _get_app_patterns():
         app_ns = app.app_name, title.page.application_namespace
         with override(title.language):
             hooked_applications[title.page_id][title.language] = (
-                app_ns, get_patterns_for_title(path, title), app)
+                app_ns, get_patterns_for_title(path, title), app, title)
         included.append(mix_id)
         # Build the app patterns to be included in the cms urlconfs
     app_patterns = []
     for page_id in hooked_applications.keys():
         resolver = None
         for lang in hooked_applications[page_id].keys():
-            (app_ns, inst_ns), current_patterns, app = hooked_applications[page_id][lang]  # nopyflakes
+            (app_ns, inst_ns), current_patterns, app, title = hooked_applications[page_id][lang]  # nopyflakes
             if not resolver:
                 resolver = AppRegexURLResolver(
                     r'', 'app_resolver', app_name=app_ns, namespace=inst_ns)
                 resolver.page_id = page_id
+                resolver.page_path = title.page.path
             if app.permissions:
                 _set_permissions(current_patterns, app.exclude_permissions)
 
             resolver.url_patterns_dict[lang] = current_patterns
+            resolver.url_paths_dict[lang] = title.path
+            APP_RESOLVERS_BY_PATH.setdefault(lang, {}).setdefault(title.path, []).append(resolver)
         app_patterns.append(resolver)
         APP_RESOLVERS.append(resolver)
     return app_patterns
+
+
+def update_app_patterns(page_ids):
+    """
+    Rebuilds, in place, the resolvers of the pages with the given ids in the
+    cms urlconf, leaving the resolvers of all other pages untouched.
+
+    Returns the updated url patterns, or None if the cms urlconf
+    is not loaded.
+    """
+    cms_urls = sys.modules.get('cms.urls')
+
+    if cms_urls is None:
+        return None
+
+    page_ids = set(page_ids)
+
+    for resolver in APP_RESOLVERS:
+        if resolver.page_id in page_ids:
+            for lang, path in resolver.url_paths_dict.items():
+                APP_RESOLVERS_BY_PATH[lang][path].remove(resolver)
+
+    APP_RESOLVERS[:] = [resolver for resolver in APP_RESOLVERS
+                        if resolver.page_id not in page_ids]
+    _app_pages.clear()
+
+    titles = _get_hooked_titles().filter(page__in=page_ids)
+    urlpatterns = cms_urls.urlpatterns
+    app_patterns = [pattern for pattern in urlpatterns
+                    if isinstance(pattern, AppRegexURLResolver)
+                    and pattern.page_id not in page_ids]
+    app_patterns.extend(_get_app_resolvers(titles))
+    app_patterns.sort(key=lambda resolver: resolver.page_path, reverse=True)
+    other_patterns = [pattern for pattern in urlpatterns
+                      if not isinstance(pattern, AppRegexURLResolver)]
+    urlpatterns[:] = app_patterns + other_patterns
+    return urlpatterns
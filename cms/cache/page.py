@@ -127,3 +127,17 @@ def get_page_url_cache(page_lookup, lang, site_id):
     from django.core.cache import cache
     return cache.get(_page_url_key(page_lookup, lang, site_id),
                      version=_get_cache_version())
+
+
+def get_page_urls_cache(page_lookups, lang, site_id):
+    """
+    Returns a dictionary mapping each one of «page_lookups» with a cached url
+    to that url, fetching all of them from the cache at once.
+    """
+    from django.core.cache import cache
+    keys = dict((_page_url_key(page_lookup, lang, site_id), page_lookup)
+                for page_lookup in page_lookups)
+    if not keys:
+        return {}
+    cached = cache.get_many(list(keys), version=_get_cache_version())
+    return dict((keys[key], url) for key, url in cached.items() if url is not None)
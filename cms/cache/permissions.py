@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import time
+
 from django.contrib.auth import get_user_model
 
 from cms.utils import get_cms_setting
@@ -21,6 +23,25 @@ def get_cache_permission_version_key():
     return "%s:permission:version" % (get_cms_setting('CACHE_PREFIX'),)
 
 
+def _get_user_version_key(username):
+    return "%s:permission:version:user:%s" % (
+        get_cms_setting('CACHE_PREFIX'), username)
+
+
+def _get_new_version():
+    return int(time.time() * 1000000)
+
+
+def _bump_version(key):
+    from django.core.cache import cache
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version is not set (or has been evicted),
+        # start over from a value that was never used before.
+        cache.set(key, _get_new_version(), None)
+
+
 def get_cache_permission_version():
     from django.core.cache import cache
     try:
@@ -30,37 +51,81 @@ def get_cache_permission_version():
     return int(version)
 
 
+def _get_cache_version(user):
+    """
+    Returns the version of the permissions cached for «user»,
+    made of the global permission version and the user version.
+    """
+    from django.core.cache import cache
+
+    global_key = get_cache_permission_version_key()
+    user_key = _get_user_version_key(getattr(user, get_user_model().USERNAME_FIELD))
+    versions = cache.get_many([global_key, user_key])
+
+    try:
+        global_version = int(versions[global_key])
+    except Exception:
+        global_version = 1
+
+    if not versions.get(user_key):
+        cache.add(user_key, _get_new_version(), None)
+        versions[user_key] = cache.get(user_key)
+    return '%s.%s' % (global_version, versions[user_key])
+
+
 def get_permission_cache(user, key):
     """
     Helper for reading values from cache
     """
     from django.core.cache import cache
-    return cache.get(get_cache_key(user, key), version=get_cache_permission_version())
+    return cache.get(get_cache_key(user, key), version=_get_cache_version(user))
 
 
 def set_permission_cache(user, key, value):
     """
-    Helper method for storing values in cache. Stores used keys so
-    all of them can be cleaned when clean_permission_cache gets called.
+    Helper method for storing values in cache. The value is versioned
+    per user, group changes bump the version of each member.
     """
     from django.core.cache import cache
-    # store this key, so we can clean it when required
-    cache_key = get_cache_key(user, key)
-    cache.set(cache_key, value,
+
+    cache.set(get_cache_key(user, key), value,
               get_cms_setting('CACHE_DURATIONS')['permissions'],
-              version=get_cache_permission_version())
+              version=_get_cache_version(user))
 
 
 def clear_user_permission_cache(user):
     """
     Cleans permission cache for given user.
     """
+    _bump_version(_get_user_version_key(getattr(user, get_user_model().USERNAME_FIELD)))
+
+
+def clear_users_permission_cache(users):
+    """
+    Cleans permission cache for the users of the given queryset.
+    """
     from django.core.cache import cache
-    for key in PERMISSION_KEYS:
-        cache.delete(get_cache_key(user, key), version=get_cache_permission_version())
+
+    usernames = users.values_list(get_user_model().USERNAME_FIELD, flat=True)
+    # A single round trip for all the users, even for large groups.
+    # The new version is above any version the users had so far.
+    version = _get_new_version()
+    cache.set_many(dict((_get_user_version_key(username), version) for username in usernames), None)
+
+
+def clear_group_permission_cache(group):
+    """
+    Cleans permission cache for all users of the given group.
+    """
+    clear_users_permission_cache(group.user_set.all())
 
 
 def clear_permission_cache():
+    """
+    Cleans permission cache for all users.
+    Only needed for site-wide changes, use clear_user_permission_cache()
+    or clear_group_permission_cache() otherwise.
+    """
     from django.core.cache import cache
     version = get_cache_permission_version()
     if version > 1:
@@ -68,3 +133,54 @@ def clear_permission_cache():
     else:
         cache.set(get_cache_permission_version_key(), 2,
                   get_cms_setting('CACHE_DURATIONS')['permissions'])
+
+
+def _get_view_restrictions_key(site_id):
+    return "%s:permission:view_restrictions:%s" % (
+        get_cms_setting('CACHE_PREFIX'), site_id)
+
+
+def _get_view_restrictions_version_key(site_id):
+    return "%s:permission:version:view_restrictions:%s" % (
+        get_cms_setting('CACHE_PREFIX'), site_id)
+
+
+def _get_view_restrictions_version(site_id):
+    from django.core.cache import cache
+
+    key = _get_view_restrictions_version_key(site_id)
+    version = cache.get(key)
+
+    if not version:
+        cache.add(key, _get_new_version(), None)
+        version = cache.get(key)
+    # Page tree changes bump the global version
+    return '%s.%s' % (get_cache_permission_version(), version)
+
+
+def get_view_restrictions_cache(site_id):
+    """
+    Helper for reading the view restrictions of a site from cache
+    """
+    from django.core.cache import cache
+    return cache.get(
+        _get_view_restrictions_key(site_id),
+        version=_get_view_restrictions_version(site_id),
+    )
+
+
+def set_view_restrictions_cache(site_id, value):
+    from django.core.cache import cache
+    cache.set(
+        _get_view_restrictions_key(site_id),
+        value,
+        get_cms_setting('CACHE_DURATIONS')['permissions'],
+        version=_get_view_restrictions_version(site_id),
+    )
+
+
+def clear_view_restrictions_cache(site_id):
+    """
+    Cleans the cached view restrictions of the given site.
+    """
+    _bump_version(_get_view_restrictions_version_key(site_id))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module manages the in-memory routing index used to resolve public page
+urls. Each process keeps, per site, a table mapping a title path to the public
+pages reachable under that path, together with their effective publication
+window (the intersection of the page window with the windows of all its
+ancestors).
+
+The table is built once per site and reused for every request until the
+routing version of the site changes. The version lives in the shared cache so
+that all processes notice changes made by any of them. Invalidation simply
+replaces the version with a new value; each process rebuilds its table lazily
+on the next lookup. The version expires after CMS_ROUTING_INDEX_TIMEOUT
+seconds, which bounds how long a process can serve a stale table when the
+cache isn't shared between processes or has lost the version.
+"""
+from collections import OrderedDict, namedtuple
+import time
+
+from django.utils import timezone
+
+from cms.utils import get_cms_setting
+
+
+RoutingEntry = namedtuple('RoutingEntry', [
+    'page_id',
+    'publication_date',
+    'publication_end_date',
+])
+
+# site_id -> (version, {path: (RoutingEntry, ...)})
+_routing_indexes = {}
+
+
+def _get_routing_version_key(site_id):
+    return '{prefix}|routing_index_version|site:{site}'.format(
+        prefix=get_cms_setting('CACHE_PREFIX'),
+        site=site_id,
+    )
+
+
+def get_routing_version(site_id):
+    """
+    Returns the current routing version for the given «site_id», explicitly
+    setting one if not defined.
+    """
+    from django.core.cache import cache
+
+    key = _get_routing_version_key(site_id)
+    version = cache.get(key)
+
+    if not version:
+        version = int(time.time() * 1000000)
+        cache.add(key, version, get_cms_setting('ROUTING_INDEX_TIMEOUT'))
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_routing_index(site_id):
+    """
+    Marks the routing index of the given «site_id» as stale in every process.
+    """
+    from django.core.cache import cache
+
+    key = _get_routing_version_key(site_id)
+    version = int(time.time() * 1000000)
+    # Make sure we never reuse the current version, even if the clock
+    # resolution is too coarse to tell two invalidations apart.
+    current = cache.get(key)
+
+    if current and current >= version:
+        version = current + 1
+    cache.set(key, version, get_cms_setting('ROUTING_INDEX_TIMEOUT'))
+
+
+def build_routing_index(site_id):
+    """
+    Builds the routing table for all public pages of the given «site_id».
+    """
+    from cms.models import Page, Title
+
+    pages = (
+        Page
+        .objects
+        .public()
+        .filter(site=site_id)
+        .order_by('path')
+        .values_list('pk', 'is_home', 'effective_publication_date', 'effective_publication_end_date')
+    )
+    titles = (
+        Title
+        .objects
+        .filter(page__site=site_id, publisher_is_draft=False)
+        .values_list('page', 'path', 'published')
+        .order_by('language')
+    )
+
+    # Pages are found under the path of any of their titles,
+    # the language is resolved later on by the view.
+    paths = OrderedDict()
+    published_ids = set()
+
+    for page_id, path, published in titles.iterator():
+        if published:
+            published_ids.add(page_id)
+
+        if not path:
+            # The home page is indexed separately below
+            continue
+        paths[(path, page_id)] = None
+
+    windows = {}
+    home_id = None
+
+    for page_id, is_home, start, end in pages.iterator():
+        if page_id in published_ids:
+            windows[page_id] = (start, end)
+
+            if is_home and home_id is None:
+                home_id = page_id
+
+    index = {}
+
+    for path, page_id in paths:
+        if page_id not in windows:
+            # Pages without a single published title are not reachable
+            continue
+
+        entry = RoutingEntry(
+            page_id,
+            windows[page_id][0],
+            windows[page_id][1],
+        )
+        index.setdefault(path, []).append(entry)
+
+    if home_id:
+        entry = RoutingEntry(
+            home_id,
+            windows[home_id][0],
+            windows[home_id][1],
+        )
+        index[''] = [entry]
+    return dict((path, tuple(entries)) for path, entries in index.items())
+
+
+def get_routing_index(site_id):
+    """
+    Returns the routing table for the given «site_id», rebuilding it
+    if it's been invalidated since it was last built by this process.
+    """
+    version = get_routing_version(site_id)
+    cached = _routing_indexes.get(site_id)
+
+    if cached and cached[0] == version:
+        return cached[1]
+
+    index = build_routing_index(site_id)
+    _routing_indexes[site_id] = (version, index)
+    return index
+
+
+def get_public_page_id_for_path(path, site_id):
+    """
+    Returns the id of the public page visible under «path» on the given
+    «site_id», or None if there is no such page.
+    """
+    entries = get_routing_index(site_id).get(path, ())
+    now = timezone.now()
+
+    for entry in entries:
+        if entry.publication_date and entry.publication_date > now:
+            continue
+        if entry.publication_end_date and entry.publication_end_date <= now:
+            continue
+        return entry.page_id
+    return None
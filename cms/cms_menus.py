@@ -2,7 +2,9 @@
 import functools
 
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db.models import Q
 from django.utils.functional import SimpleLazyObject
 
 from cms import constants
@@ -11,11 +13,11 @@ from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import get_fallback_languages, hide_untranslated
 from cms.utils.permissions import get_view_restrictions
 from cms.utils.page_permissions import user_can_view_all_pages
+from cms.utils.page import get_page_url_for_path, prefetch_page_titles
 from cms.utils.page_resolver import get_page_queryset
-from cms.utils.moderator import get_title_queryset
 
 from menus.base import Menu, NavigationNode, Modifier
-from menus.menu_pool import menu_pool
+from menus.menu_pool import menu_pool, _build_nodes_inner_for_one_menu, _dump_nodes, _load_nodes
 
 
 def get_visible_page_objects(request, pages, site):
@@ -82,6 +84,85 @@ def get_visible_pages(request, pages, site=None):
     return [page.pk for page in pages]
 
 
+def get_page_view_restrictions(pages):
+    """
+    Returns a dictionary mapping the id of each restricted page in «pages»
+    to a tuple of the ids of the users and the ids of the groups allowed
+    to see it. Pages sharing the same restrictions share the same tuple.
+    """
+    restricted_pages = get_view_restrictions(pages)
+    restrictions = {}
+    page_restrictions = {}
+
+    for page in pages:
+        if page.publisher_is_draft:
+            page_id = page.pk
+        else:
+            page_id = page.publisher_public_id
+
+        page_permissions = restricted_pages.get(page_id)
+
+        if not page_permissions:
+            continue
+
+        user_ids = frozenset(perm.user_id for perm in page_permissions if perm.user_id)
+        group_ids = frozenset(perm.group_id for perm in page_permissions if perm.group_id)
+        page_restrictions[page.pk] = restrictions.setdefault((user_ids, group_ids), (user_ids, group_ids))
+    return page_restrictions
+
+
+def get_visible_nodes(request, nodes, site):
+    """
+    Returns the nodes in «nodes» visible to the user of the request, removing
+    the page nodes the user is not allowed to see along with their descendants.
+
+    Nodes are shared by all users, so the view restrictions of each page
+    are kept on its node (see get_page_view_restrictions) and checked here
+    without querying the permissions.
+    """
+    user = request.user
+
+    public_for = get_cms_setting('PUBLIC_FOR')
+    can_see_unrestricted = public_for == 'all' or (public_for == 'staff' and user.is_staff)
+    is_auth_user = user.is_authenticated()
+
+    if is_auth_user or can_see_unrestricted:
+        if user_can_view_all_pages(user, site):
+            return nodes
+
+    user_groups = SimpleLazyObject(lambda: frozenset(user.groups.values_list('pk', flat=True)))
+
+    def user_can_see_node(node):
+        if not is_auth_user and not can_see_unrestricted:
+            return False
+
+        restrictions = node.attr.get('view_restrictions')
+
+        if not restrictions:
+            # Page has no view restrictions, fallback to the project's
+            # CMS_PUBLIC_FOR setting.
+            return can_see_unrestricted
+
+        if not is_auth_user:
+            return False
+
+        user_ids, group_ids = restrictions
+        return user.pk in user_ids or not group_ids.isdisjoint(user_groups)
+
+    hidden = set()
+
+    # Parents always come before their children
+    for node in nodes:
+        if node.parent in hidden:
+            hidden.add(node)
+        elif node.attr.get('is_page') and not user_can_see_node(node):
+            hidden.add(node)
+
+            if node.parent:
+                node.parent.children.remove(node)
+    return [node for node in nodes if node not in hidden]
+
+
 def page_to_node(renderer, page, home, language):
     """
     Transform a CMS page into a navigation node.
@@ -162,6 +243,7 @@ def page_to_node(renderer, page, home, language):
 
 
 class CMSNavigationNode(NavigationNode):
+    __slots__ = ('path',)
 
     def __init__(self, *args, **kwargs):
         self.path = kwargs.pop('path')
@@ -175,82 +257,164 @@ class CMSNavigationNode(NavigationNode):
         return page_id == self.id
 
     def get_absolute_url(self):
+        pages_root = reverse('pages-root')
+
         if self.attr['is_home']:
-            return reverse('pages-root')
-        return reverse('pages-details-by-slug', kwargs={"slug": self.path})
+            return pages_root
+        return get_page_url_for_path(pages_root, self.path)
+
+
+def get_menu_pages(renderer, request, *args):
+    """
+    Returns the pages shown in the menu bound to «renderer», ordered by path.
+    Extra arguments are passed to the queryset filter.
+    """
+    site = renderer.site
+    lang = renderer.language
+    page_queryset = get_page_queryset(request)
+
+    filters = {
+        'site': site,
+    }
+
+    if hide_untranslated(lang, site.pk):
+        filters['title_set__language'] = lang
+
+        if not renderer.draft_mode_active:
+            filters['title_set__published'] = True
+
+    if not renderer.draft_mode_active:
+        page_queryset = page_queryset.published()
+    return list(page_queryset.filter(*args, **filters).order_by("path"))
+
+
+def get_page_nodes(renderer, pages):
+    """
+    Returns the navigation nodes of «pages», ordered by path.
+    """
+    lang = renderer.language
+    nodes = []
+    home = None
+    actual_pages = []
+
+    # The nodes are shared by all users, view restrictions
+    # are applied on each request by the ViewRestrictions modifier.
+    view_restrictions = get_page_view_restrictions(pages)
+
+    for page in pages:
+        # Pages are ordered by path, therefore the first page is the root
+        # of the page tree (a.k.a "home")
+        if not home:
+            home = page
+
+        actual_pages.append(page)
+        page.title_cache = {}
+
+    langs = [lang]
+    if not hide_untranslated(lang):
+        langs.extend(get_fallback_languages(lang))
+
+    # add the title and slugs and some meta data
+    prefetch_page_titles(actual_pages, langs)
+
+    _page_to_node = functools.partial(
+        page_to_node,
+        renderer=renderer,
+        home=home,
+        language=lang,
+    )
+
+    for page in actual_pages:
+        if page.title_cache:
+            node = _page_to_node(page=page)
+
+            if page.pk in view_restrictions:
+                node.attr['view_restrictions'] = view_restrictions[page.pk]
+            nodes.append(node)
+    return nodes
+
+
+def get_breadcrumb_nodes(renderer):
+    """
+    Returns the nodes needed to render the breadcrumb of the current page:
+    the page, its ancestors and the home page, with the modifiers applied.
+
+    The nodes are cached per page along with the menu, so the whole menu
+    doesn't have to be loaded. Returns None when the whole menu has to be
+    used instead: when it's already loaded or when the page has navigation
+    extenders or apphook menus.
+    """
+    request = renderer.request
+    page = getattr(request, 'current_page', None)
+
+    if not page:
+        return None
+
+    if page.site_id != renderer.site.pk or page.publisher_is_draft != renderer.draft_mode_active:
+        return None
+
+    site_id = renderer.site.pk
+
+    if getattr(renderer, '_nodes_data_{}'.format(site_id), None):
+        # The whole menu has already been loaded by another tag
+        return None
+
+    key = '%s:breadcrumb:%s' % (renderer._get_cache_key(site_id), page.pk)
+    version = renderer._get_version(site_id)
+    cached_data = cache.get(key, version=version)
+
+    if cached_data is None:
+        paths = [page.path[:end] for end in range(page.steplen, len(page.path) + 1, page.steplen)]
+        # The root pages are needed to find the first page of the tree,
+        # see page_to_node().
+        pages = get_menu_pages(renderer, request, Q(path__in=paths) | Q(depth=1) | Q(is_home=True))
+        page_ids = set(ancestor.pk for ancestor in pages if ancestor.path in paths)
+        nodes = [
+            node for node in get_page_nodes(renderer, pages)
+            if node.id in page_ids or node.attr['is_home']
+        ]
+        nodes = _build_nodes_inner_for_one_menu(nodes, 'CMSMenu')
+        selected = next((node for node in nodes if node.id == page.pk), None)
+
+        if selected and selected.attr.get('navigation_extenders'):
+            # Nodes from other menus are attached to the page
+            cached_data = False
+        else:
+            cached_data = _dump_nodes(nodes)
+        cache.set(key, cached_data, get_cms_setting('CACHE_DURATIONS')['menus'], version=version)
+
+    if not cached_data:
+        return None
+    nodes = _load_nodes(cached_data)
+    return renderer.apply_modifiers(nodes, breadcrumb=True)
 
 
 class CMSMenu(Menu):
 
     def get_nodes(self, request):
-        site = self.renderer.site
-        lang = self.renderer.language
-        page_queryset = get_page_queryset(request)
-
-        filters = {
-            'site': site,
-        }
-
-        if hide_untranslated(lang, site.pk):
-            filters['title_set__language'] = lang
-
-            if not self.renderer.draft_mode_active:
-                filters['title_set__published'] = True
-
-        if not self.renderer.draft_mode_active:
-            page_queryset = page_queryset.published()
-
-        pages = page_queryset.filter(**filters).order_by("path")
-        ids = {}
-        nodes = []
-        home = None
-        actual_pages = []
-
-        # cache view perms
-        visible_pages = frozenset(get_visible_pages(request, pages, site))
-        for page in pages:
-            # Pages are ordered by path, therefore the first page is the root
-            # of the page tree (a.k.a "home")
-            if page.pk not in visible_pages:
-                # Don't include pages the user doesn't have access to
-                continue
-
-            if not home:
-                home = page
-
-            ids[page.id] = page
-            actual_pages.append(page)
-            page.title_cache = {}
-
-        langs = [lang]
-        if not hide_untranslated(lang):
-            langs.extend(get_fallback_languages(lang))
-
-        titles = get_title_queryset(request).filter(page__in=ids, language__in=langs)
-
-        for title in titles.iterator():  # add the title and slugs and some meta data
-            page = ids[title.page_id]
-            page.title_cache[title.language] = title
-
-        renderer = self.renderer
-
-        _page_to_node = functools.partial(
-            page_to_node,
-            renderer=renderer,
-            home=home,
-            language=lang,
-        )
-
-        for page in actual_pages:
-            if page.title_cache:
-                node = _page_to_node(page=page)
-                nodes.append(node)
-        return nodes
+        pages = get_menu_pages(self.renderer, request)
+        return get_page_nodes(self.renderer, pages)
+
+    def get_breadcrumb_nodes(self, request):
+        return get_breadcrumb_nodes(self.renderer)
 
 
 menu_pool.register_menu(CMSMenu)
 
 
+class ViewRestrictions(Modifier):
+    """
+    Removes the page nodes the current user is not allowed to see.
+    """
+
+    def modify(self, request, nodes, namespace, root_id, post_cut, breadcrumb):
+        if post_cut:
+            return nodes
+        return get_visible_nodes(request, nodes, self.renderer.site)
+
+menu_pool.register_modifier(ViewRestrictions)
+
+
 class NavExtender(Modifier):
 
     def modify(self, request, nodes, namespace, root_id, post_cut, breadcrumb):
@@ -259,36 +423,40 @@ class NavExtender(Modifier):
         # rearrange the parent relations
         # Find home
         home = next((n for n in nodes if n.attr.get("is_home", False)), None)
+        # Find the nodes that can be attached, by namespace
+        root_nodes = {}
+        for node in nodes:
+            if not node.parent_id:
+                root_nodes.setdefault(node.namespace, []).append(node)
         # Find nodes with NavExtenders
-        exts = []
+        exts = set()
         for node in nodes:
             extenders = node.attr.get("navigation_extenders", None)
             if extenders:
                 for ext in extenders:
-                    if ext not in exts:
-                        exts.append(ext)
+                    exts.add(ext)
                     # Link the nodes
-                    for extnode in nodes:
-                        if extnode.namespace == ext and not extnode.parent_id:
-                            # if home has nav extenders but home is not visible
-                            if node == home and not node.visible:
-                                # extnode.parent_id = None
-                                extnode.parent_namespace = None
-                                extnode.parent = None
-                            else:
-                                extnode.parent_id = node.id
-                                extnode.parent_namespace = node.namespace
-                                extnode.parent = node
-                                node.children.append(extnode)
-        removed = []
+                    for extnode in root_nodes.get(ext, ()):
+                        if extnode.parent_id:
+                            # Already linked to another node
+                            continue
+                        # if home has nav extenders but home is not visible
+                        if node == home and not node.visible:
+                            # extnode.parent_id = None
+                            extnode.parent_namespace = None
+                            extnode.parent = None
+                        else:
+                            extnode.parent_id = node.id
+                            extnode.parent_namespace = node.namespace
+                            extnode.parent = node
+                            node.children.append(extnode)
 
         # find all not assigned nodes
+        removed_namespaces = set()
         for menu in self.renderer.menus.items():
             if (hasattr(menu[1], 'cms_enabled')
                     and menu[1].cms_enabled and not menu[0] in exts):
-                for node in nodes:
-                    if node.namespace == menu[0]:
-                        removed.append(node)
+                removed_namespaces.add(menu[0])
         if breadcrumb:
             # if breadcrumb and home not in navigation add node
             if breadcrumb and home and not home.visible:
@@ -298,8 +466,8 @@ class NavExtender(Modifier):
                 else:
                     home.selected = False
         # remove all nodes that are nav_extenders and not assigned
-        for node in removed:
-            nodes.remove(node)
+        if removed_namespaces:
+            nodes[:] = [node for node in nodes if node.namespace not in removed_namespaces]
         return nodes
 
 menu_pool.register_modifier(NavExtender)
@@ -10,6 +10,7 @@ from .subcommands.check import CheckInstallation
 from .subcommands.list import ListCommand
 from .subcommands.moderator import ModeratorCommand
 from .subcommands.publisher_publish import PublishCommand
+from .subcommands.search_index import RebuildSearchIndexCommand
 from .subcommands.tree import FixTreeCommand
 from .subcommands.uninstall import UninstallCommand
 from .subcommands.copy import CopyCommand
@@ -26,6 +27,7 @@ class Command(SubcommandsCommand):
         ('list', ListCommand),
         ('moderator', ModeratorCommand),
         ('publisher-publish', PublishCommand),
+        ('rebuild-search-index', RebuildSearchIndexCommand),
         ('uninstall', UninstallCommand),
     ))
     missing_args_message = 'one of the available sub commands must be provided'
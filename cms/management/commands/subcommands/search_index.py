@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, print_function, unicode_literals
+
+from cms.models import Page
+from cms.utils.page_search import rebuild_page_search_index
+
+from .base import SubcommandsCommand
+
+
+class RebuildSearchIndexCommand(SubcommandsCommand):
+    help_string = 'Rebuilds the page search index'
+    command_name = 'rebuild-search-index'
+
+    def handle(self, *args, **options):
+        """
+        Indexes the titles of all pages and the plugins of the public pages
+        """
+        count = 0
+
+        for page in Page.objects.order_by('path').iterator():
+            rebuild_page_search_index(page)
+            count += 1
+        self.stdout.write('%d pages indexed\n' % count)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def forwards(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Page = apps.get_model('cms', 'Page')
+
+    pages = (
+        Page
+        .objects
+        .using(db_alias)
+        .order_by('path')
+        .values_list('pk', 'parent', 'publication_date', 'publication_end_date')
+    )
+    windows = {}
+    pages_by_window = {}
+
+    for pk, parent_id, start, end in pages.iterator():
+        # Pages are ordered by path so the parent is always known
+        parent_window = windows.get(parent_id)
+
+        if parent_window:
+            parent_start, parent_end = parent_window
+
+            if parent_start and (not start or parent_start > start):
+                start = parent_start
+            if parent_end and (not end or parent_end < end):
+                end = parent_end
+        windows[pk] = (start, end)
+
+        if start or end:
+            pages_by_window.setdefault((start, end), []).append(pk)
+
+    for (start, end), page_ids in pages_by_window.items():
+        for offset in range(0, len(page_ids), 500):
+            Page.objects.using(db_alias).filter(pk__in=page_ids[offset:offset + 500]).update(
+                effective_publication_date=start,
+                effective_publication_end_date=end,
+            )
+
+
+def backwards(apps, schema_editor):
+    # Do nothing, the fields are removed
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0016_auto_20160608_1535'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='effective_publication_date',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='page',
+            name='effective_publication_end_date',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+
+def normalize(*values):
+    text = u' '.join(value for value in values if value)
+    return re.sub(r'\s+', u' ', strip_tags(text)).strip().lower()
+
+
+def forwards(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    Title = apps.get_model('cms', 'Title')
+    PageSearchIndex = apps.get_model('cms', 'PageSearchIndex')
+
+    titles = (
+        Title
+        .objects
+        .using(db_alias)
+        .values_list('page', 'language', 'title', 'menu_title', 'page_title', 'slug', 'path', 'has_url_overwrite')
+    )
+    rows = []
+
+    for page_id, language, title, menu_title, page_title, slug, path, overwrite in titles.iterator():
+        path = path.replace('/', ' ') if overwrite else ''
+        # Plugin content is indexed the next time the page is published
+        rows.append(PageSearchIndex(
+            page_id=page_id,
+            language=language,
+            title=normalize(title, menu_title, page_title, slug, path),
+        ))
+
+        if len(rows) == 500:
+            PageSearchIndex.objects.using(db_alias).bulk_create(rows)
+            rows = []
+
+    if rows:
+        PageSearchIndex.objects.using(db_alias).bulk_create(rows)
+
+
+def backwards(apps, schema_editor):
+    # Do nothing, the table is removed
+    pass
+
+
+def create_text_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX cms_pagesearchindex_title_fts ON cms_pagesearchindex "
+        "USING gin (to_tsvector('simple', title))"
+    )
+    schema_editor.execute(
+        "CREATE INDEX cms_pagesearchindex_text_fts ON cms_pagesearchindex "
+        "USING gin (to_tsvector('simple', title || ' ' || content))"
+    )
+
+
+def drop_text_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS cms_pagesearchindex_title_fts")
+    schema_editor.execute("DROP INDEX IF EXISTS cms_pagesearchindex_text_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0017_page_effective_publication_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageSearchIndex',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('language', models.CharField(max_length=15, editable=False, db_index=True)),
+                ('title', models.TextField(default='', editable=False)),
+                ('content', models.TextField(default='', editable=False)),
+                ('page', models.ForeignKey(related_name='search_index', editable=False, to='cms.Page')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='pagesearchindex',
+            unique_together=set([('page', 'language')]),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RunPython(create_text_indexes, drop_text_indexes),
+    ]
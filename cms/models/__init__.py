@@ -9,5 +9,6 @@ from .placeholderpluginmodel import *  # nopyflakes
 from .static_placeholder import *  # nopyflakes
 from .aliaspluginmodel import *  # nopyflakes
 from .apphooks_reload import *  # nopyflakes
+from .searchmodels import *  # nopyflakes
 # must be last
 from cms import signals as s_import  # nopyflakes
@@ -12,6 +12,7 @@ from django.utils.translation import get_language, ugettext_lazy as _
 
 from cms import constants
 from cms.cache.page import set_xframe_cache, get_xframe_cache
+from cms.cache.routing import invalidate_routing_index
 from cms.constants import PUBLISHER_STATE_DEFAULT, PUBLISHER_STATE_PENDING, PUBLISHER_STATE_DIRTY, TEMPLATE_INHERITANCE_MAGIC
 from cms.exceptions import PublicIsUnmodifiable, PublicVersionNeeded, LanguageError
 from cms.models.managers import PageManager
@@ -67,6 +68,10 @@ class Page(six.with_metaclass(PageMetaClass, MP_Node)):
     publication_end_date = models.DateTimeField(_("publication end date"), null=True, blank=True,
                                                 help_text=_('When to expire the page. Leave empty to never expire.'),
                                                 db_index=True)
+    # Intersection of the publication window of the page with the windows
+    # of all its ancestors. Kept up to date by update_effective_publication_dates()
+    effective_publication_date = models.DateTimeField(null=True, editable=False, db_index=True)
+    effective_publication_end_date = models.DateTimeField(null=True, editable=False, db_index=True)
     #
     # Please use toggle_in_navigation() instead of affecting this property
     # directly so that the cms page cache can be invalidated as appropriate.
@@ -534,10 +539,10 @@ class Page(six.with_metaclass(PageMetaClass, MP_Node)):
         return new_page
 
     def delete(self, *args, **kwargs):
-        pages = [self.pk]
-        if self.publisher_public_id:
-            pages.append(self.publisher_public_id)
-        self.__class__.objects.filter(pk__in=pages).delete()
+        from cms.utils.deletion import delete_pages
+
+        # Deletes the descendants and the public version as well
+        return delete_pages([self])
 
     def save(self, no_signals=False, commit=True, **kwargs):
         """
@@ -762,6 +767,8 @@ class Page(six.with_metaclass(PageMetaClass, MP_Node)):
 
         from cms.cache import invalidate_cms_page_cache
         invalidate_cms_page_cache()
+        # descendants are published through bulk updates
+        invalidate_routing_index(self.site_id)
 
         if marked_as_published and get_cms_setting('PLACEHOLDER_CACHE'):
             # Only clear the placeholder cache if the page
@@ -801,6 +808,7 @@ class Page(six.with_metaclass(PageMetaClass, MP_Node)):
 
         from cms.cache import invalidate_cms_page_cache
         invalidate_cms_page_cache()
+        invalidate_routing_index(self.site_id)
 
         from cms.signals import post_unpublish
         post_unpublish.send(sender=Page, instance=self, language=language)
@@ -961,6 +969,61 @@ class Page(six.with_metaclass(PageMetaClass, MP_Node)):
         self._publisher_keep_state = True
         self.save()
 
+    def update_effective_publication_dates(self):
+        """
+        Computes the effective publication window of this page and all its
+        descendants by intersecting the window of each page with the one of
+        its parent.
+        """
+        if self.parent_id:
+            parent_window = (
+                Page
+                .objects
+                .filter(pk=self.parent_id)
+                .values_list('effective_publication_date', 'effective_publication_end_date')
+                .first()
+            )
+        else:
+            parent_window = None
+
+        window = page_utils.get_effective_publication_window(
+            self.publication_date,
+            self.publication_end_date,
+            parent_window,
+        )
+        self.effective_publication_date, self.effective_publication_end_date = window
+
+        windows = {self.pk: window}
+        pages_by_window = {window: [self.pk]}
+
+        descendants = (
+            self
+            .get_descendants()
+            .order_by('path')
+            .values_list(
+                'pk',
+                'parent',
+                'publication_date',
+                'publication_end_date',
+                'effective_publication_date',
+                'effective_publication_end_date',
+            )
+        )
+
+        for pk, parent_id, start, end, effective_start, effective_end in descendants.iterator():
+            # Pages are ordered by path so the parent is always known
+            window = page_utils.get_effective_publication_window(start, end, windows.get(parent_id))
+            windows[pk] = window
+
+            if window != (effective_start, effective_end):
+                pages_by_window.setdefault(window, []).append(pk)
+
+        for (start, end), page_ids in pages_by_window.items():
+            Page.objects.filter(pk__in=page_ids).update(
+                effective_publication_date=start,
+                effective_publication_end_date=end,
+            )
+
     def get_draft_object(self):
         if not self.publisher_is_draft:
             return self.publisher_draft
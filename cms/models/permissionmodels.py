@@ -50,6 +50,26 @@ ACCESS_CHOICES = (
 )
 
 
+def get_grant_interval(grant_on, path, depth):
+    """
+    Returns the pages a permission granted with «grant_on» on the page
+    with the given «path» and «depth» applies to, as a
+    (path, min_depth, max_depth) interval of the page tree.
+    A page belongs to the interval when its path starts with «path»
+    and its depth is between the two bounds. «max_depth» is None
+    when the permission is granted on all descendants.
+    """
+    min_depth = depth if grant_on & MASK_PAGE else depth + 1
+
+    if grant_on & MASK_CHILDREN:
+        max_depth = depth + 1
+    elif grant_on & MASK_DESCENDANTS:
+        max_depth = None
+    else:
+        max_depth = depth
+    return path, min_depth, max_depth
+
+
 class AbstractPagePermission(models.Model):
     """Abstract page permissions
     """
@@ -240,6 +260,14 @@ class PagePermission(AbstractPagePermission):
             for descendant in descendants:
                 yield descendant
 
+    def get_page_interval(self):
+        """
+        Returns the pages this permission is granted on as a
+        (path, min_depth, max_depth) interval of the page tree.
+        See get_grant_interval().
+        """
+        return get_grant_interval(self.grant_on, self.page.path, self.page.depth)
+
 
 class PageUserManager(UserManager):
     use_in_migrations = False
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from cms.models import CMSPlugin
 from cms.models.fields import PlaceholderField
-from cms.utils.copy_plugins import copy_plugins_to
+from cms.utils.copy_plugins import bulk_copy_plugins
 from django.db import models
 from django.utils.encoding import python_2_unicode_compatible
 
@@ -18,11 +18,11 @@ class PlaceholderReference(CMSPlugin):
         return self.name
 
     def copy_to(self, placeholder, language):
-        copy_plugins_to(self.placeholder_ref.get_plugins(), placeholder, to_language=language)
+        bulk_copy_plugins(self.placeholder_ref.get_plugins(), placeholder, to_language=language)
 
     def copy_from(self, placeholder, language):
         plugins = placeholder.get_plugins(language)
-        return copy_plugins_to(plugins, self.placeholder_ref, to_language=self.language)
+        return bulk_copy_plugins(plugins, self.placeholder_ref, to_language=self.language)
 
     def move_to(self, placeholder, language):
         for plugin in self.placeholder_ref.get_plugins():
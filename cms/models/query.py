@@ -8,6 +8,15 @@ from django.utils import timezone
 
 
 class PageQuerySet(MP_NodeQuerySet, PublisherQuerySet):
+    def delete(self):
+        """
+        Deletes the pages with their descendants and public versions
+        in bulk, see cms.utils.deletion.delete_pages.
+        """
+        from cms.utils.deletion import delete_pages
+
+        return delete_pages(self)
+
     def on_site(self, site=None):
         if not site:
             try:
@@ -24,17 +33,18 @@ class PageQuerySet(MP_NodeQuerySet, PublisherQuerySet):
         return self.filter(parent__isnull=True)
 
     def published(self, language=None, site=None):
+        now = timezone.now()
 
         if language:
             pub = self.on_site(site).filter(
-                Q(publication_date__lte=timezone.now()) | Q(publication_date__isnull=True),
-                Q(publication_end_date__gt=timezone.now()) | Q(publication_end_date__isnull=True),
+                Q(effective_publication_date__lte=now) | Q(effective_publication_date__isnull=True),
+                Q(effective_publication_end_date__gt=now) | Q(effective_publication_end_date__isnull=True),
                 title_set__published=True, title_set__language=language
             )
         else:
             pub = self.on_site(site).filter(
-                Q(publication_date__lte=timezone.now()) | Q(publication_date__isnull=True),
-                Q(publication_end_date__gt=timezone.now()) | Q(publication_end_date__isnull=True),
+                Q(effective_publication_date__lte=now) | Q(effective_publication_date__isnull=True),
+                Q(effective_publication_end_date__gt=now) | Q(effective_publication_end_date__isnull=True),
                 title_set__published=True
             )
         return pub
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from django.db import models
+from django.utils.encoding import python_2_unicode_compatible
+
+from cms.models.pagemodel import Page
+
+
+@python_2_unicode_compatible
+class PageSearchIndex(models.Model):
+    """
+    Normalized searchable text of a page in a language.
+    Rows are maintained by cms.utils.page_search when titles
+    are saved and pages are published.
+    """
+    page = models.ForeignKey(Page, related_name='search_index', editable=False)
+    language = models.CharField(max_length=15, db_index=True, editable=False)
+    # Title, menu title, page title, slug and path
+    title = models.TextField(default='', editable=False)
+    # Text of the plugins with search_fields
+    content = models.TextField(default='', editable=False)
+
+    class Meta:
+        app_label = 'cms'
+        unique_together = (('page', 'language'),)
+
+    def __str__(self):
+        return u'%s (%s)' % (self.page_id, self.language)
@@ -109,6 +109,15 @@ class ContentRenderer(object):
     def registered_plugins(self):
         return self.plugin_pool.get_all_plugins()
 
+    @cached_property
+    def addable_plugins(self):
+        """
+        The registered plugins the current user can add,
+        checked once per request instead of once per placeholder.
+        """
+        can_add_plugin = partial(has_plugin_permission, user=self.request.user, permission_type='add')
+        return [plugin for plugin in self.registered_plugins if can_add_plugin(plugin_type=plugin.value)]
+
     @cached_property
     def placeholder_toolbar_template(self):
         return self.get_cached_template('cms/toolbar/placeholder.html')
@@ -468,10 +477,8 @@ class ContentRenderer(object):
         return content
 
     def render_editable_placeholder(self, placeholder, context, language):
-        can_add_plugin = partial(has_plugin_permission, user=self.request.user, permission_type='add')
-        plugins = [plugin for plugin in self.registered_plugins if can_add_plugin(plugin_type=plugin.value)]
         plugin_menu = get_toolbar_plugin_struct(
-            plugins=plugins,
+            plugins=self.addable_plugins,
             slot=placeholder.slot,
             page=placeholder.page,
         )
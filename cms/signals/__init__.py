@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from cms.signals.apphook import debug_server_restart, trigger_server_restart
-from cms.signals.page import pre_save_page, post_save_page, pre_delete_page, post_delete_page, post_moved_page
-from cms.signals.permissions import post_save_user, post_save_user_group, pre_save_user, pre_delete_user, pre_save_group, pre_delete_group, pre_save_pagepermission, pre_delete_pagepermission, pre_save_globalpagepermission, pre_delete_globalpagepermission
+from cms.signals.page import pre_save_page, post_save_page, pre_delete_page, post_delete_page, post_moved_page, post_publish_page
+from cms.signals.permissions import post_save_user, post_save_user_group, pre_save_user, pre_delete_user, pre_save_group, pre_delete_group, m2m_changed_user_groups, pre_save_pagepermission, pre_delete_pagepermission, pre_save_globalpagepermission, pre_delete_globalpagepermission
 from cms.signals.placeholder import pre_delete_placeholder_ref, post_delete_placeholder_ref
 from cms.signals.plugins import post_delete_plugins, pre_save_plugins, pre_delete_plugins
 from cms.signals.title import pre_save_title, post_save_title, pre_delete_title, post_delete_title
@@ -28,6 +28,10 @@ post_unpublish = Signal(providing_args=["instance", "language"])
 # fired if a public page with an apphook is added or changed
 urls_need_reloading = Signal(providing_args=[])
 
+# fired once per model after pages, titles, placeholders or plugins
+# are deleted in bulk (see cms.utils.deletion), instead of post_delete
+post_bulk_delete = Signal(providing_args=["pk_set", "using"])
+
 # *disclaimer*
 # The generic object operation signals are very likely to change
 # as their usage evolves.
@@ -95,6 +99,7 @@ signals.post_save.connect(post_save_page, sender=Page, dispatch_uid='cms_post_sa
 signals.pre_delete.connect(pre_delete_page, sender=Page, dispatch_uid='cms_pre_delete_page')
 signals.post_delete.connect(post_delete_page, sender=Page, dispatch_uid='cms_post_delete_page')
 page_moved.connect(post_moved_page, sender=Page, dispatch_uid='cms_post_move_page')
+post_publish.connect(post_publish_page, sender=Page, dispatch_uid='cms_post_publish_page')
 
 ######################### title #########################
 
@@ -128,6 +133,9 @@ if get_cms_setting('PERMISSION'):
     signals.pre_save.connect(pre_save_group, sender=PageUserGroup, dispatch_uid='cms_pre_save_pageusergroup')
     signals.pre_delete.connect(pre_delete_group, sender=PageUserGroup, dispatch_uid='cms_pre_delete_pageusergroup')
 
+    signals.m2m_changed.connect(m2m_changed_user_groups, sender=User.groups.through,
+                                dispatch_uid='cms_m2m_changed_user_groups')
+
     signals.pre_save.connect(pre_save_pagepermission, sender=PagePermission, dispatch_uid='cms_pre_save_pagepermission')
     signals.pre_delete.connect(pre_delete_pagepermission, sender=PagePermission,
                                dispatch_uid='cms_pre_delete_pagepermission')
@@ -10,12 +10,30 @@ from cms.utils.apphook_reload import mark_urlconf_as_changed
 
 DISPATCH_UID = 'cms-restart'
 
+# Ids of the public pages whose apphook urls changed since the urls were last
+# marked as stale. These are shared by all threads, since any request may be
+# the one triggering the restart.
+_changed_page_ids = set()
 
-def trigger_server_restart(**kwargs):
+
+def mark_page_as_changed(page):
+    """
+    Records that the urls of the apphook on the given page need reloading.
+    """
+    if page.publisher_is_draft:
+        page_id = page.publisher_public_id
+    else:
+        page_id = page.pk
+
+    if page_id:
+        _changed_page_ids.add(page_id)
+
+
+def trigger_server_restart(page_ids=None, **kwargs):
     """
     Marks the URLs as stale so that they can be reloaded.
     """
-    mark_urlconf_as_changed()
+    mark_urlconf_as_changed(page_ids=page_ids)
 
 
 def apphook_pre_title_checker(instance, **kwargs):
@@ -38,6 +56,7 @@ def apphook_post_page_checker(page):
 
         from cms.cache import invalidate_cms_page_cache
         invalidate_cms_page_cache()
+        mark_page_as_changed(page)
         request_finished.connect(trigger_restart, dispatch_uid=DISPATCH_UID)
 
 
@@ -50,6 +69,7 @@ def apphook_post_title_checker(instance, **kwargs):
     old_title = getattr(instance, '_old_data', None)
     if not old_title:
         if instance.page.application_urls:
+            mark_page_as_changed(instance.page)
             request_finished.connect(
                 trigger_restart,
                 dispatch_uid=DISPATCH_UID
@@ -70,6 +90,7 @@ def apphook_post_title_checker(instance, **kwargs):
             instance.slug,
         )
         if old_values != new_values and (old_values[2] or new_values[2]):
+            mark_page_as_changed(instance.page)
             request_finished.connect(trigger_restart, dispatch_uid=DISPATCH_UID)
 
 
@@ -80,6 +101,7 @@ def apphook_post_delete_title_checker(instance, **kwargs):
     from cms.cache import invalidate_cms_page_cache
     invalidate_cms_page_cache()
     if instance.page.application_urls:
+        mark_page_as_changed(instance.page)
         request_finished.connect(trigger_restart, dispatch_uid=DISPATCH_UID)
 
 
@@ -88,6 +110,7 @@ def apphook_post_delete_page_checker(instance, **kwargs):
     Check if this was an apphook
     """
     if instance.application_urls:
+        mark_page_as_changed(instance)
         request_finished.connect(trigger_restart, dispatch_uid=DISPATCH_UID)
 
 # import the logging library
@@ -101,7 +124,10 @@ def trigger_restart(**kwargs):
     from cms.signals import urls_need_reloading
 
     request_finished.disconnect(trigger_restart, dispatch_uid=DISPATCH_UID)
-    urls_need_reloading.send(sender=None)
+    page_ids = set(_changed_page_ids)
+    _changed_page_ids.difference_update(page_ids)
+    # Without the ids of the changed pages, all urls get reloaded
+    urls_need_reloading.send(sender=None, page_ids=page_ids or None)
 
 
 def debug_server_restart(**kwargs):
@@ -5,10 +5,12 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.template import TemplateDoesNotExist
 
 from cms.cache.permissions import clear_permission_cache
+from cms.cache.routing import invalidate_routing_index
 from cms.exceptions import NoHomeFound
 from cms.models import Page
 from cms.signals.apphook import apphook_post_delete_page_checker, apphook_post_page_checker
 from cms.signals.title import update_title, update_title_paths
+from cms.utils.page_search import get_plugin_search_text, update_page_search_index
 from menus.menu_pool import menu_pool
 
 
@@ -23,7 +25,10 @@ def pre_save_page(instance, **kwargs):
 
 
 def post_save_page(instance, **kwargs):
+    invalidate_routing_index(instance.site_id)
     if not kwargs.get('raw'):
+        if has_publication_window_changed(instance):
+            instance.update_effective_publication_dates()
         try:
             instance.rescan_placeholders()
         except TemplateDoesNotExist as e:
@@ -63,6 +68,7 @@ def pre_delete_page(instance, **kwargs):
 
 
 def post_delete_page(instance, **kwargs):
+    invalidate_routing_index(instance.site_id)
     update_home(instance, **kwargs)
     apphook_post_delete_page_checker(instance)
     from cms.cache import invalidate_cms_page_cache
@@ -70,10 +76,31 @@ def post_delete_page(instance, **kwargs):
 
 
 def post_moved_page(instance, **kwargs):
+    invalidate_routing_index(instance.site_id)
+    instance.update_effective_publication_dates()
     update_title_paths(instance, **kwargs)
     update_home(instance, **kwargs)
 
 
+def post_publish_page(instance, language, **kwargs):
+    # Only the plugins of public pages are searchable
+    public_page_id = instance.publisher_public_id
+    content = get_plugin_search_text(public_page_id, language)
+    update_page_search_index(public_page_id, language, content=content)
+
+
+def has_publication_window_changed(instance):
+    old_page = getattr(instance, 'old_page', None)
+
+    if old_page is None:
+        return True
+    return (
+        old_page.parent_id != instance.parent_id
+        or old_page.publication_date != instance.publication_date
+        or old_page.publication_end_date != instance.publication_end_date
+    )
+
+
 def update_home(instance, **kwargs):
     """
     Updates the is_home flag of page instances after they are saved or moved.
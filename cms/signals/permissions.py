@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from cms.cache.permissions import clear_user_permission_cache
+from django.contrib.auth import get_user_model
+
+from cms.cache.permissions import (
+    clear_group_permission_cache,
+    clear_user_permission_cache,
+    clear_users_permission_cache,
+    clear_view_restrictions_cache,
+)
 from cms.models import PageUser, PageUserGroup
 from menus.menu_pool import menu_pool
 
@@ -51,36 +58,82 @@ def pre_delete_user(instance, **kwargs):
 
 def pre_save_group(instance, raw, **kwargs):
     if instance.pk:
-        user_set = getattr(instance, 'user_set')
-        for user in user_set.all():
-            clear_user_permission_cache(user)
+        clear_group_permission_cache(instance)
 
 
 def pre_delete_group(instance, **kwargs):
-    user_set = getattr(instance, 'user_set')
-    for user in user_set.all():
-        clear_user_permission_cache(user)
+    clear_group_permission_cache(instance)
 
 
-def _clear_users_permissions(instance):
-    if instance.user:
+def m2m_changed_user_groups(instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        # The groups of a user have changed
+        clear_user_permission_cache(instance)
+    elif action == 'pre_clear':
+        clear_group_permission_cache(instance)
+    else:
+        # Users have been added to or removed from a group
+        clear_users_permission_cache(get_user_model().objects.filter(pk__in=pk_set))
+
+
+def _clear_permission_audience(instance):
+    if instance.user_id:
         clear_user_permission_cache(instance.user)
-    if instance.group:
-        user_set = getattr(instance.group, 'user_set')
-        for user in user_set.all():
-            clear_user_permission_cache(user)
+    if instance.group_id:
+        clear_group_permission_cache(instance.group)
+
+
+def _get_saved_instance(instance, *related):
+    if not instance.pk:
+        return None
+
+    saved_instance = (
+        instance
+        .__class__
+        .objects
+        .filter(pk=instance.pk)
+        .select_related('user', 'group', *related)
+        .first()
+    )
+    return saved_instance
+
+
+def _clear_users_permissions(instance, old_instance=None):
+    _clear_permission_audience(instance)
+
+    if old_instance:
+        # The permission might have been moved
+        # from another user or group.
+        _clear_permission_audience(old_instance)
+
+
+def _clear_view_restrictions(*instances):
+    site_ids = set(
+        instance.page.site_id for instance in instances
+        if instance and instance.can_view and instance.page_id
+    )
+
+    for site_id in site_ids:
+        clear_view_restrictions_cache(site_id)
 
 
 def pre_save_pagepermission(instance, raw, **kwargs):
-    _clear_users_permissions(instance)
+    old_instance = _get_saved_instance(instance, 'page')
+    _clear_users_permissions(instance, old_instance)
+    _clear_view_restrictions(instance, old_instance)
 
 
 def pre_delete_pagepermission(instance, **kwargs):
     _clear_users_permissions(instance)
+    _clear_view_restrictions(instance)
 
 
 def pre_save_globalpagepermission(instance, raw, **kwargs):
-    _clear_users_permissions(instance)
+    old_instance = _get_saved_instance(instance)
+    _clear_users_permissions(instance, old_instance)
     menu_pool.clear(all=True)
 
 
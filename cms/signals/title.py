@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from cms.cache.routing import invalidate_routing_index
 from cms.models import Title, Page
 from cms.signals.apphook import apphook_pre_title_checker, apphook_post_title_checker, apphook_post_delete_title_checker
+from cms.utils.page_search import delete_page_search_index, get_title_search_text, update_page_search_index
 
 
 def update_title_paths(instance, **kwargs):
@@ -66,6 +68,14 @@ def post_save_title(instance, raw, created, **kwargs):
             # remove temporary attributes
     if hasattr(instance, 'tmp_path'):
         del instance.tmp_path
+    if not raw:
+        # Fixtures bring their own search index rows
+        update_page_search_index(
+            instance.page_id,
+            instance.language,
+            title=get_title_search_text(instance),
+        )
+    invalidate_routing_index(instance.page.site_id)
     apphook_post_title_checker(instance, **kwargs)
 
 
@@ -84,4 +94,6 @@ def pre_delete_title(instance, **kwargs):
 
 
 def post_delete_title(instance, **kwargs):
+    delete_page_search_index(instance.page_id, instance.language)
+    invalidate_routing_index(instance.page.site_id)
     apphook_post_delete_title_checker(instance, **kwargs)
@@ -3,9 +3,10 @@
 from django.contrib.sitemaps import Sitemap
 from django.contrib.sites.models import Site
 from django.db.models import Q
-from django.utils import translation
+from django.utils import timezone
 
 from cms.models import Title
+from cms.utils.page import get_page_urls
 
 
 def from_iterable(iterables):
@@ -31,6 +32,8 @@ class CMSSitemap(Sitemap):
         #         part of our sitemap anyway.
         #   > Pages which cannot be accessed by anonymous users (like
         #     search engines are).
+        #   > Pages which are not (or no longer) public because of their
+        #     publication dates or the ones of their ancestors.
         #
         # It is noted here: http://www.sitemaps.org/protocol.html that
         # "locations" that differ from the place where the sitemap is found,
@@ -46,11 +49,14 @@ class CMSSitemap(Sitemap):
         # included, simply create a new class inheriting from this one, and
         # supply a new items() method which doesn't filter out the redirects.
         #
+        now = timezone.now()
         all_titles = Title.objects.public().filter(
             Q(redirect='') | Q(redirect__isnull=True),
+            Q(page__effective_publication_date__lte=now) | Q(page__effective_publication_date__isnull=True),
+            Q(page__effective_publication_end_date__gt=now) | Q(page__effective_publication_end_date__isnull=True),
             page__login_required=False,
             page__site=Site.objects.get_current(),
-        ).order_by('page__path')
+        ).order_by('page__path').select_related('page')
         return all_titles
 
     def lastmod(self, title):
@@ -62,7 +68,9 @@ class CMSSitemap(Sitemap):
         return max(modification_dates)
 
     def location(self, title):
-        translation.activate(title.language)
-        url = title.page.get_absolute_url(title.language)
-        translation.deactivate()
-        return url
+        page = title.page
+        # The title is all we need to compute the url,
+        # no need to load the page titles again.
+        page.title_cache = {title.language: title}
+        urls = get_page_urls([page], title.language)
+        return urls[page.pk]
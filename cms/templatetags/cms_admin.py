@@ -4,7 +4,7 @@ from classytags.core import Options, Tag
 from classytags.helpers import InclusionTag
 from cms.constants import PUBLISHER_STATE_PENDING
 from cms.toolbar.utils import get_plugin_toolbar_js
-from cms.utils.admin import render_admin_rows
+from cms.utils.admin import get_page_publish_state, render_admin_rows
 from sekizai.helpers import get_varname
 
 from django import template
@@ -45,30 +45,21 @@ class TreePublishRow(Tag):
         Argument('language')
     )
 
+    states = {
+        'dirty': ("cms-pagetree-node-state cms-pagetree-node-state-dirty dirty",
+                  _("unpublished changes")),
+        'published': ("cms-pagetree-node-state cms-pagetree-node-state-published published",
+                      _("published")),
+        'unpublishedparent': ("cms-pagetree-node-state cms-pagetree-node-state-unpublished-parent unpublishedparent",
+                              _("unpublished parent")),
+        'unpublished': ("cms-pagetree-node-state cms-pagetree-node-state-unpublished unpublished",
+                        _("unpublished")),
+        'empty': ("cms-pagetree-node-state cms-pagetree-node-state-empty empty",
+                  _("no content")),
+    }
+
     def render_tag(self, context, page, language):
-        if page.is_published(language) and page.publisher_public_id and page.publisher_public.is_published(language):
-            if page.is_dirty(language):
-                cls = "cms-pagetree-node-state cms-pagetree-node-state-dirty dirty"
-                text = _("unpublished changes")
-            else:
-                cls = "cms-pagetree-node-state cms-pagetree-node-state-published published"
-                text = _("published")
-        else:
-            page_languages = page.get_languages()
-
-            if language in page_languages:
-                public_pending = page.publisher_public_id and page.publisher_public.get_publisher_state(
-                        language) == PUBLISHER_STATE_PENDING
-                if public_pending or page.get_publisher_state(
-                        language) == PUBLISHER_STATE_PENDING:
-                    cls = "cms-pagetree-node-state cms-pagetree-node-state-unpublished-parent unpublishedparent"
-                    text = _("unpublished parent")
-                else:
-                    cls = "cms-pagetree-node-state cms-pagetree-node-state-unpublished unpublished"
-                    text = _("unpublished")
-            else:
-                cls = "cms-pagetree-node-state cms-pagetree-node-state-empty empty"
-                text = _("no content")
+        cls, text = self.states[get_page_publish_state(page, language)]
         return mark_safe(
             '<span class="cms-hover-tooltip cms-hover-tooltip-left cms-hover-tooltip-delay %s" '
             'data-cms-tooltip="%s"></span>' % (cls, force_text(text)))
@@ -12,6 +12,7 @@ from django.core.mail import mail_managers
 from django.core.urlresolvers import reverse
 from django.db.models import Model
 from django.middleware.common import BrokenLinkEmailsMiddleware
+from django.template.base import FilterExpression
 from django.template.loader import render_to_string
 from django.utils import six
 from django.utils.encoding import smart_text, force_text
@@ -30,13 +31,14 @@ from classytags.utils import flatten_context
 from classytags.values import ListValue, StringValue
 
 from cms import __version__
-from cms.cache.page import get_page_url_cache, set_page_url_cache
+from cms.cache.page import get_page_url_cache, get_page_urls_cache, set_page_url_cache
 from cms.models import Page, Placeholder as PlaceholderModel, CMSPlugin, StaticPlaceholder
 from cms.utils import get_language_from_request, get_site_id
 from cms.utils.conf import get_cms_setting
 from cms.utils.compat.dj import get_middleware
 from cms.utils.i18n import force_language
 from cms.utils.moderator import use_draft
+from cms.utils.page import get_page_urls
 from cms.utils.page_resolver import get_page_queryset
 from cms.utils.placeholder import validate_placeholder_name
 from cms.utils.urlutils import admin_reverse
@@ -49,6 +51,97 @@ PYTHON_VERSION = python_version()
 register = template.Library()
 
 
+def _get_static_page_lookup(value):
+    """
+    Returns the reverse_id given to a tag if it's a plain string
+    literal, that is, if it's known when the template is compiled.
+    """
+    if isinstance(value, StringValue):
+        value = value.var
+
+    if isinstance(value, FilterExpression) and not value.filters:
+        if isinstance(value.var, six.string_types):
+            return value.var
+    return None
+
+
+def _register_static_page_lookup(parser, value):
+    """
+    Records the static reverse_id in «value» (if any) on the template being
+    compiled and returns the set of all the static reverse_ids of that
+    template. The set is shared by all the tags of the template, so once it's
+    compiled, each one of them knows about the lookups of the others.
+    """
+    page_lookups = getattr(parser, '_cms_static_page_lookups', None)
+
+    if page_lookups is None:
+        page_lookups = parser._cms_static_page_lookups = set()
+
+    reverse_id = _get_static_page_lookup(value)
+
+    if reverse_id:
+        page_lookups.add(reverse_id)
+    return page_lookups
+
+
+def _get_request_page_lookups(request):
+    """
+    Returns the dictionary used to memoize the page lookups done by
+    the template tags for the duration of «request».
+    """
+    if not hasattr(request, '_cms_page_lookups'):
+        request._cms_page_lookups = {}
+    return request._cms_page_lookups
+
+
+def _get_pages_by_reverse_id(request, reverse_ids, site_id):
+    """
+    Returns a dictionary mapping each one of «reverse_ids» to its page
+    (or None), fetching all the pages not yet looked up during this request
+    with a single query.
+    """
+    lookups = _get_request_page_lookups(request)
+    missing = [reverse_id for reverse_id in reverse_ids
+               if ('page', reverse_id, site_id) not in lookups]
+
+    if missing:
+        pages = get_page_queryset(request).filter(site=site_id, reverse_id__in=missing)
+        found = dict((page.reverse_id, page) for page in pages)
+
+        for reverse_id in missing:
+            lookups[('page', reverse_id, site_id)] = found.get(reverse_id)
+    return dict((reverse_id, lookups[('page', reverse_id, site_id)])
+                for reverse_id in reverse_ids)
+
+
+def _get_page_urls_by_reverse_id(request, reverse_ids, lang, site_id):
+    """
+    Returns a dictionary mapping each one of «reverse_ids» to the url of its
+    page in «lang» (or None). Urls not yet looked up during this request are
+    fetched from the cache at once, and the ones not in the cache are computed
+    together for all their pages.
+    """
+    lookups = _get_request_page_lookups(request)
+    missing = [reverse_id for reverse_id in reverse_ids
+               if ('url', reverse_id, lang, site_id) not in lookups]
+
+    if missing:
+        urls = get_page_urls_cache(missing, lang, site_id)
+        uncached = [reverse_id for reverse_id in missing if reverse_id not in urls]
+        pages = _get_pages_by_reverse_id(request, uncached, site_id)
+        page_urls = get_page_urls([page for page in pages.values() if page], lang)
+
+        for reverse_id, page in pages.items():
+            if page:
+                urls[reverse_id] = page_urls[page.pk]
+                set_page_url_cache(reverse_id, lang, site_id, urls[reverse_id])
+
+        for reverse_id in missing:
+            lookups[('url', reverse_id, lang, site_id)] = urls.get(reverse_id)
+    return dict((reverse_id, lookups[('url', reverse_id, lang, site_id)])
+                for reverse_id in reverse_ids)
+
+
 def _get_page_by_untyped_arg(page_lookup, request, site_id):
     """
     The `page_lookup` argument can be of any of the following types:
@@ -66,6 +159,11 @@ def _get_page_by_untyped_arg(page_lookup, request, site_id):
             return request.current_page
         return page_lookup
     if isinstance(page_lookup, six.string_types):
+        if request:
+            page = _get_pages_by_reverse_id(request, [page_lookup], site_id)[page_lookup]
+
+            if page:
+                return page
         page_lookup = {'reverse_id': page_lookup}
     elif isinstance(page_lookup, six.integer_types):
         page_lookup = {'pk': page_lookup}
@@ -109,7 +207,22 @@ def _get_page_by_untyped_arg(page_lookup, request, site_id):
             return None
 
 
-class PageUrl(AsTag):
+class StaticPageLookupMixin(object):
+    """
+    Resolves together all the pages that the tags of a template look up by a
+    literal reverse_id, the first time one of those tags is rendered during
+    a request.
+    """
+
+    def __init__(self, parser, tokens):
+        super(StaticPageLookupMixin, self).__init__(parser, tokens)
+        self.static_page_lookups = _register_static_page_lookup(parser, self.kwargs['page_lookup'])
+
+    def prefetch_static_pages(self, request, site_id):
+        _get_pages_by_reverse_id(request, self.static_page_lookups, site_id)
+
+
+class PageUrl(StaticPageLookupMixin, AsTag):
     name = 'page_url'
 
     options = Options(
@@ -146,11 +259,16 @@ class PageUrl(AsTag):
         if lang is None:
             lang = get_language_from_request(request)
 
-        url = get_page_url_cache(page_lookup, lang, site_id)
+        if isinstance(page_lookup, six.string_types):
+            reverse_ids = self.static_page_lookups.union([page_lookup])
+            url = _get_page_urls_by_reverse_id(request, reverse_ids, lang, site_id)[page_lookup]
+        else:
+            url = get_page_url_cache(page_lookup, lang, site_id)
+
         if url is None:
             page = _get_page_by_untyped_arg(page_lookup, request, site_id)
             if page:
-                url = page.get_absolute_url(language=lang)
+                url = get_page_urls([page], lang)[page.pk]
                 set_page_url_cache(page_lookup, lang, site_id, url)
         if url:
             return url
@@ -326,7 +444,7 @@ def render_extra_menu_items(context, obj, template='cms/toolbar/dragitem_extra_m
     return template.render({'items': items})
 
 
-class PageAttribute(AsTag):
+class PageAttribute(StaticPageLookupMixin, AsTag):
     """
     This template node is used to output an attribute from a page such
     as its title or slug.
@@ -388,7 +506,11 @@ class PageAttribute(AsTag):
         name = name.lower()
         request = context['request']
         lang = get_language_from_request(request)
-        page = _get_page_by_untyped_arg(page_lookup, request, get_site_id(None))
+        site_id = get_site_id(None)
+
+        if isinstance(page_lookup, six.string_types):
+            self.prefetch_static_pages(request, site_id)
+        page = _get_page_by_untyped_arg(page_lookup, request, site_id)
         if page and name in self.valid_attributes:
             func = getattr(page, "get_%s" % name)
             ret_val = func(language=lang, fallback=True)
@@ -441,26 +563,45 @@ def _show_uncached_placeholder_by_id(context, *args, **kwargs):
     return _show_placeholder_by_id(context, *args, **kwargs)
 
 
-register.simple_tag(
-    _show_placeholder_by_id,
-    takes_context=True,
-    name='show_placeholder',
-)
-register.simple_tag(
-    _show_placeholder_by_id,
-    takes_context=True,
-    name='show_placeholder_by_id',
-)
-register.simple_tag(
-    _show_uncached_placeholder_by_id,
-    takes_context=True,
-    name='show_uncached_placeholder',
-)
-register.simple_tag(
-    _show_uncached_placeholder_by_id,
-    takes_context=True,
-    name='show_uncached_placeholder_by_id',
-)
+class StaticPageLookupNode(template.Node):
+    """
+    Wraps the node of a show_placeholder tag to resolve together all the
+    pages that the tags of its template look up by a literal reverse_id.
+    """
+
+    def __init__(self, node, static_page_lookups):
+        self.node = node
+        self.static_page_lookups = static_page_lookups
+
+    def render(self, context):
+        content_renderer = context.get('cms_content_renderer')
+
+        if content_renderer and self.static_page_lookups:
+            request = content_renderer.request
+            _get_pages_by_reverse_id(request, self.static_page_lookups, get_site_id(None))
+        return self.node.render(context)
+
+
+def _register_show_placeholder_tag(func, name):
+    register.simple_tag(func, takes_context=True, name=name)
+    compile_func = register.tags[name]
+
+    def compile_show_placeholder(parser, token):
+        node = compile_func(parser, token)
+
+        if len(node.args) > 1:
+            reverse_id = node.args[1]
+        else:
+            reverse_id = node.kwargs.get('reverse_id')
+        static_page_lookups = _register_static_page_lookup(parser, reverse_id)
+        return StaticPageLookupNode(node, static_page_lookups)
+    register.tag(name, compile_show_placeholder)
+
+
+_register_show_placeholder_tag(_show_placeholder_by_id, 'show_placeholder')
+_register_show_placeholder_tag(_show_placeholder_by_id, 'show_placeholder_by_id')
+_register_show_placeholder_tag(_show_uncached_placeholder_by_id, 'show_uncached_placeholder')
+_register_show_placeholder_tag(_show_uncached_placeholder_by_id, 'show_uncached_placeholder_by_id')
 
 
 class CMSToolbar(RenderBlock):
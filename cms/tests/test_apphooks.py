@@ -250,6 +250,29 @@ class ApphooksTestCase(CMSTestCase):
         self.assertContains(response, de_title.title)
         self.apphook_clear()
 
+    @override_settings(ROOT_URLCONF='cms.test_utils.project.second_urls_for_apphook_tests')
+    def test_get_page_for_apphook_from_memory(self):
+        en_title, de_title = self.create_base_structure(APP_NAME, ['en', 'de'])
+        with force_language("en"):
+            path = reverse('sample-settings')
+        request = self.get_request(path)
+        request.LANGUAGE_CODE = 'en'
+
+        # Warm up the in-memory pages
+        applications_page_check(request, path=path[1:])
+
+        with self.assertNumQueries(0):
+            attached_to_page = applications_page_check(request, path=path[1:])
+            self.assertIsNone(applications_page_check(request, path='not-hooked/'))
+        self.assertEqual(attached_to_page.pk, en_title.page.pk)
+        self.assertFalse(attached_to_page.publisher_is_draft)
+
+        # Changing the page refreshes the in-memory pages
+        en_title.page.save()
+        attached_to_page = applications_page_check(request, path=path[1:])
+        self.assertEqual(attached_to_page.pk, en_title.page.pk)
+        self.apphook_clear()
+
     @override_settings(ROOT_URLCONF='cms.test_utils.project.second_urls_for_apphook_tests')
     def test_apphook_permissions(self):
         en_title, de_title = self.create_base_structure(APP_NAME, ['en', 'de'])
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 import copy
+import pickle
+
+from mock import patch
 from cms.test_utils.project.sampleapp.cms_apps import NamespacedApp, SampleApp, SampleApp2
 
 from django.conf import settings
@@ -9,8 +12,10 @@ from django.test.utils import override_settings
 from django.utils.translation import activate
 from cms.apphook_pool import apphook_pool
 from menus.base import NavigationNode
-from menus.menu_pool import menu_pool, _build_nodes_inner_for_one_menu
+from menus.menu_pool import menu_pool, _build_nodes_inner_for_one_menu, _dump_nodes, _load_nodes
 from menus.models import CacheKey
+from menus.modifiers import Level
+from menus.templatetags.menu_tags import cut_levels as cut_menu_levels
 from menus.utils import mark_descendants, find_selected, cut_levels
 
 from cms.api import create_page
@@ -317,15 +322,12 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
     def test_show_menu_num_queries(self):
         context = self.get_context()
         # test standard show_menu
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(3):
             """
             The queries should be:
                 get all public pages
-                get all draft pages from public pages
                 get all page permissions
                 get all titles
-                get the menu cache key
-                set the menu cache key
             """
             tpl = Template("{% load menu_tags %}{% show_menu %}")
             tpl.render(context)
@@ -333,11 +335,9 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
     def test_show_menu_cache_key_leak(self):
         context = self.get_context()
         tpl = Template("{% load menu_tags %}{% show_menu %}")
-        self.assertEqual(CacheKey.objects.count(), 0)
         tpl.render(context)
-        self.assertEqual(CacheKey.objects.count(), 1)
         tpl.render(context)
-        self.assertEqual(CacheKey.objects.count(), 1)
+        self.assertEqual(CacheKey.objects.count(), 0)
 
     def test_menu_cache_draft_only(self):
         # Tests that the cms uses a separate cache for draft & live
@@ -391,7 +391,7 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
 
         self.assertEqual(len(node_ids), page_count, msg='Not all pages in the public menu are public')
 
-    def test_menu_cache_respects_database_keys(self):
+    def test_menu_cache_respects_versions(self):
         public_page = self.get_page(1)
 
         # Prime the public menu cache
@@ -399,49 +399,68 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
         context['request'].session['cms_edit'] = False
 
         # Prime the cache
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(3):
             # The queries should be:
             #     get all public pages
-            #     get all draft pages from public pages
             #     get all page permissions
             #     get all titles
-            #     get the menu cache key
-            #     set the menu cache key
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-        # One new CacheKey should have been created
-        self.assertEqual(CacheKey.objects.count(), 1)
+        # Because its cached, no queries are made to the db
+        with self.assertNumQueries(0):
+            Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-        # Because its cached, only one query is made to the db
-        with self.assertNumQueries(1):
-            # The queries should be:
-            #     get the menu cache key
+        # Another site and language are not affected
+        menu_pool.clear(site_id=2)
+        menu_pool.clear(site_id=1, language='fr')
+
+        with self.assertNumQueries(0):
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-        # Delete the current cache key but don't touch the cache
-        CacheKey.objects.all().delete()
+        # Bump the version of the current site and language
+        menu_pool.clear(site_id=1, language='en')
 
-        # The menu should be recalculated
-        with self.assertNumQueries(6):
-            # The queries should be:
-            #     get all public pages
-            #     get all draft pages from public pages
-            #     get all page permissions
-            #     get all titles
-            #     get the menu cache key
-            #     set the menu cache key
+        # The menu should be recalculated,
+        # the view restrictions are still cached.
+        with self.assertNumQueries(2):
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-    def test_menu_keys_duplicate_clear(self):
-        """
-        Tests that the menu clears all keys, including duplicates.
-        """
-        CacheKey.objects.create(language="fr", site=1, key="a")
-        CacheKey.objects.create(language="fr", site=1, key="a")
+        menu_pool.clear(all=True)
 
-        self.assertEqual(CacheKey.objects.count(), 2)
-        menu_pool.clear(site_id=1, language='fr')
-        self.assertEqual(CacheKey.objects.count(), 0)
+        with self.assertNumQueries(2):
+            Template("{% load menu_tags %}{% show_menu %}").render(context)
+
+    @override_settings(CMS_MENU_FRAGMENT_CACHE=True)
+    def test_menu_fragment_cache(self):
+        page = self.get_page(1)
+        context = self.get_context(path=page.get_absolute_url(), page=page)
+        tpl = Template("{% load menu_tags %}{% show_menu 0 100 0 100 %}|{% show_breadcrumb %}")
+        output = tpl.render(context)
+        self.assertIn(page.get_absolute_url(), output)
+
+        with patch('menus.menu_pool.MenuRenderer.get_nodes') as get_nodes:
+            # The rendered menus are cached
+            self.assertEqual(tpl.render(context), output)
+            # Other arguments are cached separately
+            Template("{% load menu_tags %}{% show_menu 0 1 0 1 %}").render(context)
+        self.assertEqual(get_nodes.call_count, 1)
+
+        # Clearing the menu clears the rendered menus
+        menu_pool.clear(site_id=1)
+
+        with patch('menus.menu_pool.MenuRenderer.get_nodes', return_value=[]) as get_nodes:
+            self.assertNotEqual(tpl.render(context), output)
+        # The breadcrumb doesn't need the menu nodes
+        self.assertEqual(get_nodes.call_count, 1)
+
+        # The menus are not cached for authenticated users
+        with self.login_user_context(self.get_superuser()):
+            context = self.get_context(path=page.get_absolute_url(), page=page)
+            context['request'].session['cms_edit'] = False
+
+            with patch('menus.menu_pool.MenuRenderer.get_nodes', return_value=[]) as get_nodes:
+                tpl.render(context)
+            self.assertEqual(get_nodes.call_count, 1)
 
     def test_only_active_tree(self):
         context = self.get_context(page=self.get_page(1))
@@ -596,6 +615,60 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
         self.assertEqual(isinstance(nodes[0], NavigationNode), True)
         self.assertEqual(nodes[1].get_absolute_url(), page2.get_absolute_url())
 
+    def test_show_breadcrumb_from_page_ancestors(self):
+        page_1 = self.get_page(1)
+        page_1.in_navigation = False
+        page_1.save()
+
+        for page in Page.objects.public():
+            context = self.get_context(path=page.get_absolute_url(), page=page)
+            # The whole menu is loaded by show_menu, the breadcrumb uses it
+            Template("{% load menu_tags %}{% show_menu %}{% show_breadcrumb %}").render(context)
+            expected = [node.get_absolute_url() for node in context['ancestors']]
+
+            context = self.get_context(path=page.get_absolute_url(), page=page)
+            tpl = Template("{% load menu_tags %}{% show_breadcrumb %}")
+
+            with patch('menus.menu_pool.MenuRenderer.get_nodes') as get_nodes:
+                tpl.render(context)
+            self.assertFalse(get_nodes.called)
+            self.assertEqual([node.get_absolute_url() for node in context['ancestors']], expected)
+
+        # The breadcrumb of a page is cached with the menu
+        menu_pool.clear(site_id=1)
+        page = self.get_page(4)
+        context = self.get_context(path=page.get_absolute_url(), page=page)
+
+        with self.assertNumQueries(2):
+            # The queries should be:
+            #     get the page, its ancestors and the root pages
+            #     get the titles
+            # The view restrictions are cached separately from the menu.
+            Template("{% load menu_tags %}{% show_breadcrumb %}").render(context)
+
+        context = self.get_context(path=page.get_absolute_url(), page=page)
+
+        with self.assertNumQueries(0):
+            Template("{% load menu_tags %}{% show_breadcrumb %}").render(context)
+        self.assertEqual(len(context['ancestors']), 2)
+
+    def test_show_breadcrumb_with_other_menus(self):
+        """
+        The nodes of other menus can be part of the breadcrumb,
+        the whole menu is used when they're registered.
+        """
+        from menus.menu_pool import MenuRenderer
+
+        page = self.get_page(4)
+        context = self.get_context(path=page.get_absolute_url(), page=page)
+        menu_pool.menus['SampleAppMenu'] = SampleAppMenu
+        get_nodes = MenuRenderer.get_nodes
+
+        with patch.object(MenuRenderer, 'get_nodes', autospec=True, side_effect=get_nodes) as mocked:
+            Template("{% load menu_tags %}{% show_breadcrumb %}").render(context)
+        self.assertTrue(mocked.called)
+        self.assertEqual(len(context['ancestors']), 2)
+
     def test_language_chooser(self):
         # test simple language chooser with default args
         lang_settings = copy.deepcopy(get_cms_setting('LANGUAGES'))
@@ -773,12 +846,144 @@ class MenuTests(BaseMenuTest):
 
     def test_build_nodes_inner_for_circular_menu(self):
         '''
-        TODO:
-            To properly handle this test we need to have a circular dependency
-            detection system.
-            Go nuts implementing it :)
+            Tests a circular menu tree
+
+            node1
+             node2
+
+            node3 <-> node4
+             node5
+        '''
+        node1 = NavigationNode('Test1', '/test1/', 1, None)
+        node2 = NavigationNode('Test2', '/test2/', 2, 1)
+        node3 = NavigationNode('Test3', '/test3/', 3, 4)
+        node4 = NavigationNode('Test4', '/test4/', 4, 3)
+        node5 = NavigationNode('Test5', '/test5/', 5, 3)
+
+        menu_class_name = 'Test'
+        nodes = [node5, node3, node2, node4, node1]
+
+        final_list = _build_nodes_inner_for_one_menu(nodes, menu_class_name)
+        self.assertEqual(final_list, [node1, node2])
+
+        self.assertEqual(node2.parent, node1)
+        self.assertEqual(node3.parent, None)
+        self.assertEqual(node4.parent, None)
+        self.assertEqual(node5.parent, None)
+
+        self.assertEqual(node1.children, [node2])
+        self.assertEqual(node3.children, [])
+        self.assertEqual(node4.children, [])
+
+    def test_build_nodes_inner_keeps_namespaces(self):
+        '''
+            Tests that nodes with the same id in different namespaces
+            are attached to the parent in their own namespace.
         '''
-        pass
+        node1 = NavigationNode('Test1', '/test1/', 1, None)
+        node2 = NavigationNode('Test2', '/test2/', 1, None)
+        node3 = NavigationNode('Test3', '/test3/', 2, 1)
+        node4 = NavigationNode('Test4', '/test4/', 2, 1)
+        node5 = NavigationNode('Test5', '/test5/', 3, 2)
+        node2.namespace = 'Other'
+        node3.namespace = 'Other'
+
+        menu_class_name = 'Test'
+        nodes = [node5, node4, node3, node2, node1]
+
+        final_list = _build_nodes_inner_for_one_menu(nodes, menu_class_name)
+        self.assertEqual(final_list, [node2, node3, node1, node4, node5])
+
+        self.assertEqual(node3.parent, node2)
+        self.assertEqual(node3.parent_namespace, 'Test')
+        self.assertEqual(node4.parent, node1)
+        self.assertEqual(node4.namespace, 'Test')
+        self.assertEqual(node5.parent, node4)
+        self.assertEqual(node1.children, [node4])
+        self.assertEqual(node2.children, [node3])
+
+    def test_dump_and_load_nodes(self):
+        node1 = NavigationNode('Test1', '/test1/', 1, attr={'reverse_id': 'a'})
+        node2 = NavigationNode('Test2', '/test2/', 2, 1, attr={'reverse_id': 'b'})
+        node3 = NavigationNode('Test3', '/test3/', 3, 1)
+        node4 = NavigationNode('Test4', '/test4/', 4, 2, visible=False)
+        node3.soft_root = True
+
+        nodes = _build_nodes_inner_for_one_menu([node1, node2, node3, node4], 'Test')
+        data = _dump_nodes(nodes)
+        # The flat format is smaller than the nodes
+        self.assertLess(len(pickle.dumps(data)), len(pickle.dumps(nodes)))
+
+        loaded = _load_nodes(pickle.loads(pickle.dumps(data)))
+        self.assertEqual(len(loaded), 4)
+        self.assertEqual([node.title for node in loaded], ['Test1', 'Test2', 'Test3', 'Test4'])
+        node1, node2, node3, node4 = loaded
+
+        self.assertEqual(node1.parent, None)
+        self.assertEqual(node1.children, [node2, node3])
+        self.assertEqual(node2.parent, node1)
+        self.assertEqual(node2.children, [node4])
+        self.assertEqual(node4.parent, node2)
+        self.assertEqual(node2.attr, {'reverse_id': 'b'})
+        self.assertEqual(node3.attr, {})
+        self.assertEqual(node2.namespace, 'Test')
+        self.assertEqual(node2.parent_namespace, 'Test')
+        self.assertEqual(node2.get_absolute_url(), '/test2/')
+        self.assertFalse(node4.visible)
+        self.assertTrue(node3.soft_root)
+        self.assertFalse(hasattr(node2, 'soft_root'))
+        self.assertFalse(node2.selected)
+
+        # Attributes set on the nodes after the dump are not cached
+        nodes[2].menu_level = 1
+        self.assertFalse(hasattr(_load_nodes(data)[2], 'menu_level'))
+
+    def test_build_nodes_inner_sets_levels(self):
+        node1 = NavigationNode('Test1', '/test1/', 1)
+        node2 = NavigationNode('Test2', '/test2/', 2, 1)
+        node3 = NavigationNode('Test3', '/test3/', 3, 2)
+        node4 = NavigationNode('Test4', '/test4/', 4)
+        node5 = NavigationNode('Test5', '/test5/', 5, 4)
+
+        nodes = _build_nodes_inner_for_one_menu([node3, node2, node1, node4, node5], 'Test')
+        self.assertEqual([node.level for node in nodes], [0, 1, 2, 0, 1])
+        self.assertEqual([node.level for node in _load_nodes(_dump_nodes(nodes))], [0, 1, 2, 0, 1])
+
+        # Move node4 under node3, like a navigation extender would
+        node4.parent = node3
+        node3.children.append(node4)
+        # and make node2 a root, like the soft root cutter would
+        node2.parent = None
+
+        request = self.get_request('/')
+        renderer = menu_pool.get_renderer(request)
+        nodes = Level(renderer).modify(request, nodes, None, None, False, False)
+        self.assertEqual(node1.level, 0)
+        self.assertEqual(node2.level, 0)
+        self.assertEqual(node3.level, 1)
+        self.assertEqual(node4.level, 2)
+        self.assertEqual(node5.level, 3)
+
+    def test_cut_levels_filters_nodes(self):
+        root = NavigationNode('Root', '/', 1)
+        children = [NavigationNode('Test%s' % pk, '/test%s/' % pk, pk, 1) for pk in range(2, 12)]
+        grandchild = NavigationNode('Deep', '/deep/', 12, 2)
+        hidden_root = NavigationNode('Hidden', '/hidden/', 13, visible=False)
+
+        for node in children[::2]:
+            node.visible = False
+
+        nodes = _build_nodes_inner_for_one_menu([root] + children + [grandchild, hidden_root], 'Test')
+
+        for node in nodes:
+            node.selected = node is root
+            node.descendant = node is not root
+
+        final = cut_menu_levels(nodes, 0, 1, 0, 100)
+        self.assertEqual(final, [root])
+        # Hidden children and nodes deeper than to_level are removed
+        self.assertEqual(root.children, children[1::2])
+        self.assertEqual(children[0].children, [])
 
     def test_build_nodes_inner_for_broken_menu(self):
         '''
@@ -1031,15 +1236,12 @@ class ShowSubMenuCheck(SubMenusFixture, BaseMenuTest):
         context = self.get_context(page.get_absolute_url(), page=page)
 
         # test standard show_menu
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(3):
             """
             The queries should be:
                 get all public pages
-                get all draft pages for public pages
                 get all page permissions
                 get all titles
-                get the menu cache key
-                set the menu cache key
             """
             tpl = Template("{% load menu_tags %}{% show_sub_menu %}")
             tpl.render(context)
@@ -1206,15 +1408,12 @@ class ShowMenuBelowIdTests(BaseMenuTest):
 
         with LanguageOverride('en'):
             context = self.get_context(a.get_absolute_url())
-            with self.assertNumQueries(6):
+            with self.assertNumQueries(3):
                 """
                 The queries should be:
                     get all public pages
-                    get all draft pages for public pages
                     get all page permissions
                     get all titles
-                    get the menu cache key
-                    set the menu cache key
                 """
                 # Actually seems to run:
                 tpl = Template("{% load menu_tags %}{% show_menu_below_id 'a' 0 100 100 100 %}")
@@ -520,6 +520,38 @@ class ViewPermissionComplexMenuAllNodesTests(ViewPermissionTests):
         self.assertViewAllowed(urls["/en/page_d/"], user)
         self.assertViewAllowed(urls["/en/page_d/page_d_a/"], user)
 
+    def test_menu_nodes_shared_by_users(self):
+        """
+        The node tree is cached once for all users, view restrictions
+        are applied to it on each request.
+        """
+        self._setup_user_groups()
+        all_pages = self._setup_tree_pages()
+        self._setup_view_restrictions()
+        urls = self.get_url_dict(all_pages)
+        menu_pool.clear(all=True)
+
+        if get_user_model().USERNAME_FIELD == 'email':
+            user = get_user_model().objects.get(email='user_1@django-cms.org')
+        else:
+            user = get_user_model().objects.get(username='user_1')
+
+        anonymous_renderer = menu_pool.get_renderer(self.get_request())
+        user_renderer = menu_pool.get_renderer(self.get_request(user))
+        self.assertEqual(
+            anonymous_renderer._get_cache_key(1),
+            user_renderer._get_cache_key(1),
+        )
+        # Builds the shared tree
+        self.assertNotInMenu(urls["/en/page_b/"], AnonymousUser())
+
+        with self.assertNumQueries(4):
+            # The user permissions (to know if the user can see
+            # all pages) and the user groups. No pages are queried.
+            nodes = user_renderer.get_nodes()
+        self.assertIn(urls["/en/page_b/"].get_absolute_url(), [node.get_absolute_url() for node in nodes])
+        self.assertNotIn(urls["/en/page_d/"].get_absolute_url(), [node.get_absolute_url() for node in nodes])
+
     def test_non_view_permission_doesnt_hide(self):
         """
         PagePermissions with can_view=False shouldn't hide pages in the menu.
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 import json
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from mock import patch
+
 from djangocms_text_ckeditor.models import Text
+from djangocms_text_ckeditor.utils import plugin_tags_to_id_list, plugin_to_tag
 
 from cms.api import create_page, add_plugin
 from cms.constants import PLUGIN_MOVE_ACTION
@@ -10,9 +16,9 @@ from cms.models.placeholdermodel import Placeholder
 from cms.models.pluginmodel import CMSPlugin
 from cms.tests.test_plugins import PluginsTestBaseCase
 from cms.utils.compat.tests import UnittestCompatMixin
-from cms.utils.copy_plugins import copy_plugins_to
+from cms.utils.copy_plugins import bulk_copy_plugins, copy_plugins_to
 from cms.utils.i18n import force_language
-from cms.utils.plugins import reorder_plugins
+from cms.utils.plugins import move_plugin_tree, reorder_plugins, REORDER_BATCH_SIZE
 
 
 class NestedPluginsTestCase(PluginsTestBaseCase, UnittestCompatMixin):
@@ -293,6 +299,136 @@ class NestedPluginsTestCase(PluginsTestBaseCase, UnittestCompatMixin):
             "Plugin order not preserved during fix_tree().")
 
 
+    def test_reorder_plugins(self):
+        placeholder = Placeholder.objects.create(slot=u"some_slot")
+        plugins = [
+            add_plugin(placeholder, u"TextPlugin", u"en", body=u"%d" % index)
+            for index in range(REORDER_BATCH_SIZE + 10)
+        ]
+        order = [plugin.pk for plugin in reversed(plugins)]
+
+        # One update per batch of plugins
+        with self.assertNumQueries(2):
+            reorder_plugins(placeholder, None, u"en", order)
+        self.assertEqual(placeholder.get_plugin_tree_order(u"en"), order)
+
+        # Without an order, the positions are made contiguous
+        CMSPlugin.objects.filter(pk=order[0]).update(position=1000)
+        reorder_plugins(placeholder, None, u"en", [])
+        positions = placeholder.get_plugins(u"en").order_by('position').values_list('position', flat=True)
+        self.assertEqual(list(positions), list(range(len(order))))
+        self.assertEqual(placeholder.get_plugin_tree_order(u"en"), order[1:] + order[:1])
+
+    def test_move_plugin_tree(self):
+        source = Placeholder.objects.create(slot=u"source")
+        target = Placeholder.objects.create(slot=u"target")
+        parent = add_plugin(source, u"TextPlugin", u"en", body=u"parent")
+        child = add_plugin(source, u"TextPlugin", u"en", body=u"child", target=parent)
+        add_plugin(source, u"TextPlugin", u"en", body=u"grandchild", target=child)
+        target_parent = add_plugin(target, u"TextPlugin", u"de", body=u"target")
+
+        move_plugin_tree(self.reload(child), target, u"de", parent=target_parent)
+
+        child = self.reload(child)
+        self.assertEqual(child.parent_id, target_parent.pk)
+        self.assertEqual(child.depth, 2)
+        self.assertTrue(child.path.startswith(target_parent.path))
+        self.assertEqual(self.reload(parent).numchild, 0)
+        self.assertEqual(self.reload(target_parent).numchild, 1)
+
+        tree = CMSPlugin.get_tree(child)
+        self.assertEqual(tree.count(), 2)
+        self.assertEqual(tree.filter(placeholder=target, language=u"de").count(), 2)
+
+        # Back to the root of the source placeholder
+        move_plugin_tree(child, source, u"en")
+        child = self.reload(child)
+        self.assertIsNone(child.parent_id)
+        self.assertEqual(child.depth, 1)
+        self.assertEqual(CMSPlugin.get_tree(child).filter(placeholder=source, language=u"en").count(), 2)
+
+    def test_bulk_copy_plugins(self):
+        source = Placeholder.objects.create(slot=u"source")
+        target = Placeholder.objects.create(slot=u"target")
+
+        for index in range(3):
+            text = add_plugin(source, u"TextPlugin", u"en", body=u"text %d" % index)
+            link = add_plugin(source, u"LinkPlugin", u"en", target=text, name=u"link %d" % index, external_link=u"http://example.com")
+            text = self.reload(text)
+            text.body += plugin_to_tag(link)
+            text.save()
+            add_plugin(source, u"TextPlugin", u"en", target=self.reload(text), body=u"nested %d" % index)
+
+        target_parent = add_plugin(target, u"TextPlugin", u"de", body=u"parent")
+        # The copies go after the existing children
+        existing = add_plugin(target, u"TextPlugin", u"de", target=target_parent, body=u"existing")
+        old_plugins = source.get_plugins_list(u"en")
+        copied = bulk_copy_plugins(old_plugins, target, u"de", parent_plugin_id=target_parent.pk)
+        new_ids = dict((old.pk, new.pk) for new, old in copied)
+
+        self.assertEqual(len(copied), 9)
+        self.assertEqual(CMSPlugin.find_problems(), ([], [], [], [], []))
+        self.assertEqual(self.reload(target_parent).numchild, 4)
+        children = [child.pk for child in self.reload(target_parent).get_children()]
+        self.assertEqual(children[0], existing.pk)
+        self.assertEqual(children[1:], [new.pk for new, old in copied if new.parent_id == target_parent.pk])
+
+        for new, old in copied:
+            self.assertEqual(new.plugin_type, old.plugin_type)
+            self.assertEqual(new.position, old.position)
+            self.assertEqual(new.language, u"de")
+            self.assertEqual(new.placeholder_id, target.pk)
+            self.assertEqual(new.parent_id, new_ids.get(old.parent_id, target_parent.pk))
+
+        # Embedded plugins reference the copies
+        new_text = copied[0][0].get_plugin_instance()[0]
+        new_link = copied[1][0].get_plugin_instance()[0]
+        self.assertEqual(new_link.name, u"link 0")
+        self.assertEqual(plugin_tags_to_id_list(new_text.body), [new_link.pk])
+
+    def test_bulk_copy_plugins_queries(self):
+        source = Placeholder.objects.create(slot=u"source")
+        target = Placeholder.objects.create(slot=u"target")
+
+        def copy_links(count):
+            for index in range(count):
+                add_plugin(source, u"LinkPlugin", u"en", name=u"link", external_link=u"http://example.com")
+
+            old_plugins = source.get_plugins_list(u"en")
+
+            with CaptureQueriesContext(connection) as context:
+                bulk_copy_plugins(old_plugins, target, u"de")
+            return len(context.captured_queries)
+
+        # Warms up the attached object lookup of the target placeholder
+        copy_links(1)
+        # The number of queries doesn't depend on the number of plugins
+        self.assertEqual(copy_links(2), copy_links(20))
+        self.assertEqual(target.get_plugins(u"de").count(), 1 + 3 + 23)
+
+    def test_bulk_copy_plugins_post_copy(self):
+        source = Placeholder.objects.create(slot=u"source")
+        target = Placeholder.objects.create(slot=u"target")
+
+        for index in range(2):
+            link = add_plugin(source, u"LinkPlugin", u"en", name=u"link", external_link=u"http://example.com")
+            add_plugin(source, u"TextPlugin", u"en", target=link, body=u"nested %d" % index)
+
+        link_model = self.get_plugin_model(u"LinkPlugin")
+
+        with patch.object(link_model, 'post_copy') as post_copy:
+            copied = bulk_copy_plugins(source.get_plugins_list(u"en"), target, u"de")
+
+        # Each link only gets the copies of its own tree
+        self.assertEqual(post_copy.call_count, 2)
+        self.assertEqual(post_copy.call_args_list[0][0], (copied[0][1], copied[0:2]))
+        self.assertEqual(post_copy.call_args_list[1][0], (copied[2][1], copied[2:4]))
+
+        # Models that don't override post_copy are skipped
+        with patch.object(CMSPlugin, 'post_copy') as post_copy:
+            bulk_copy_plugins(target.get_plugins_list(u"de")[:1], source, u"en")
+        self.assertFalse(post_copy.called)
+
     def test_plugin_deep_nesting_and_copying(self):
         """
         Create a deeply-nested plugin structure, tests its properties, and tests
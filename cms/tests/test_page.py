@@ -12,7 +12,9 @@ from django.core.urlresolvers import reverse
 from django.db import transaction
 from django.db.models import signals
 from django.http import HttpResponse, HttpResponseNotFound
+from django.test.utils import override_settings
 from django.utils.timezone import now as tz_now
+from mock import patch
 
 from cms import constants
 from cms.api import create_page, add_plugin, create_title, publish_page
@@ -23,11 +25,11 @@ from cms.models.placeholdermodel import Placeholder
 from cms.models.pluginmodel import CMSPlugin
 from cms.signals import pre_save_page, post_save_page
 from cms.sitemaps import CMSSitemap
-from cms.test_utils.testcases import CMSTestCase
+from cms.test_utils.testcases import CMSTestCase, TransactionCMSTestCase
 from cms.utils import get_cms_setting
 from cms.utils.i18n import force_language
 from cms.utils.page_resolver import get_page_from_request, is_valid_url
-from cms.utils.page import is_valid_page_slug, get_available_slug
+from cms.utils.page import is_valid_page_slug, get_available_slug, get_page_urls
 
 
 class PageMigrationTestCase(CMSTestCase):
@@ -66,6 +68,27 @@ class PagesTestCase(CMSTestCase):
             self.assertEqual(page_2.get_absolute_url(language='en'), '/en/inner/')
             self.assertEqual(page_2.get_absolute_url(language='fr'), '/fr/french-inner/')
 
+    def test_get_page_urls(self):
+        home = create_page("home", "nav_playground.html", "en", published=True)
+        page_1 = create_page("page 1", "nav_playground.html", "en", published=True, parent=home)
+        page_2 = create_page("page 2", "nav_playground.html", "en", published=True, parent=page_1)
+        create_title("fr", "page deux", page_2)
+        page_ids = [home.pk, page_1.pk, page_2.pk]
+
+        with self.assertNumQueries(2):
+            # One query for the pages and one for their titles
+            pages = list(Page.objects.filter(pk__in=page_ids))
+            urls = get_page_urls(pages, 'fr')
+
+        self.assertEqual(urls[home.pk], '/fr/')
+        # page 1 has no french title so it falls back to english
+        self.assertEqual(urls[page_1.pk], '/fr/page-1/')
+        self.assertEqual(urls[page_2.pk], '/fr/page-1/page-deux/')
+
+        for page in Page.objects.filter(pk__in=page_ids):
+            self.assertEqual(get_page_urls([page], 'fr')[page.pk], page.get_absolute_url('fr'))
+            self.assertEqual(get_page_urls([page], 'en')[page.pk], page.get_absolute_url('en'))
+
     def test_treebeard_delete(self):
         """
         This is a test for #4102
@@ -709,6 +732,109 @@ class PagesTestCase(CMSTestCase):
         page = get_page_from_request(request)
         self.assertEqual(page, None)
 
+    def test_get_page_from_request_uses_routing_index(self):
+        root = create_page("root", "nav_playground.html", "en", slug="root",
+                           published=True)
+        page = create_page("page", "nav_playground.html", "en", slug="page",
+                           published=True, parent=root)
+        url = page.get_absolute_url()
+
+        # build the routing index
+        found_page = get_page_from_request(self.get_request(url))
+        self.assertEqual(found_page.pk, page.publisher_public_id)
+
+        with self.assertNumQueries(1):
+            # Only the page itself is loaded
+            found_page = get_page_from_request(self.get_request(url))
+        self.assertEqual(found_page.pk, page.publisher_public_id)
+
+    @override_settings(CMS_ROUTING_INDEX_TIMEOUT=0)
+    def test_routing_index_timeout(self):
+        root = create_page("root", "nav_playground.html", "en", slug="root",
+                           published=True)
+        page = create_page("page", "nav_playground.html", "en", slug="page",
+                           published=True, parent=root)
+        url = page.get_absolute_url()
+
+        self.assertIsNotNone(get_page_from_request(self.get_request(url)))
+        # The change isn't signaled, like one made by another process
+        # with a cache that isn't shared.
+        Title.objects.filter(page=page.publisher_public_id).update(path='moved')
+        self.assertIsNone(get_page_from_request(self.get_request(url)))
+        self.assertIsNotNone(get_page_from_request(self.get_request('/en/moved/')))
+
+    def test_routing_index_invalidation(self):
+        root = create_page("root", "nav_playground.html", "en", slug="root",
+                           published=True)
+        page = create_page("page", "nav_playground.html", "en", slug="page",
+                           published=True, parent=root)
+        url = page.get_absolute_url()
+
+        self.assertIsNotNone(get_page_from_request(self.get_request(url)))
+
+        page.unpublish('en')
+        self.assertIsNone(get_page_from_request(self.get_request(url)))
+
+        page = page.reload()
+        page.publish('en')
+        self.assertIsNotNone(get_page_from_request(self.get_request(url)))
+
+        title = page.get_title_obj('en')
+        title.slug = 'moved'
+        title.save()
+        page.reload().publish('en')
+        self.assertIsNone(get_page_from_request(self.get_request(url)))
+        self.assertIsNotNone(get_page_from_request(self.get_request('/en/moved/')))
+
+        tomorrow = tz_now() + datetime.timedelta(days=1)
+        root = root.reload()
+        root.publication_date = tomorrow
+        root.save()
+        root.publish('en')
+        self.assertIsNone(get_page_from_request(self.get_request('/en/moved/')))
+
+    def test_effective_publication_dates(self):
+        yesterday = tz_now() - datetime.timedelta(days=1)
+        tomorrow = tz_now() + datetime.timedelta(days=1)
+        next_week = tz_now() + datetime.timedelta(days=7)
+        root = create_page("root", "nav_playground.html", "en", slug="root",
+                           published=True)
+        parent = create_page("parent", "nav_playground.html", "en", slug="parent",
+                             publication_end_date=next_week,
+                             published=True, parent=root)
+        child = create_page("child", "nav_playground.html", "en", slug="child",
+                            published=True, parent=parent)
+        child_public = child.publisher_public.reload()
+        self.assertEqual(child_public.effective_publication_end_date, next_week)
+        self.assertEqual(child_public.effective_publication_date, child_public.publication_date)
+
+        # Changing the window of an ancestor updates its descendants
+        parent = parent.reload()
+        parent.publication_date = tomorrow
+        parent.save()
+        parent.publish('en')
+        child_public = child_public.reload()
+        self.assertEqual(child_public.effective_publication_date, tomorrow)
+        self.assertEqual(child_public.effective_publication_end_date, next_week)
+        self.assertFalse(Page.objects.public().published().filter(pk=child_public.pk).exists())
+        self.assertNotIn(
+            child_public.pk,
+            [title.page_id for title in CMSSitemap().items()],
+        )
+
+        # Moving the page out of the section drops the ancestor window
+        child = self.move_page(child.reload(), root.reload())
+        child_public = child.publisher_public.reload()
+        self.assertEqual(child_public.effective_publication_date, child_public.publication_date)
+        self.assertIsNone(child_public.effective_publication_end_date)
+        self.assertTrue(Page.objects.public().published().filter(pk=child_public.pk).exists())
+
+        parent = parent.reload()
+        parent.publication_date = yesterday
+        parent.publication_end_date = None
+        parent.save()
+        self.assertIsNone(parent.reload().effective_publication_end_date)
+
     def test_page_already_expired(self):
         """
         Test that a page which has a end date in the past gives a 404, not a
@@ -1035,6 +1161,105 @@ class PreviousFilteredSiblingsTests(CMSTestCase):
         self.assertEqual(home.get_previous_filtered_sibling(), None)
 
 
+class PageDeletionTests(TransactionCMSTestCase):
+    """
+    post_bulk_delete is sent once the deletion is committed,
+    these tests need real transactions.
+    """
+
+    def _connect_post_bulk_delete(self):
+        from cms.signals import post_bulk_delete
+
+        deleted = {}
+
+        def receiver(sender, pk_set, **kwargs):
+            self.assertNotIn(sender, deleted)
+            deleted[sender] = pk_set
+
+        post_bulk_delete.connect(receiver)
+        self.addCleanup(post_bulk_delete.disconnect, receiver)
+        return deleted
+
+    def test_delete_page_tree(self):
+        """
+        Deleting a page deletes its descendants, their public versions,
+        titles, placeholders and plugins in bulk and sends post_bulk_delete.
+        """
+        home = create_page("home", "nav_playground.html", "en", published=True)
+        parent = create_page("parent", "nav_playground.html", "en", published=True, parent=home)
+        child = create_page("child", "nav_playground.html", "en", published=True, parent=parent)
+        create_title("de", "kind", child)
+        create_page("sibling", "nav_playground.html", "en", published=True, parent=home)
+
+        for page in (parent, child):
+            placeholder = page.placeholders.get(slot='body')
+            link = add_plugin(placeholder, 'LinkPlugin', 'en', name='link', external_link='http://example.com')
+            add_plugin(placeholder, 'TextPlugin', 'en', body='text', target=link)
+            page.publish('en')
+
+        placeholder_ids = list(
+            Placeholder
+            .objects
+            .filter(page__in=[parent, child, parent.publisher_public, child.publisher_public])
+            .values_list('pk', flat=True)
+        )
+        deleted = self._connect_post_bulk_delete()
+        Page.objects.get(pk=parent.pk).delete()
+
+        self.assertEqual(
+            set(Page.objects.values_list('title_set__title', flat=True)),
+            {'home', 'sibling'},
+        )
+        self.assertEqual(Page.objects.count(), 4)
+        self.assertFalse(Title.objects.filter(title__in=['parent', 'child', 'kind']).exists())
+        self.assertFalse(Placeholder.objects.filter(pk__in=placeholder_ids).exists())
+        self.assertEqual(CMSPlugin.objects.count(), 0)
+        self.assertEqual(self.get_plugin_model('TextPlugin').objects.count(), 0)
+        self.assertEqual(len(deleted[Page]), 4)
+        self.assertEqual(len(deleted[CMSPlugin]), 8)
+        self.assertEqual(deleted[Placeholder], set(placeholder_ids))
+        self.assertEqual(Page.objects.get(pk=home.pk).numchild, 1)
+        self.assertEqual(Page.objects.get(pk=home.publisher_public_id).numchild, 1)
+        self.assertEqual(Page.get_tree().count(), 4)
+
+    def test_delete_page_queryset(self):
+        """
+        Deleting a queryset of pages, like the admin "delete selected"
+        action does, goes through the bulk deletion as well.
+        """
+        home = create_page("home", "nav_playground.html", "en", published=True)
+        pages = [create_page("page %d" % index, "nav_playground.html", "en", published=True, parent=home)
+                 for index in range(3)]
+        create_page("child", "nav_playground.html", "en", published=True, parent=pages[0])
+        deleted = self._connect_post_bulk_delete()
+
+        # The ids are sent in batches
+        with patch('cms.utils.deletion.DELETE_BATCH_SIZE', 2):
+            count, counts = Page.objects.filter(pk__in=[page.pk for page in pages[:2]]).delete()
+
+        self.assertEqual(counts['cms.Page'], 6)
+        self.assertEqual(counts['cms.Title'], 6)
+        self.assertEqual(counts['cms.Placeholder'], len(deleted[Placeholder]))
+        self.assertEqual(count, sum(counts.values()))
+        self.assertEqual(len(deleted[Page]), 6)
+        self.assertEqual(Page.objects.count(), 4)
+        self.assertEqual(Page.objects.get(pk=home.pk).numchild, 1)
+
+    def test_delete_page_rollback(self):
+        page = create_page("page", "nav_playground.html", "en", published=True)
+        deleted = self._connect_post_bulk_delete()
+
+        try:
+            with transaction.atomic():
+                page.delete()
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(deleted, {})
+        self.assertEqual(Page.objects.count(), 2)
+
+
 class PageTreeTests(CMSTestCase):
 
     def test_rename_node(self):
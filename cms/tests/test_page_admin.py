@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 import datetime
+import json
 
 from django.core.cache import cache
 from django.contrib import admin
 from django.contrib.sites.models import Site
+from django.db import connection
 from django.forms.models import model_to_dict
 from django.http import HttpRequest
 from django.test.html import HTMLParseError, Parser
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils import six
 from django.utils.encoding import force_text
 from django.utils.timezone import now as tz_now
@@ -1159,6 +1161,79 @@ class PageTest(PageTestBase):
             content = force_text(parsed)
             self.assertIn(tree, content)
 
+    def test_page_get_tree_endpoint_queries(self):
+        superuser = self.get_superuser()
+        endpoint = admin_reverse('get_tree')
+
+        def get_num_queries():
+            with self.login_user_context(superuser):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(endpoint)
+                    self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        for index in range(3):
+            page = create_page('Root %d' % index, 'nav_playground.html', 'en')
+            create_page('Child %d' % index, 'nav_playground.html', 'en', parent=page)
+
+        # Warm up the caches
+        get_num_queries()
+        num_queries = get_num_queries()
+
+        for index in range(3, 6):
+            page = create_page('Root %d' % index, 'nav_playground.html', 'en')
+            create_page('Child %d' % index, 'nav_playground.html', 'en', parent=page)
+
+        # The number of queries doesn't depend on the number of rows
+        self.assertEqual(get_num_queries(), num_queries)
+
+    def test_page_get_tree_data_endpoint(self):
+        superuser = self.get_superuser()
+        endpoint = admin_reverse('get_tree_data')
+
+        create_page('Home', 'nav_playground.html', 'en', published=True)
+        alpha = create_page('Alpha', 'nav_playground.html', 'en')
+        create_page('Beta', 'nav_playground.html', 'en', parent=alpha)
+        create_page('Gamma', 'nav_playground.html', 'en')
+
+        with self.login_user_context(superuser):
+            response = self.client.get(endpoint, data={'limit': 2})
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(force_text(response.content))
+            self.assertEqual([row['title'] for row in data['rows']], ['Home', 'Alpha'])
+            self.assertEqual(data['next'], alpha.reload().path)
+            self.assertEqual(data['rows'][0]['publish_state']['en'], 'published')
+            self.assertEqual(data['rows'][0]['publish_state']['fr'], 'empty')
+            self.assertFalse(data['rows'][0]['has_children'])
+            self.assertTrue(data['rows'][1]['has_children'])
+            self.assertTrue(data['rows'][1]['permissions']['move_page'])
+
+            response = self.client.get(endpoint, data={'limit': 2, 'after': data['next']})
+            data = json.loads(force_text(response.content))
+            self.assertEqual([row['title'] for row in data['rows']], ['Gamma'])
+            self.assertIsNone(data['next'])
+
+            response = self.client.get(endpoint, data={'pageId': alpha.pk})
+            data = json.loads(force_text(response.content))
+            self.assertEqual([row['title'] for row in data['rows']], ['Beta'])
+            self.assertEqual(data['rows'][0]['publish_state']['en'], 'unpublished')
+
+            response = self.client.get(endpoint, data={'pageId': 'alpha'})
+            self.assertEqual(response.status_code, 400)
+
+    def test_page_get_tree_data_endpoint_permissions(self):
+        endpoint = admin_reverse('get_tree_data')
+        create_page('Home', 'nav_playground.html', 'en', published=True)
+
+        response = self.client.get(endpoint)
+        # Anonymous users are redirected to the admin login
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('Home', force_text(response.content))
+
+        with self.login_user_context(self.get_staff_user_with_no_permissions()):
+            response = self.client.get(endpoint)
+            self.assertEqual(response.status_code, 403)
+
     def test_page_changelist_search(self):
         superuser = self.get_superuser()
         endpoint = self.get_admin_url(Page, 'changelist')
@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
+from django.contrib.auth.models import Group
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.test.utils import override_settings
+from mock import patch
 
 from cms.api import create_page, assign_user_to_page
 from cms.cache.permissions import (get_permission_cache, set_permission_cache,
-                                   clear_user_permission_cache)
+                                   clear_group_permission_cache, clear_user_permission_cache)
+from cms.models import ACCESS_CHOICES, Page, PagePermission
 from cms.test_utils.testcases import CMSTestCase
-from cms.utils.page_permissions import get_change_id_list
+from cms.utils import page_permissions
+from cms.utils.admin import PAGE_TREE_ACTIONS
+from cms.utils.page_permissions import (get_change_id_list, get_page_permissions_matrix,
+                                        has_generic_permission, user_can_change_page)
+from cms.utils.permissions import get_view_restrictions, load_ancestors
 
 
 @override_settings(CMS_PERMISSION=True)
@@ -45,6 +53,61 @@ class PermissionCacheTests(CMSTestCase):
         cached_permissions = get_permission_cache(self.user_normal, "change_page")
         self.assertIsNone(cached_permissions)
 
+    def test_granular_cache_invalidation(self):
+        """
+        Test that permission changes only clear the cache
+        of the users they affect
+        """
+        group = Group.objects.create(name="editors")
+        user_in_group = self._create_user("grouped", is_staff=True,
+                                          add_default_permissions=True)
+        user_in_group.groups.add(group)
+        users = [self.user_normal, user_in_group]
+
+        for user in users:
+            set_permission_cache(user, "change_page", {})
+
+        # Other users keep their cached permissions
+        assign_user_to_page(self.home_page, self.user_normal, can_change=True)
+        self.assertIsNone(get_permission_cache(self.user_normal, "change_page"))
+        self.assertEqual(get_permission_cache(user_in_group, "change_page"), {})
+
+        for user in users:
+            set_permission_cache(user, "change_page", {})
+
+        PagePermission.objects.create(page=self.home_page, group=group, can_change=True)
+        self.assertEqual(get_permission_cache(self.user_normal, "change_page"), {})
+        self.assertIsNone(get_permission_cache(user_in_group, "change_page"))
+
+        # Joining a group clears the permissions of the user
+        set_permission_cache(self.user_normal, "change_page", {})
+        group.user_set.add(self.user_normal)
+        self.assertIsNone(get_permission_cache(self.user_normal, "change_page"))
+
+        # Leaving a group clears the permissions of the user only
+        for user in users:
+            set_permission_cache(user, "change_page", {})
+
+        group.user_set.remove(self.user_normal)
+        self.assertIsNone(get_permission_cache(self.user_normal, "change_page"))
+        self.assertEqual(get_permission_cache(user_in_group, "change_page"), {})
+
+    def test_group_cache_invalidation_round_trips(self):
+        group = Group.objects.create(name="editors")
+
+        for index in range(3):
+            user = self._create_user("grouped%d" % index, is_staff=True)
+            user.groups.add(group)
+            set_permission_cache(user, "change_page", {})
+
+        # The versions of all the members are bumped at once
+        with patch('django.core.cache.cache.set_many', wraps=cache.set_many) as set_many:
+            clear_group_permission_cache(group)
+        self.assertEqual(set_many.call_count, 1)
+
+        for user in group.user_set.all():
+            self.assertIsNone(get_permission_cache(user, "change_page"))
+
     def test_permission_manager(self):
         """
         Test page permission manager working on a subpage
@@ -60,8 +123,127 @@ class PermissionCacheTests(CMSTestCase):
         cached_permissions_permissions = get_permission_cache(self.user_normal,
                                                               "change_page")
         self.assertEqual(live_permissions, [page_b.id])
-        self.assertEqual(cached_permissions_permissions, live_permissions)
+        # Grants are cached as tree intervals instead of page ids
+        self.assertEqual(cached_permissions_permissions, {page_b.path: ((1, None),)})
 
         self.home_page.save()
         cached_permissions = get_permission_cache(self.user_normal, "change_page")
         self.assertIsNone(cached_permissions)
+
+    def test_permission_intervals(self):
+        """
+        Test that the grant intervals cover the same pages as the
+        expanded page ids for every grant type.
+        """
+        site = Site.objects.get_current()
+        page_b = create_page("page_b", "nav_playground.html", "en",
+                             created_by=self.user_super, published=True)
+        page_c = create_page("page_c", "nav_playground.html", "en",
+                             created_by=self.user_super, parent=page_b, published=True)
+        create_page("page_d", "nav_playground.html", "en",
+                    created_by=self.user_super, parent=page_c, published=True)
+        create_page("page_e", "nav_playground.html", "en",
+                    created_by=self.user_super, parent=page_b)
+        pages = Page.objects.order_by('path')
+
+        for grant_on, label in ACCESS_CHOICES:
+            PagePermission.objects.all().delete()
+            permission = assign_user_to_page(page_b, self.user_normal, grant_on=grant_on,
+                                             can_change=True)
+            clear_user_permission_cache(self.user_normal)
+            expected = set(self.reload(permission).get_page_ids())
+            user = self.reload(self.user_normal)
+            self.assertEqual(set(get_change_id_list(user, site)), expected)
+
+            for page in pages:
+                can_change = user_can_change_page(user, page)
+                draft_id = page.pk if page.publisher_is_draft else page.publisher_public_id
+                self.assertEqual(can_change, draft_id in expected, label)
+
+            with self.assertNumQueries(0):
+                # Checking draft pages needs no queries once
+                # the grants have been cached.
+                for page in pages:
+                    if page.publisher_is_draft:
+                        has_perm = has_generic_permission(page, user, 'change_page', site=site)
+                        self.assertEqual(has_perm, page.pk in expected, label)
+
+    def test_page_permissions_matrix(self):
+        """
+        Test the permission matrix matches the permission
+        checks done one page at a time
+        """
+        page_b = create_page("page_b", "nav_playground.html", "en",
+                             created_by=self.user_super)
+        page_c = create_page("page_c", "nav_playground.html", "en",
+                             created_by=self.user_super, parent=page_b)
+        create_page("page_d", "nav_playground.html", "en",
+                    created_by=self.user_super, parent=page_c)
+        assign_user_to_page(page_b, self.user_normal, grant_on=ACCESS_CHOICES[1][0],
+                            can_change=True, can_add=True)
+        assign_user_to_page(page_c, self.user_normal, can_change=True, can_publish=True)
+        checks = {
+            'add_page': lambda user, page: page_permissions.user_can_add_subpage(user, target=page),
+            'change_page': page_permissions.user_can_change_page,
+            'change_page_advanced_settings': page_permissions.user_can_change_page_advanced_settings,
+            'move_page': page_permissions.user_can_move_page,
+            'publish_page': page_permissions.user_can_publish_page,
+        }
+        pages = list(Page.objects.drafts().order_by('path'))
+
+        for user in (self.user_super, self.user_normal):
+            matrix = get_page_permissions_matrix(self.reload(user), pages, PAGE_TREE_ACTIONS)
+            user = self.reload(user)
+
+            for page in pages:
+                for action in PAGE_TREE_ACTIONS:
+                    self.assertEqual(matrix[page.pk][action], checks[action](user, page))
+
+    def test_load_ancestors(self):
+        """
+        Test the missing ancestors are loaded with a single query
+        """
+        page_b = create_page("page_b", "nav_playground.html", "en",
+                             created_by=self.user_super)
+        page_c = create_page("page_c", "nav_playground.html", "en",
+                             created_by=self.user_super, parent=page_b)
+        page_d = create_page("page_d", "nav_playground.html", "en",
+                             created_by=self.user_super, parent=page_c)
+        page_d = self.reload(page_d)
+
+        with self.assertNumQueries(1):
+            pages = load_ancestors([page_d])
+
+        self.assertEqual([page.pk for page in pages], [page_b.pk, page_c.pk, page_d.pk])
+        self.assertEqual([page.pk for page in page_d.ancestors_ascending], [page_c.pk, page_b.pk])
+        self.assertEqual([page.pk for page in pages[0]._cached_descendants], [page_c.pk, page_d.pk])
+
+    def test_view_restrictions_cache(self):
+        """
+        Test the view restrictions of a site are cached until
+        a view permission changes
+        """
+        page_b = create_page("page_b", "nav_playground.html", "en",
+                             created_by=self.user_super, published=True)
+        page_c = create_page("page_c", "nav_playground.html", "en",
+                             created_by=self.user_super, parent=page_b, published=True)
+        page_c_public = page_c.reload().publisher_public
+        assign_user_to_page(page_b, self.user_normal, can_view=True)
+
+        restrictions = get_view_restrictions([page_c, page_c_public])
+        self.assertEqual([perm.user_id for perm in restrictions[page_c.pk]], [self.user_normal.pk])
+
+        with self.assertNumQueries(0):
+            restrictions = get_view_restrictions([page_c, page_c_public])
+        self.assertEqual(list(restrictions), [page_c.pk])
+
+        # Changing a permission which doesn't restrict the view keeps the cache
+        assign_user_to_page(page_b, self.user_super, can_change=True)
+
+        with self.assertNumQueries(0):
+            get_view_restrictions([page_c])
+
+        assign_user_to_page(page_c, self.user_super, can_view=True, grant_on=ACCESS_CHOICES[0][0])
+        restrictions = get_view_restrictions([page_b, page_c_public])
+        self.assertEqual(len(restrictions[page_b.pk]), 1)
+        self.assertEqual(len(restrictions[page_c.pk]), 2)
@@ -3,6 +3,7 @@ from contextlib import contextmanager
 import datetime
 import json
 import pickle
+from mock import patch
 
 from cms.api import create_page
 
@@ -13,6 +14,7 @@ from django.contrib import admin
 from django.contrib.admin.widgets import FilteredSelectMultiple, RelatedFieldWidgetWrapper
 from django.core import urlresolvers
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.forms.widgets import Media
 from sekizai.context import SekizaiContext
 from django.test.testcases import TestCase
@@ -22,7 +24,7 @@ from django.utils.encoding import force_text
 from cms import api
 from cms.constants import PLUGIN_MOVE_ACTION, PLUGIN_COPY_ACTION
 from cms.exceptions import PluginAlreadyRegistered, PluginNotRegistered, DontUsePageAttributeWarning
-from cms.models import Page, Placeholder, UserSettings
+from cms.models import Page, PageSearchIndex, Placeholder, UserSettings
 from cms.models.pluginmodel import CMSPlugin
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
@@ -45,6 +47,7 @@ from cms.toolbar.toolbar import CMSToolbar
 from cms.utils.conf import get_cms_setting
 from cms.utils.copy_plugins import copy_plugins_to
 from cms.utils.i18n import force_language
+from cms.utils.page_search import DatabaseSearchBackend
 from cms.utils.plugins import get_plugins_for_page, get_plugins
 from django.utils.http import urlencode
 
@@ -793,6 +796,46 @@ class PluginsTestCase(PluginsTestBaseCase):
         self.assertEqual(Page.objects.search("hi").count(), 0)
         self.assertEqual(Page.objects.search("hello").count(), 1)
 
+    def test_search_index(self):
+        page = api.create_page("Search page", "nav_playground.html", "en", slug="lookup")
+        api.create_title("de", "Suchseite", page)
+        placeholder = page.placeholders.get(slot='body')
+        api.add_plugin(placeholder, "TextPlugin", "en", body="<p>Hello  World</p>")
+
+        index = PageSearchIndex.objects.get(page=page, language="en")
+        self.assertEqual(index.title, "search page lookup")
+        self.assertEqual(index.content, "")
+
+        # Plugins are indexed on the public page
+        page.publish('en')
+        public_index = PageSearchIndex.objects.get(page=page.publisher_public, language="en")
+        self.assertEqual(public_index.content, "hello world")
+
+        self.assertEqual(list(Page.objects.search("lookup")), [page.publisher_public])
+        self.assertEqual(list(Page.objects.search("world hello")), [page.publisher_public])
+        self.assertEqual(Page.objects.search("hello", language="de").count(), 0)
+        self.assertEqual(Page.objects.search("hello mars").count(), 0)
+
+        title = page.get_title_obj("en")
+        title.title = "Renamed"
+        title.save()
+        self.assertEqual(PageSearchIndex.objects.get(page=page, language="en").title, "renamed lookup")
+
+        page.title_set.get(language="de").delete()
+        self.assertFalse(PageSearchIndex.objects.filter(page=page, language="de").exists())
+
+    def test_search_backend_uses_fulltext_search_on_postgresql(self):
+        backend = DatabaseSearchBackend()
+        rows = PageSearchIndex.objects.all()
+
+        with patch.object(connection, 'vendor', 'postgresql'):
+            sql = force_text(backend.filter(rows, "Hello wor", ('title', 'content')).query)
+        self.assertIn("to_tsquery", sql)
+        self.assertNotIn("LIKE", sql)
+
+        sql = force_text(backend.filter(rows, "Hello wor", ('title', 'content')).query)
+        self.assertNotIn("to_tsquery", sql)
+
     def test_empty_plugin_is_not_ignored(self):
         page = api.create_page("page", "nav_playground.html", "en")
 
@@ -1124,6 +1167,35 @@ class PluginsTestCase(PluginsTestBaseCase):
             self.assertEqual(force_text(style_config['module']), expected_struct_de['module'])
             self.assertEqual(force_text(style_config['name']), expected_struct_de['name'])
 
+    def test_plugin_toolbar_struct_cache(self):
+        page = api.create_page("page", "nav_playground.html", "en", published=True)
+        placeholder = page.placeholders.get(slot='body')
+
+        from cms.utils.placeholder import get_toolbar_plugin_struct
+
+        plugins = plugin_pool.get_all_plugins()
+
+        def get_style_name():
+            toolbar_struct = get_toolbar_plugin_struct(
+                plugins=plugins,
+                slot=placeholder.slot,
+                page=page,
+            )
+            style_config = [config for config in toolbar_struct if config['value'] == 'StylePlugin']
+            return force_text(style_config[0]['name'])
+
+        self.assertEqual(get_style_name(), 'Style')
+
+        with patch('cms.utils.placeholder.get_placeholder_conf') as get_placeholder_conf:
+            self.assertEqual(get_style_name(), 'Style')
+            self.assertFalse(get_placeholder_conf.called)
+
+        conf = {'body': {'plugin_labels': {'StylePlugin': 'Box'}}}
+
+        with self.settings(CMS_PLACEHOLDER_CONF=conf):
+            self.assertEqual(get_style_name(), 'Box')
+        self.assertEqual(get_style_name(), 'Style')
+
     def test_plugin_toolbar_struct_permissions(self):
         page = self.get_permissions_test_page()
         staff_user = self.get_staff_user_with_no_permissions()
@@ -1,15 +1,20 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.urlresolvers import resolve, reverse
 from django.test import TestCase
 from django.test.utils import override_settings
 
+from mock import patch
+
 from cms.api import create_page
 from cms.models import UrlconfRevision
 from cms.signals import urls_need_reloading
 from cms.test_utils.project.sampleapp.cms_apps import SampleApp
 from cms.test_utils.util.context_managers import apphooks, signal_tester
 from cms.test_utils.testcases import CMSTestCase
+from cms.utils import apphook_reload
+from cms.utils.i18n import force_language
 
 
 class SignalTests(TestCase):
@@ -107,3 +112,88 @@ class ApphooksReloadTests(CMSTestCase):
         # And, this should result in a the updating of the UrlconfRevision
         new_revision, _ = UrlconfRevision.get_or_create_revision()
         self.assertNotEquals(current_revision, new_revision)
+
+    def test_urls_updated_incrementally(self):
+        """
+        Tests that only the urls of the changed apphooks are updated when
+        the pages that changed are known.
+        """
+        superuser = get_user_model().objects.create_superuser(
+            'admin', 'admin@admin.com', 'admin')
+        page = create_page("home", "nav_playground.html", "en",
+                           created_by=superuser, published=True)
+        apphook_reload.mark_urlconf_as_changed()
+        self.client.get('/')  # Required to invoke the middleware
+
+        with patch('cms.utils.apphook_reload.reload_urlconf') as reload_urlconf:
+            app_page = create_page("app_page", "nav_playground.html", "en",
+                                   created_by=superuser, parent=page,
+                                   published=True, apphook="SampleApp")
+            self.client.get('/')  # Marks the urls as changed when finished
+            self.client.get('/')  # Updates the urls
+            self.assertFalse(reload_urlconf.called)
+
+        with force_language('en'):
+            self.assertEqual(reverse('sample-root'), app_page.get_absolute_url('en'))
+            self.assertEqual(resolve(app_page.get_absolute_url('en')).url_name, 'sample-root')
+
+    def test_revision_check_is_cached(self):
+        """
+        Tests that checking the urls revision on every request doesn't
+        query the database.
+        """
+        from django.core.cache import cache
+
+        UrlconfRevision.get_or_create_revision()
+        cache.clear()
+        apphook_reload._global_revision.clear()
+
+        with self.assertNumQueries(1):
+            revision = apphook_reload.get_global_revision()
+
+        with self.settings(CMS_APPHOOK_RELOAD_CHECK_INTERVAL=0):
+            # Read from the cache
+            with self.assertNumQueries(0):
+                self.assertEqual(apphook_reload.get_global_revision(), revision)
+
+        new_revision = apphook_reload.mark_urlconf_as_changed()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(apphook_reload.get_global_revision(), new_revision)
+        self.assertEqual(UrlconfRevision.get_or_create_revision()[0], new_revision)
+
+    def test_changed_page_ids_across_epochs(self):
+        """
+        Tests that the changes are not compared across a lost sequence,
+        which restarts the numbering.
+        """
+        from django.core.cache import cache
+
+        old_revision = apphook_reload.mark_urlconf_as_changed(page_ids=[1])
+        revision = apphook_reload.mark_urlconf_as_changed(page_ids=[2])
+        self.assertEqual(apphook_reload.get_changed_page_ids(old_revision, revision), {2})
+
+        # The sequence is evicted
+        epoch = cache.get(apphook_reload._get_changes_epoch_key())
+        cache.delete(apphook_reload._get_changes_sequence_key(epoch))
+        apphook_reload.mark_urlconf_as_changed(page_ids=[3])
+        new_revision = apphook_reload.mark_urlconf_as_changed(page_ids=[4])
+
+        self.assertNotEqual(new_revision.split(':')[0], epoch)
+        self.assertIsNone(apphook_reload.get_changed_page_ids(old_revision, new_revision))
+
+    def test_revision_is_read_from_the_database(self):
+        """
+        Tests that a revision changed by another process is picked up
+        once the cached revision is gone, like with a per-process cache.
+        """
+        from django.core.cache import cache
+
+        apphook_reload._global_revision.clear()
+        revision = apphook_reload.get_global_revision()
+        UrlconfRevision.update_revision('other')
+
+        with self.settings(CMS_APPHOOK_RELOAD_CHECK_INTERVAL=0):
+            self.assertEqual(apphook_reload.get_global_revision(), revision)
+            cache.clear()
+            self.assertEqual(apphook_reload.get_global_revision(), 'other')
@@ -201,6 +201,35 @@ class TemplatetagDatabaseTests(TwoPagesFixture, CMSTestCase):
         request = self.get_request('/')
         self.assertRaises(TypeError, _get_page_by_untyped_arg, [], request, 1)
 
+    def test_static_page_lookups_are_resolved_together(self):
+        from django.core.cache import cache
+
+        second = self._getsecond()
+        third = create_page('third', 'nav_playground.html', 'en', published=True, reverse_id='thirdid')
+        third = third.get_public_object()
+        template = (
+            '{% load cms_tags %}'
+            '{% page_url "myreverseid" %}|{% page_url "thirdid" %}|'
+            '{% page_attribute "page_title" "thirdid" %}|{% page_url "myreverseid" %}'
+        )
+        expected = '|'.join([
+            second.get_absolute_url(),
+            third.get_absolute_url(),
+            'third',
+            second.get_absolute_url(),
+        ])
+        cache.clear()
+
+        with self.assertNumQueries(2):
+            # One query for the pages and another one for their titles
+            output = self.render_template_obj(template, {}, self.get_request('/'))
+        self.assertEqual(output, expected)
+
+        with self.assertNumQueries(2):
+            # Urls come from the cache, page_attribute fetches its page and titles
+            output = self.render_template_obj(template, {}, self.get_request('/'))
+        self.assertEqual(output, expected)
+
     def test_show_placeholder_for_page_placeholder_does_not_exist(self):
         """
         Verify ``show_placeholder`` correctly handles being given an
@@ -6,8 +6,9 @@ from django.contrib.admin.options import IS_POPUP_VAR
 from django.contrib.sites.models import Site
 from django.http import HttpResponse
 from django.template.loader import get_template
-from django.utils.encoding import smart_str
+from django.utils.encoding import force_text, smart_str
 
+from cms.constants import PUBLISHER_STATE_PENDING
 from cms.models import EmptyTitle, Title
 from cms.utils import get_language_from_request, get_language_list, get_cms_setting
 from cms.utils import page_permissions
@@ -15,6 +16,28 @@ from cms.utils import page_permissions
 
 NOT_FOUND_RESPONSE = "NotFound"
 
+# Publishing states of a page in a language, see get_page_publish_state()
+PAGE_TREE_PUBLISH_STATES = (
+    'published',
+    'dirty',
+    'unpublishedparent',
+    'unpublished',
+    'empty',
+)
+
+# Number of rows returned at once by the page tree api
+PAGE_TREE_PAGE_SIZE = 100
+PAGE_TREE_MAX_PAGE_SIZE = 1000
+
+# Permissions needed to render a row of the page tree
+PAGE_TREE_ACTIONS = (
+    'add_page',
+    'change_page',
+    'change_page_advanced_settings',
+    'move_page',
+    'publish_page',
+)
+
 
 def jsonify_request(response):
     """ Turn any response in a 200 response to let jQuery code handle it nicely.
@@ -26,38 +49,11 @@ def jsonify_request(response):
     return HttpResponse(json.dumps(content), content_type="application/json")
 
 
-def render_admin_rows(request, pages, site, filtered=False, language=None):
+def prefetch_admin_titles(pages, languages):
     """
-    Used for rendering the page tree, inserts into context everything what
-    we need for single item
+    Loads the titles of «pages» and their public versions
+    for all «languages» with a single query.
     """
-    user = request.user
-    site = Site.objects.get_current()
-    lang = get_language_from_request(request)
-    permissions_on = get_cms_setting('PERMISSION')
-
-    user_can_add = page_permissions.user_can_add_subpage
-    user_can_move = page_permissions.user_can_move_page
-    user_can_change = page_permissions.user_can_change_page
-    user_can_change_advanced_settings = page_permissions.user_can_change_page_advanced_settings
-    user_can_publish = page_permissions.user_can_publish_page
-
-    template = get_template('admin/cms/page/tree/menu.html')
-
-    if not language:
-        language = get_language_from_request(request)
-
-    filtered = filtered or request.GET.get('q')
-
-    if filtered:
-        # When the tree is filtered, it's displayed as a flat structure
-        # therefore there's no concept of open nodes.
-        open_nodes = []
-    else:
-        open_nodes = list(map(int, request.GET.getlist('openNodes[]')))
-
-    languages = get_language_list(site.pk)
-
     page_ids = []
 
     for page in pages:
@@ -76,13 +72,13 @@ def render_admin_rows(request, pages, site, filtered=False, language=None):
     for cms_title in cms_page_titles.iterator():
         cms_title_cache[cms_title.page_id][cms_title.language] = cms_title
 
-    def render_page_row(page):
+    for page in pages:
         page_cache = cms_title_cache[page.pk]
 
         for language in languages:
             page_cache.setdefault(language, EmptyTitle(language=language))
 
-        page.title_cache = cms_title_cache[page.pk]
+        page.title_cache = page_cache
 
         if page.publisher_public_id:
             publisher_cache = cms_title_cache[page.publisher_public_id]
@@ -91,7 +87,101 @@ def render_admin_rows(request, pages, site, filtered=False, language=None):
                 publisher_cache.setdefault(language, EmptyTitle(language=language))
             page.publisher_public.title_cache = publisher_cache
 
-        has_move_page_permission = user_can_move(user, page)
+
+def get_page_publish_state(page, language):
+    """
+    Returns the publishing state of «page» in «language» as displayed
+    in the page tree, one of PAGE_TREE_PUBLISH_STATES.
+    """
+    if page.is_published(language) and page.publisher_public_id and page.publisher_public.is_published(language):
+        if page.is_dirty(language):
+            return 'dirty'
+        return 'published'
+
+    if language not in page.get_languages():
+        return 'empty'
+
+    public_pending = page.publisher_public_id and page.publisher_public.get_publisher_state(
+        language) == PUBLISHER_STATE_PENDING
+
+    if public_pending or page.get_publisher_state(language) == PUBLISHER_STATE_PENDING:
+        return 'unpublishedparent'
+    return 'unpublished'
+
+
+def get_admin_tree_rows(user, pages, languages):
+    """
+    Returns the data needed to display «pages» in the page tree as a
+    list of dictionaries, one per page.
+    """
+    pages = list(pages)
+    permissions = page_permissions.get_page_permissions_matrix(
+        user,
+        pages=pages,
+        actions=PAGE_TREE_ACTIONS,
+    )
+    prefetch_admin_titles(pages, languages)
+
+    rows = []
+
+    for page in pages:
+        row = {
+            'id': page.pk,
+            'title': force_text(page.get_admin_tree_title()),
+            'depth': page.depth,
+            'has_children': page.numchild > 0,
+            'is_home': page.is_home,
+            'soft_root': page.soft_root,
+            'application_urls': page.application_urls or None,
+            'in_navigation': page.in_navigation,
+            'languages': page.get_languages(),
+            'publish_state': dict(
+                (language, get_page_publish_state(page, language))
+                for language in languages
+            ),
+            'permissions': permissions[page.pk],
+        }
+        rows.append(row)
+    return rows
+
+
+def render_admin_rows(request, pages, site, filtered=False, language=None):
+    """
+    Used for rendering the page tree, inserts into context everything what
+    we need for single item
+    """
+    user = request.user
+    site = Site.objects.get_current()
+    lang = get_language_from_request(request)
+    permissions_on = get_cms_setting('PERMISSION')
+
+    template = get_template('admin/cms/page/tree/menu.html')
+
+    if not language:
+        language = get_language_from_request(request)
+
+    filtered = filtered or request.GET.get('q')
+
+    if filtered:
+        # When the tree is filtered, it's displayed as a flat structure
+        # therefore there's no concept of open nodes.
+        open_nodes = []
+    else:
+        open_nodes = list(map(int, request.GET.getlist('openNodes[]')))
+
+    languages = get_language_list(site.pk)
+
+    pages = list(pages)
+    permissions = page_permissions.get_page_permissions_matrix(
+        user,
+        pages=pages,
+        actions=PAGE_TREE_ACTIONS,
+    )
+    prefetch_admin_titles(pages, languages)
+
+    def render_page_row(page):
+        page_perms = permissions[page.pk]
+        has_move_page_permission = page_perms['move_page']
 
         metadata = ""
 
@@ -102,10 +192,14 @@ def render_admin_rows(request, pages, site, filtered=False, language=None):
             metadata = "{" + ", ".join(map(lambda e: "%s: %s" % (e[0],
             isinstance(e[1], bool) and str(e[1]) or e[1].lower() ), md)) + "}"
 
-        if filtered:
-            children = page.children.none()
+        # The number of children is kept up to date on the page itself,
+        # only query them when they're displayed.
+        has_children = not filtered and page.numchild > 0
+
+        if has_children and page.pk in open_nodes:
+            children = page.get_children().select_related('parent', 'publisher_public', 'site')
         else:
-            children = page.get_children()
+            children = page.children.none()
 
         context = {
             'request': request,
@@ -116,11 +210,12 @@ def render_admin_rows(request, pages, site, filtered=False, language=None):
             'metadata': metadata,
             'page_languages': page.get_languages(),
             'preview_language': lang,
-            'has_add_page_permission': user_can_add(user, target=page),
-            'has_change_permission': user_can_change(user, page),
-            'has_change_advanced_settings_permission': user_can_change_advanced_settings(user, page),
-            'has_publish_permission': user_can_publish(user, page),
+            'has_add_page_permission': page_perms['add_page'],
+            'has_change_permission': page_perms['change_page'],
+            'has_change_advanced_settings_permission': page_perms['change_page_advanced_settings'],
+            'has_publish_permission': page_perms['publish_page'],
             'has_move_page_permission': has_move_page_permission,
+            'has_children': has_children,
             'children': children,
             'site_languages': languages,
             'open_nodes': open_nodes,
@@ -3,12 +3,16 @@
 from __future__ import absolute_import
 
 import sys
+import time
 import uuid
 
 from threading import local
 
 from django.conf import settings
-from django.core.urlresolvers import reverse, clear_url_caches
+from django.core.urlresolvers import (RegexURLResolver, reverse, clear_url_caches,
+                                      get_resolver)
+
+from cms.utils.conf import get_cms_setting
 
 # Py2 and Py3 compatible reload
 from imp import reload
@@ -16,6 +20,9 @@ from imp import reload
 _urlconf_revision = {}
 _urlconf_revision_threadlocal = local()
 
+# Last known global revision and the time it was read from the shared cache
+_global_revision = {}
+
 use_threadlocal = False
 
 
@@ -33,7 +40,12 @@ def ensure_urlconf_is_up_to_date():
                       global_revision, type(global_revision),
                       local_revision, type(local_revision),))
         debug_check_url('my_test_app_view')
-        reload_urlconf(new_revision=global_revision)
+        changed_page_ids = get_changed_page_ids(local_revision, global_revision)
+
+        if changed_page_ids is None:
+            reload_urlconf(new_revision=global_revision)
+        else:
+            update_urlconf(changed_page_ids, new_revision=global_revision)
         debug_check_url('my_test_app_view')
 
 
@@ -60,26 +72,184 @@ def set_local_revision(revision):
         _urlconf_revision['urlconf_revision'] = revision
 
 
+def _get_global_revision_key():
+    return get_cms_setting('CACHE_PREFIX') + 'urlconf_revision'
+
+
+def _remember_global_revision(revision):
+    _global_revision['value'] = (revision, time.time())
+
+
 def get_global_revision():
+    """
+    Returns the revision of the urlconf shared by all processes.
+
+    The database holds the revision. It's kept in the cache and remembered
+    by each process for CMS_APPHOOK_RELOAD_CHECK_INTERVAL seconds, so
+    checking it on every request is cheap. The cached value expires after
+    the same interval, so processes read the database again even when
+    the cache isn't shared between them or has lost the key.
+    """
+    from django.core.cache import cache
     from ..models import UrlconfRevision
-    revision, _ = UrlconfRevision.get_or_create_revision(
-        revision=str(uuid.uuid4()))
+
+    remembered = _global_revision.get('value')
+    interval = get_cms_setting('APPHOOK_RELOAD_CHECK_INTERVAL')
+
+    if remembered and time.time() - remembered[1] < interval:
+        return remembered[0]
+
+    key = _get_global_revision_key()
+    revision = cache.get(key)
+
+    if revision is None:
+        revision, _ = UrlconfRevision.get_or_create_revision(
+            revision=str(uuid.uuid4()))
+        cache.set(key, revision, interval)
+    _remember_global_revision(revision)
     return revision
 
 
 def set_global_revision(new_revision=None):
+    from django.core.cache import cache
     from ..models import UrlconfRevision
     if new_revision is None:
         new_revision = str(uuid.uuid4())
     UrlconfRevision.update_revision(new_revision)
+    cache.set(
+        _get_global_revision_key(),
+        new_revision,
+        get_cms_setting('APPHOOK_RELOAD_CHECK_INTERVAL'),
+    )
+    _remember_global_revision(new_revision)
+
+
+def _get_changes_epoch_key():
+    return get_cms_setting('CACHE_PREFIX') + 'urlconf_changes_epoch'
+
+
+def _get_changes_sequence_key(epoch):
+    return '{prefix}urlconf_changes:{epoch}'.format(
+        prefix=get_cms_setting('CACHE_PREFIX'),
+        epoch=epoch,
+    )
+
+
+def _get_changed_pages_key(epoch, sequence):
+    return '{prefix}urlconf_changes:{epoch}:{sequence}'.format(
+        prefix=get_cms_setting('CACHE_PREFIX'),
+        epoch=epoch,
+        sequence=sequence,
+    )
+
+
+def _get_revision_sequence(revision):
+    """
+    Returns the (epoch, sequence number) of the given «revision»,
+    or None if it wasn't made by mark_urlconf_as_changed.
+    """
+    parts = revision.split(':')
+
+    if len(parts) == 3 and parts[1].isdigit():
+        return parts[0], int(parts[1])
+    return None
+
+
+def _get_next_sequence():
+    """
+    Returns the epoch and the next number of the sequence of changes,
+    or None if the cache can't keep the sequence (dummy cache).
+
+    Numbers are only compared within an epoch. A new epoch starts when the
+    sequence is lost (evicted or flushed), so that the numbers it restarts
+    from can't be mistaken for the ones of the lost sequence.
+    """
+    from django.core.cache import cache
+
+    epoch_key = _get_changes_epoch_key()
+    epoch = cache.get(epoch_key)
+
+    if epoch:
+        try:
+            return epoch, cache.incr(_get_changes_sequence_key(epoch))
+        except ValueError:
+            # The sequence is gone
+            pass
+
+    epoch = uuid.uuid4().hex
+    sequence_key = _get_changes_sequence_key(epoch)
+    cache.set(epoch_key, epoch, None)
+    cache.add(sequence_key, 0, None)
+
+    try:
+        return epoch, cache.incr(sequence_key)
+    except ValueError:
+        return None
+
 
+def mark_urlconf_as_changed(page_ids=None):
+    """
+    Marks the urls as stale in all processes.
+
+    Every change gets a number out of a sequence kept in the cache, which is
+    part of the new revision along with the epoch of the sequence. When the
+    ids of the changed apphooked pages are known, they're recorded under
+    that number so that processes can update only the urls of those pages
+    (see get_changed_page_ids).
+    """
+    from django.core.cache import cache
 
-def mark_urlconf_as_changed():
     new_revision = str(uuid.uuid4())
+    sequence = _get_next_sequence()
+
+    if sequence is not None:
+        epoch, number = sequence
+
+        if page_ids is not None:
+            cache.set(
+                _get_changed_pages_key(epoch, number),
+                list(page_ids),
+                get_cms_setting('APPHOOK_RELOAD_CHANGES_TIMEOUT'),
+            )
+        new_revision = '{0}:{1}:{2}'.format(epoch, number, new_revision)
     set_global_revision(new_revision=new_revision)
     return new_revision
 
 
+def get_changed_page_ids(old_revision, new_revision):
+    """
+    Returns the ids of the apphooked pages changed between «old_revision»
+    and «new_revision», or None if they're not known for every change
+    in between, in which case all urls have to be reloaded.
+    """
+    from django.core.cache import cache
+
+    old_sequence = _get_revision_sequence(old_revision)
+    new_sequence = _get_revision_sequence(new_revision)
+
+    if old_sequence is None or new_sequence is None:
+        return None
+
+    epoch, old_number = old_sequence
+    new_epoch, new_number = new_sequence
+
+    if epoch != new_epoch or new_number <= old_number:
+        return None
+
+    keys = [_get_changed_pages_key(epoch, number)
+            for number in range(old_number + 1, new_number + 1)]
+    changes = cache.get_many(keys)
+
+    if len(changes) != len(keys):
+        return None
+
+    page_ids = set()
+
+    for changed_page_ids in changes.values():
+        page_ids.update(changed_page_ids)
+    return page_ids
+
+
 def reload_urlconf(urlconf=None, new_revision=None):
     from cms.appresolver import clear_app_resolvers, get_app_patterns
 
@@ -96,6 +266,58 @@ def reload_urlconf(urlconf=None, new_revision=None):
         set_local_revision(new_revision)
 
 
+def update_urlconf(page_ids, urlconf=None, new_revision=None):
+    """
+    Updates the urls of the apphooks on the pages with the given ids,
+    without reloading any module nor touching the urls of other apphooks.
+    """
+    from cms.appresolver import update_app_patterns
+
+    urlpatterns = update_app_patterns(page_ids)
+
+    if urlpatterns is None:
+        reload_urlconf(urlconf=urlconf, new_revision=new_revision)
+        return
+
+    if urlconf is None:
+        urlconf = settings.ROOT_URLCONF
+    clear_url_caches()
+    _reset_resolver_caches(get_resolver(urlconf), urlpatterns)
+    if new_revision is not None:
+        set_local_revision(new_revision)
+
+
+def _reset_resolver_caches(resolver, urlpatterns):
+    """
+    Drops the reverse lookups cached by «resolver» and the resolvers it
+    includes when they contain «urlpatterns». Returns whether «resolver»
+    contains «urlpatterns».
+    """
+    from cms.appresolver import AppRegexURLResolver
+
+    patterns = resolver.url_patterns
+    contains = patterns is urlpatterns
+
+    for pattern in patterns:
+        if isinstance(pattern, AppRegexURLResolver):
+            # Resolvers of unchanged apphooks keep their lookups
+            continue
+
+        if isinstance(pattern, RegexURLResolver):
+            contains = _reset_resolver_caches(pattern, urlpatterns) or contains
+
+    if contains:
+        for attr in ('_reverse_dict', '_namespace_dict', '_app_dict', '_callback_strs'):
+            cached = getattr(resolver, attr, None)
+
+            if cached is not None:
+                cached.clear()
+
+        if hasattr(resolver, '_populated'):
+            resolver._populated = False
+    return contains
+
+
 def debug_check_url(url_name):
     if settings.DEBUG:
         try:
@@ -48,6 +48,7 @@ DEFAULTS = {
     'PAGE_CACHE': True,
     'PLACEHOLDER_CACHE': True,
     'PLUGIN_CACHE': True,
+    'MENU_FRAGMENT_CACHE': False,
     'CACHE_PREFIX': 'cms-',
     'PLUGIN_PROCESSORS': [],
     'PLUGIN_CONTEXT_PROCESSORS': [],
@@ -66,6 +67,10 @@ DEFAULTS = {
     'TOOLBAR_HIDE': False,
     'INTERNAL_IPS': [],
     'REQUEST_IP_RESOLVER': 'cms.utils.request_ip_resolvers.default_request_ip_resolver',
+    'APPHOOK_RELOAD_CHECK_INTERVAL': 1,
+    'APPHOOK_RELOAD_CHANGES_TIMEOUT': 60 * 60,
+    'ROUTING_INDEX_TIMEOUT': 60,
+    'PAGE_SEARCH_BACKEND': 'cms.utils.page_search.DatabaseSearchBackend',
     'PAGE_WIZARD_DEFAULT_TEMPLATE': constants.TEMPLATE_INHERITANCE_MAGIC,
     'PAGE_WIZARD_CONTENT_PLUGIN': 'TextPlugin',
     'PAGE_WIZARD_CONTENT_PLUGIN_BODY': 'body',
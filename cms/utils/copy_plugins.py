@@ -1,5 +1,14 @@
 # -*- coding: utf-8 -*-
+from django.apps.registry import Apps
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import six
 from django.utils.six.moves import zip
+from treebeard.exceptions import PathOverflow
+
+
+# plugin model -> unmanaged model of its own table
+_table_models = {}
 
 
 def copy_plugins_to(old_plugins, to_placeholder,
@@ -49,3 +58,273 @@ def copy_plugins_to(old_plugins, to_placeholder,
 
     # returns information about originals and copies
     return plugins_ziplist
+
+
+def _get_tree_path(model, parent_path, depth, step):
+    path = model._get_path(parent_path, depth, step)
+
+    if len(path) != depth * model.steplen:
+        raise PathOverflow("Path Overflow from: '%s'" % parent_path)
+    return path
+
+
+def _get_table_model(table):
+    """
+    Returns an unmanaged model with the local fields of the plugin model
+    «table» only, so that the rows of its table can be inserted with
+    bulk_create(). bulk_create() refuses multi-table inherited models.
+    """
+    if table in _table_models:
+        return _table_models[table]
+
+    attrs = {
+        '__module__': table.__module__,
+        'Meta': type('Meta', (object,), {
+            'app_label': table._meta.app_label,
+            'db_table': table._meta.db_table,
+            'managed': False,
+            # Keeps the model out of the project's app registry
+            'apps': Apps(),
+        }),
+    }
+
+    for field in table._meta.local_concrete_fields:
+        if field.is_relation:
+            attrs[field.name] = models.ForeignKey(
+                field.related_model,
+                on_delete=models.DO_NOTHING,
+                to_field=field.target_field.name,
+                db_column=field.column,
+                primary_key=field.primary_key,
+                null=field.null,
+                related_name='+',
+            )
+        else:
+            attrs[field.name] = field.clone()
+    _table_models[table] = type(str('%sRow' % table.__name__), (models.Model,), attrs)
+    return _table_models[table]
+
+
+def _insert_plugin_rows(model, instances, using):
+    """
+    Inserts the rows of the plugin model tables (not the CMSPlugin table)
+    of the given «instances» of «model», with one bulk insert per table.
+    """
+    from cms.models import CMSPlugin
+
+    tables = [parent for parent in reversed(model._meta.get_parent_list())
+              if issubclass(parent, CMSPlugin) and parent is not CMSPlugin]
+    tables.append(model)
+
+    for table in tables:
+        table_model = _get_table_model(table)
+        attnames = [field.attname for field in table._meta.local_concrete_fields]
+        rows = [
+            table_model(**dict((attname, getattr(instance, attname)) for attname in attnames))
+            for instance in instances
+        ]
+        table_model._base_manager.using(using).bulk_create(rows)
+
+
+@transaction.atomic
+def bulk_copy_plugins(old_plugins, to_placeholder, to_language=None, parent_plugin_id=None):
+    """
+    Copies the trees of the given plugins to a placeholder in a language,
+    below the plugin with «parent_plugin_id» or at the root of the placeholder.
+
+    Unlike copy_plugins_to(), the paths, parents and positions of the copies
+    are computed in memory and the rows are written with bulk inserts, one
+    per tree level and plugin model table instead of several queries per
+    plugin. No model signals are sent, and post_copy() only gets the copies
+    of the plugin's own tree.
+
+    «old_plugins» must contain the descendants of each copied plugin.
+    Plugins whose parent is not in «old_plugins» become top-level plugins.
+
+    Returns a list of (new_plugin, old_plugin) tuples ordered by path,
+    like copy_plugins_to().
+    """
+    from cms.models import CMSPlugin
+    from cms.plugin_pool import plugin_pool
+
+    old_plugins = sorted(old_plugins, key=lambda plugin: plugin.path)
+    using = router.db_for_write(CMSPlugin)
+
+    if parent_plugin_id:
+        parent = CMSPlugin.objects.using(using).get(pk=parent_plugin_id)
+        last_child = parent.get_last_child()
+    else:
+        parent = None
+        last_child = CMSPlugin.get_last_root_node()
+
+    # old plugin id -> new plugin
+    new_plugins_by_id = {}
+    # new plugin path -> number of children
+    child_counts = {}
+    last_position = last_child._get_lastpos_in_path() if last_child else 0
+    root_count = 0
+
+    if parent:
+        # The copies go after the existing children of the parent
+        child_counts[parent.path] = last_position
+    else:
+        root_count = last_position
+    skipped_ids = set()
+    copied = []
+
+    for old in old_plugins:
+        try:
+            model = plugin_pool.get_plugin(old.plugin_type).model
+        except KeyError:
+            model = None
+
+        if model is None or old.parent_id in skipped_ids:
+            # The plugin type is not found anymore,
+            # the plugin and its descendants are not copied.
+            skipped_ids.add(old.pk)
+            continue
+
+        new_parent = new_plugins_by_id.get(old.parent_id, parent)
+
+        if new_parent:
+            step = child_counts.get(new_parent.path, 0) + 1
+            child_counts[new_parent.path] = step
+            path = _get_tree_path(CMSPlugin, new_parent.path, new_parent.depth + 1, step)
+        else:
+            root_count += 1
+            path = _get_tree_path(CMSPlugin, '', 1, root_count)
+
+        new_plugin = CMSPlugin(
+            placeholder=to_placeholder,
+            parent=new_parent,
+            language=to_language or old.language,
+            plugin_type=old.plugin_type,
+            position=old.position,
+            creation_date=old.creation_date,
+            path=path,
+            depth=len(path) // CMSPlugin.steplen,
+        )
+        new_plugins_by_id[old.pk] = new_plugin
+        copied.append((old, model))
+
+    if not copied:
+        return []
+
+    new_plugins = [new_plugins_by_id[old.pk] for old, model in copied]
+    levels = {}
+
+    for new_plugin in new_plugins:
+        new_plugin.numchild = child_counts.get(new_plugin.path, 0)
+        levels.setdefault(new_plugin.depth, []).append(new_plugin)
+
+    # Parents are inserted before their children,
+    # so the children know their parent's primary key.
+    for depth in sorted(levels):
+        level = levels[depth]
+
+        for new_plugin in level:
+            if new_plugin.parent:
+                new_plugin.parent_id = new_plugin.parent.pk
+
+        CMSPlugin.objects.using(using).bulk_create(level)
+
+        if level[0].pk is None:
+            # Only some databases return the primary keys
+            # of bulk inserts, the paths are unique though.
+            paths = [plugin.path for plugin in level]
+            ids_by_path = {}
+
+            for offset in range(0, len(paths), 500):
+                rows = CMSPlugin.objects.using(using).filter(path__in=paths[offset:offset + 500])
+                ids_by_path.update(rows.values_list('path', 'pk'))
+
+            for new_plugin in level:
+                new_plugin.pk = ids_by_path[new_plugin.path]
+
+        for new_plugin in level:
+            new_plugin._state.adding = False
+            new_plugin._state.db = using
+
+    if parent:
+        top_level = sum(1 for plugin in new_plugins if plugin.parent_id == parent.pk)
+        CMSPlugin.objects.using(using).filter(pk=parent.pk).update(numchild=F('numchild') + top_level)
+
+    # Copy the rows of the plugin models, one model at a time
+    old_ids_by_model = {}
+
+    for old, model in copied:
+        model = model._meta.concrete_model
+
+        if model is not CMSPlugin:
+            old_ids_by_model.setdefault(model, []).append(old.pk)
+
+    new_instances = []
+
+    for model, old_ids in old_ids_by_model.items():
+        # Plugins without a row in their model table are copied as is
+        old_instances = model.objects.using(using).in_bulk(old_ids)
+        instances = []
+
+        for old_id, old_instance in old_instances.items():
+            new_plugin = new_plugins_by_id[old_id]
+            new_instance = model(**dict(
+                (field.attname, getattr(old_instance, field.attname))
+                for field in model._meta.concrete_fields
+            ))
+
+            for field in CMSPlugin._meta.concrete_fields:
+                setattr(new_instance, field.attname, getattr(new_plugin, field.attname))
+
+            for parent_model in model._meta.get_parent_list():
+                link = model._meta.get_ancestor_link(parent_model)
+
+                if link:
+                    setattr(new_instance, link.attname, new_plugin.pk)
+            instances.append(new_instance)
+            new_instances.append((new_instance, old_instance))
+
+        _insert_plugin_rows(model, instances, using)
+
+    for new_instance, old_instance in new_instances:
+        new_instance._state.adding = False
+        new_instance._state.db = using
+        new_instance.copy_relations(old_instance)
+        # Spares a query per plugin in get_plugin_instance()
+        new_plugins_by_id[old_instance.pk]._inst = new_instance
+
+    for old, model in copied:
+        new_plugin = new_plugins_by_id[old.pk]
+
+        if model._meta.concrete_model is not CMSPlugin and not hasattr(new_plugin, '_inst'):
+            # The old plugin had no row in its model table
+            new_plugin._inst = None
+
+    plugins_ziplist = [(new_plugin, old) for (old, model), new_plugin in zip(copied, new_plugins)]
+
+    # This is needed for advanced plugins like Text Plugins that can have
+    # nested plugins and need to update their content based on the new plugins.
+    # They only get the plugins of their own tree instead of all the copied
+    # plugins, which made copying large placeholders quadratic.
+    base_post_copy = six.get_unbound_function(CMSPlugin.post_copy)
+
+    for index, (new_plugin, old_plugin) in enumerate(plugins_ziplist):
+        model = copied[index][1]
+
+        if six.get_unbound_function(model.post_copy) is base_post_copy:
+            continue
+
+        # The pairs are ordered by path, the tree of a plugin follows it
+        end = index + 1
+
+        while end < len(plugins_ziplist) and plugins_ziplist[end][0].path.startswith(new_plugin.path):
+            end += 1
+
+        new_instance = new_plugin.get_plugin_instance()[0]
+
+        if new_instance:
+            new_instance._no_reorder = True
+            new_instance.post_copy(old_plugin, plugins_ziplist[index:end])
+
+    for language in set(plugin.language for plugin in new_plugins):
+        to_placeholder.mark_as_dirty(language, clear_cache=True)
+    return plugins_ziplist
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Set based deletion of pages, translations, placeholders and plugins.
+
+Deleting through the ORM fetches every object and sends signals for each
+of them, and the cms receivers of these signals delete the placeholders
+and plugins of a page one by one. The functions below delete the rows of
+the cms models in batches instead, leaving the ORM to handle the rows of
+other models pointing at them, then run the work done by the cms receivers
+once for the whole deletion and send a single post_bulk_delete signal
+per model once the deletion is committed.
+"""
+from django.db import models, router, transaction
+from django.db.models import F
+from django.db.models.deletion import Collector
+
+# Maximum number of rows deleted by a single query
+DELETE_BATCH_SIZE = 500
+
+
+def _batches(pks):
+    pks = list(pks)
+
+    for offset in range(0, len(pks), DELETE_BATCH_SIZE):
+        yield pks[offset:offset + DELETE_BATCH_SIZE]
+
+
+def _delete_related_objects(model, pks, using, exclude=()):
+    """
+    Applies the on_delete rule of every relation to the rows of «model»
+    with the given «pks», like the ORM does. Relations from models in
+    «exclude» are handled by the caller.
+    """
+    for relation in model._meta.related_objects:
+        field = relation.field
+        related_model = relation.related_model
+
+        if related_model in exclude or field.remote_field.parent_link:
+            continue
+
+        if relation.many_to_many:
+            through = field.remote_field.through
+            lookup = '%s__in' % field.m2m_reverse_field_name()
+            through._base_manager.using(using).filter(**{lookup: pks})._raw_delete(using)
+            continue
+
+        on_delete = field.remote_field.on_delete
+
+        if on_delete is models.DO_NOTHING:
+            continue
+
+        rows = related_model._base_manager.using(using).filter(**{'%s__in' % field.name: pks})
+        collector = Collector(using=using)
+        on_delete(collector, field, rows, using)
+        collector.delete()
+
+    for field in model._meta.local_many_to_many:
+        through = field.remote_field.through
+        lookup = '%s__in' % field.m2m_field_name()
+        through._base_manager.using(using).filter(**{lookup: pks})._raw_delete(using)
+
+
+def _has_delete_receivers(model):
+    return (models.signals.pre_delete.has_listeners(model)
+            or models.signals.post_delete.has_listeners(model))
+
+
+def _send_post_bulk_delete(model, pks, using):
+    from cms.signals import post_bulk_delete
+
+    if not pks:
+        return
+
+    pk_set = set(pks)
+    # Receivers run once the deletion is committed, never if it's rolled back
+    transaction.on_commit(
+        lambda: post_bulk_delete.send(sender=model, pk_set=pk_set, using=using),
+        using=using,
+    )
+
+
+def _delete_plugins(plugins, using):
+    """
+    Deletes the given plugins, returns the deleted plugin ids
+    and the (placeholder id, language) pairs they belonged to.
+    """
+    from cms.models import CMSPlugin
+    from cms.plugin_pool import plugin_pool
+
+    rows = list(
+        plugins
+        .using(using)
+        .order_by('-depth')
+        .values_list('pk', 'plugin_type', 'parent', 'placeholder', 'language')
+    )
+    pks = [row[0] for row in rows]
+    pk_set = set(pks)
+    ids_by_model = {}
+    parents = {}
+    placeholder_languages = set()
+
+    for pk, plugin_type, parent_id, placeholder_id, language in rows:
+        try:
+            model = plugin_pool.get_plugin(plugin_type).model._meta.concrete_model
+        except KeyError:
+            # The plugin type is not found anymore
+            model = CMSPlugin
+
+        ids_by_model.setdefault(model, []).append(pk)
+        placeholder_languages.add((placeholder_id, language))
+
+        if parent_id and parent_id not in pk_set:
+            parents[parent_id] = parents.get(parent_id, 0) + 1
+
+    for model, model_pks in ids_by_model.items():
+        if model is CMSPlugin:
+            continue
+
+        if _has_delete_receivers(model):
+            # Receivers expect the usual deletion of each plugin
+            for batch in _batches(model_pks):
+                for plugin in CMSPlugin.objects.using(using).filter(pk__in=batch).order_by('-depth'):
+                    plugin._no_reorder = True
+                    plugin.delete(no_mp=True)
+            continue
+
+        tables = [model] + [parent for parent in model._meta.get_parent_list()
+                            if issubclass(parent, CMSPlugin) and parent is not CMSPlugin]
+
+        for batch in _batches(model_pks):
+            for table in tables:
+                _delete_related_objects(table, batch, using)
+                table._base_manager.using(using).filter(pk__in=batch)._raw_delete(using)
+
+    # Ordered by depth, children are deleted before their parents
+    for batch in _batches(pks):
+        _delete_related_objects(CMSPlugin, batch, using, exclude=[CMSPlugin])
+        CMSPlugin.objects.using(using).filter(pk__in=batch)._raw_delete(using)
+
+    for parent_id, count in parents.items():
+        CMSPlugin.objects.using(using).filter(pk=parent_id).update(numchild=F('numchild') - count)
+    return pks, placeholder_languages
+
+
+def delete_plugins(plugins):
+    """
+    Deletes the given plugins and their plugin model rows.
+
+    «plugins» must be a queryset of complete plugin trees, like all the
+    plugins of a placeholder in a language. The positions of the remaining
+    plugins are not updated.
+    Returns the number of deleted plugins.
+    """
+    from cms.models import CMSPlugin, Placeholder
+
+    using = router.db_for_write(CMSPlugin)
+
+    with transaction.atomic(using=using):
+        pks, placeholder_languages = _delete_plugins(plugins, using)
+        _send_post_bulk_delete(CMSPlugin, pks, using)
+
+    placeholders = Placeholder.objects.in_bulk(set(pair[0] for pair in placeholder_languages))
+
+    for placeholder_id, language in placeholder_languages:
+        if placeholder_id in placeholders:
+            placeholders[placeholder_id].mark_as_dirty(language, clear_cache=True)
+    return len(pks)
+
+
+def _delete_placeholders(placeholders, using):
+    """
+    Deletes the given placeholders and their plugins,
+    returns the deleted placeholder and plugin ids.
+    """
+    from cms.models import CMSPlugin, Placeholder
+
+    placeholder_ids = list(placeholders.using(using).values_list('pk', flat=True))
+    plugin_ids = []
+
+    for batch in _batches(placeholder_ids):
+        plugins = CMSPlugin.objects.filter(placeholder__in=batch)
+        plugin_ids.extend(_delete_plugins(plugins, using)[0])
+        _delete_related_objects(Placeholder, batch, using, exclude=[CMSPlugin])
+        Placeholder.objects.using(using).filter(pk__in=batch)._raw_delete(using)
+    return placeholder_ids, plugin_ids
+
+
+def delete_placeholders(placeholders):
+    """
+    Deletes the given placeholders and all their plugins.
+    """
+    from cms.models import CMSPlugin, Placeholder
+
+    using = router.db_for_write(Placeholder)
+
+    with transaction.atomic(using=using):
+        placeholder_ids, plugin_ids = _delete_placeholders(placeholders, using)
+        _send_post_bulk_delete(CMSPlugin, plugin_ids, using)
+        _send_post_bulk_delete(Placeholder, placeholder_ids, using)
+
+
+def delete_page_translation(page, language):
+    """
+    Deletes the title and the plugins of the given draft «page» in «language».
+    """
+    from cms.models import CMSPlugin
+
+    plugins = CMSPlugin.objects.filter(placeholder__page=page, language=language)
+
+    with transaction.atomic():
+        delete_plugins(plugins)
+        # A single title, deleted as usual to keep the
+        # languages and paths of the page up to date.
+        for title in page.title_set.filter(language=language):
+            title.delete()
+
+
+def _get_tree_roots(paths):
+    """
+    Returns the given tree paths without the ones
+    that are descendants of another one.
+    """
+    roots = []
+
+    for path in sorted(paths):
+        # Descendants directly follow their ancestor once sorted
+        if not roots or not path.startswith(roots[-1]):
+            roots.append(path)
+    return roots
+
+
+def _get_page_tree_ids(pages, using):
+    """
+    Returns the ids of the given pages, their descendants
+    and the public or draft versions of all of them.
+    """
+    from cms.models import Page
+
+    steplen = Page.steplen
+    page_ids = set()
+    # Paths of the pages whose descendants have been fetched
+    tree_paths = set()
+    paths = _get_tree_roots(page.path for page in pages)
+
+    while paths:
+        tree_paths.update(paths)
+        other_ids = set()
+
+        for batch in _batches(paths):
+            query = models.Q()
+
+            for path in batch:
+                query |= models.Q(path__startswith=path)
+
+            for pk, public_id in Page.objects.using(using).filter(query).values_list('pk', 'publisher_public'):
+                page_ids.add(pk)
+
+                if public_id:
+                    other_ids.add(public_id)
+
+        other_ids -= page_ids
+        other_paths = []
+
+        for batch in _batches(other_ids):
+            other_paths.extend(Page.objects.using(using).filter(pk__in=batch).values_list('path', flat=True))
+
+        # Skips the pages in a tree that has been fetched already
+        paths = _get_tree_roots(
+            path for path in other_paths
+            if not any(path[:end] in tree_paths for end in range(steplen, len(path) + 1, steplen))
+        )
+    return page_ids
+
+
+def delete_pages(pages):
+    """
+    Deletes the given pages with their descendants, their public versions,
+    titles, placeholders and plugins.
+    Returns the number of deleted rows and the number of deleted rows
+    per model label, like QuerySet.delete().
+    """
+    from cms.cache import invalidate_cms_page_cache
+    from cms.cache.permissions import clear_permission_cache
+    from cms.cache.routing import invalidate_routing_index
+    from cms.models import CMSPlugin, Page, Placeholder, Title
+    from cms.signals.apphook import apphook_post_delete_page_checker
+    from cms.signals.page import update_home
+    from menus.menu_pool import menu_pool
+
+    using = router.db_for_write(Page)
+    pages = list(pages)
+    page_ids = _get_page_tree_ids(pages, using)
+
+    if not page_ids:
+        return 0, {}
+
+    deleted = []
+
+    for batch in _batches(page_ids):
+        deleted.extend(
+            Page
+            .objects
+            .using(using)
+            .filter(pk__in=batch)
+            .only('pk', 'path', 'depth', 'parent', 'site', 'application_urls',
+                  'publisher_is_draft', 'publisher_public')
+        )
+    deleted.sort(key=lambda page: page.depth, reverse=True)
+    pks = [page.pk for page in deleted]
+    parents = {}
+
+    for page in deleted:
+        if page.parent_id and page.parent_id not in page_ids:
+            parents[page.parent_id] = parents.get(page.parent_id, 0) + 1
+
+    placeholder_ids = []
+    plugin_ids = []
+
+    with transaction.atomic(using=using):
+        for batch in _batches(pks):
+            placeholders = Placeholder.objects.filter(page__in=batch)
+            deleted_ids = _delete_placeholders(placeholders, using)
+            placeholder_ids.extend(deleted_ids[0])
+            plugin_ids.extend(deleted_ids[1])
+
+        title_ids = []
+
+        for batch in _batches(pks):
+            title_ids.extend(Title.objects.using(using).filter(page__in=batch).values_list('pk', flat=True))
+
+        for batch in _batches(title_ids):
+            Title.objects.using(using).filter(pk__in=batch).update(publisher_public=None)
+            _delete_related_objects(Title, batch, using, exclude=[Title])
+            Title.objects.using(using).filter(pk__in=batch)._raw_delete(using)
+
+        for batch in _batches(pks):
+            # Breaks the links between the draft and public pages
+            Page.objects.using(using).filter(pk__in=batch).update(publisher_public=None)
+
+        # Ordered by depth, children are deleted before their parents
+        for batch in _batches(pks):
+            _delete_related_objects(Page, batch, using, exclude=[Page, Title])
+            Page.objects.using(using).filter(pk__in=batch)._raw_delete(using)
+
+        for parent_id, count in parents.items():
+            Page.objects.using(using).filter(pk=parent_id).update(numchild=F('numchild') - count)
+
+        _send_post_bulk_delete(CMSPlugin, plugin_ids, using)
+        _send_post_bulk_delete(Placeholder, placeholder_ids, using)
+        _send_post_bulk_delete(Title, title_ids, using)
+        _send_post_bulk_delete(Page, pks, using)
+
+    # What the page and title receivers do for each page,
+    # once for the whole deletion.
+    for site_id in set(page.site_id for page in deleted):
+        menu_pool.clear(site_id)
+        invalidate_routing_index(site_id)
+
+    clear_permission_cache()
+
+    home_checked = set()
+
+    for page in deleted:
+        home_key = (page.site_id, page.publisher_is_draft)
+
+        if not page.parent_id and home_key not in home_checked:
+            home_checked.add(home_key)
+            update_home(page)
+        apphook_post_delete_page_checker(page)
+    invalidate_cms_page_cache()
+
+    counts = [
+        (CMSPlugin, plugin_ids),
+        (Placeholder, placeholder_ids),
+        (Title, title_ids),
+        (Page, pks),
+    ]
+    deleted_counts = dict((model._meta.label, len(ids)) for model, ids in counts if ids)
+    return sum(deleted_counts.values()), deleted_counts
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
+from django.core.urlresolvers import reverse
 from django.db.models import Q
 import re
+from cms.constants import SLUG_REGEXP
 from cms.exceptions import NoHomeFound
+from cms.utils.i18n import force_language, get_fallback_languages
 
 APPEND_TO_SLUG = "-copy"
 COPY_SLUG_REGEX = re.compile(r'^.*-copy(?:-(\d+)*)?$')
+PAGE_PATH_REGEX = re.compile(r'^%s$' % SLUG_REGEXP)
 
 
 def is_valid_page_slug(page, parent, lang, slug, site, path=None):
@@ -95,3 +99,91 @@ def check_title_slugs(page):
         title.slug = get_available_slug(title)
         if title.slug != old_slug or title.path != old_path:
             title.save()
+
+
+def get_effective_publication_window(start, end, parent_window=None):
+    """Returns the intersection of the given publication window with the
+    effective publication window of the parent page.
+    """
+    if parent_window:
+        parent_start, parent_end = parent_window
+
+        if parent_start and (not start or parent_start > start):
+            start = parent_start
+        if parent_end and (not end or parent_end < end):
+            end = parent_end
+    return start, end
+
+
+def prefetch_page_titles(pages, languages):
+    """Loads the titles in the given languages for all pages with a single
+    query and stores them in each page's title cache.
+    """
+    from cms.models import Title
+
+    pages_by_id = {}
+
+    for page in pages:
+        if not hasattr(page, 'title_cache'):
+            page.title_cache = {}
+        pages_by_id[page.pk] = page
+
+    if not pages_by_id:
+        return
+
+    titles = Title.objects.filter(page__in=list(pages_by_id), language__in=languages)
+
+    for title in titles.iterator():
+        pages_by_id[title.page_id].title_cache[title.language] = title
+
+
+def get_page_url_for_path(pages_root, path):
+    """Returns the url of the page with the given title «path», relative to
+    «pages_root» (the url of the cms root). Avoids going through the url
+    resolver for every page.
+    """
+    if not PAGE_PATH_REGEX.match(path):
+        # Let the resolver handle (or reject) unusual paths
+        return reverse('pages-details-by-slug', kwargs={"slug": path})
+
+    if settings.APPEND_SLASH:
+        return pages_root + path + '/'
+    return pages_root + path
+
+
+def get_page_urls(pages, language, fallback=True):
+    """Returns a dictionary mapping the id of each of the given pages to its
+    absolute url in «language».
+
+    Titles missing from the pages title cache are loaded with a single query.
+    """
+    pages = list(pages)
+    languages = [language]
+
+    if fallback:
+        languages.extend(get_fallback_languages(language))
+
+    missing = [
+        page for page in pages
+        if not any(lang in getattr(page, 'title_cache', {}) for lang in languages)
+    ]
+    prefetch_page_titles(missing, languages)
+
+    urls = {}
+
+    with force_language(language):
+        pages_root = reverse('pages-root')
+
+        for page in pages:
+            if page.is_home:
+                urls[page.pk] = pages_root
+                continue
+
+            title = next((page.title_cache[lang] for lang in languages if lang in page.title_cache), None)
+
+            if title is None:
+                # Page is not available in any of the requested languages
+                urls[page.pk] = page.get_absolute_url(language, fallback)
+                continue
+            urls[page.pk] = get_page_url_for_path(pages_root, title.path or title.slug)
+    return urls
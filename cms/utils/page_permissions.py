@@ -13,6 +13,8 @@ from cms.utils.permissions import (
     cached_func,
     get_model_permission_codename,
     get_page_actions_for_user,
+    get_page_ids_for_grants,
+    grants_include_page,
     has_global_permission,
 )
 
@@ -44,7 +46,7 @@ def _get_draft_placeholders(page):
     return Placeholder.objects.filter(page__pk=page.publisher_public_id)
 
 
-def _get_page_ids_for_action(user, site, action, check_global=True, use_cache=True):
+def _get_page_grants_for_action(user, site, action, check_global=True, use_cache=True):
     if user.is_superuser or not get_cms_setting('PERMISSION'):
         # got superuser, or permissions aren't enabled?
         # just return grant all mark
@@ -65,30 +67,56 @@ def _get_page_ids_for_action(user, site, action, check_global=True, use_cache=Tr
         return GRANT_ALL_PERMISSIONS
 
     page_actions = get_page_actions(user, site)
-    page_ids = list(page_actions[action])
-    set_permission_cache(user, action, page_ids)
-    return page_ids
+    grants = page_actions.get(action, {})
+    set_permission_cache(user, action, grants)
+    return grants
+
+
+def _get_page_ids_for_action(user, site, action, check_global=True, use_cache=True):
+    grants = _get_page_grants_for_action(
+        user=user,
+        site=site,
+        action=action,
+        check_global=check_global,
+        use_cache=use_cache,
+    )
+
+    if grants == GRANT_ALL_PERMISSIONS:
+        return GRANT_ALL_PERMISSIONS
+    return get_page_ids_for_grants(grants)
+
+
+def _check_permission_prerequisites(user, action):
+    """
+    Returns True or False if the permission of «user» to perform «action»
+    can be decided without looking at the page, None otherwise.
+    """
+    if not user.is_authenticated():
+        return False
+
+    if user.is_superuser:
+        return True
+
+    permissions = _django_permissions_by_action[action]
+
+    if not user.has_perms(permissions):
+        # Fail fast if the user does not have permissions
+        # in Django to perform the action.
+        return False
+
+    if not get_cms_setting('PERMISSION'):
+        return True
+    return None
 
 
 def permission_pre_checks(action):
     def decorator(func):
         @wraps(func, assigned=available_attrs(func))
         def wrapper(user, *args, **kwargs):
-            if not user.is_authenticated():
-                return False
-
-            if user.is_superuser:
-                return True
+            has_perm = _check_permission_prerequisites(user, action)
 
-            permissions = _django_permissions_by_action[action]
-
-            if not user.has_perms(permissions):
-                # Fail fast if the user does not have permissions
-                # in Django to perform the action.
-                return False
-
-            if not get_cms_setting('PERMISSION'):
-                return True
+            if has_perm is not None:
+                return has_perm
             return func(user, *args, **kwargs)
         return wrapper
     return decorator
@@ -302,13 +330,14 @@ def user_can_change_all_pages(user, site):
 
 @permission_pre_checks(action='change_page')
 def user_can_change_at_least_one_page(user, site, use_cache=True):
-    page_ids = get_change_id_list(
+    grants = _get_page_grants_for_action(
         user=user,
         site=site,
+        action='change_page',
         check_global=True,
         use_cache=use_cache,
     )
-    return page_ids == GRANT_ALL_PERMISSIONS or bool(page_ids)
+    return grants == GRANT_ALL_PERMISSIONS or bool(grants)
 
 
 @cached_func
@@ -454,23 +483,65 @@ def has_generic_permission(page, user, action, site=None, check_global=True):
     if not site:
         site = page.site
 
-    if page.publisher_is_draft:
-        page_id = page.pk
-    else:
-        page_id = page.publisher_public_id
-
-    actions_map = {
-        'add_page': get_add_id_list,
-        'change_page': get_change_id_list,
-        'change_page_advanced_settings': get_change_advanced_settings_id_list,
-        'change_page_permissions': get_change_permissions_id_list,
-        'delete_page': get_delete_id_list,
-        'delete_page_translation': get_delete_id_list,
-        'move_page': get_move_page_id_list,
-        'publish_page': get_publish_id_list,
-        'view_page': get_view_id_list,
-    }
-
-    func = actions_map[action]
-    page_ids = func(user, site, check_global=check_global)
-    return page_ids == GRANT_ALL_PERMISSIONS or page_id in page_ids
+    if action == 'delete_page_translation':
+        action = 'delete_page'
+
+    grants = _get_page_grants_for_action(
+        user=user,
+        site=site,
+        action=action,
+        check_global=check_global,
+    )
+
+    if grants == GRANT_ALL_PERMISSIONS:
+        return True
+
+    if not grants:
+        return False
+
+    # Permissions are always set on draft pages
+    page = get_page_draft(page)
+    return grants_include_page(grants, page.path, page.depth)
+
+
+def get_page_permissions_matrix(user, pages, actions):
+    """
+    Returns a map of page id -> {action: has permission} for all «pages».
+
+    The permissions of «user» for each action are looked up once,
+    then checked against every page.
+    """
+    actions = list(actions)
+    grants_by_site = {}
+    matrix = {}
+
+    def get_grants(site, action):
+        key = (site.pk, action)
+
+        if key not in grants_by_site:
+            has_perm = _check_permission_prerequisites(user, action)
+
+            if has_perm is None:
+                has_perm = _get_page_grants_for_action(
+                    user=user,
+                    site=site,
+                    action=action,
+                )
+            grants_by_site[key] = has_perm
+        return grants_by_site[key]
+
+    for page in pages:
+        row = {}
+
+        for action in actions:
+            grants = get_grants(page.site, action)
+
+            if grants is True or grants == GRANT_ALL_PERMISSIONS:
+                row[action] = True
+            elif not grants:
+                row[action] = False
+            else:
+                draft = get_page_draft(page)
+                row[action] = grants_include_page(grants, draft.path, draft.depth)
+        matrix[page.pk] = row
+    return matrix
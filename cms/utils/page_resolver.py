@@ -11,6 +11,7 @@ from django.utils.safestring import mark_safe
 from django.utils.six.moves.urllib.parse import unquote
 from django.utils.translation import ugettext_lazy as _, ungettext_lazy
 
+from cms.cache.routing import get_public_page_id_for_path
 from cms.models.pagemodel import Page
 from cms.utils.compat.dj import is_installed
 from cms.utils.moderator import use_draft
@@ -29,20 +30,23 @@ def get_page_queryset(request=None):
     return Page.objects.public()
 
 
+def _is_admin_path(path):
+    if is_installed('django.contrib.admin'):
+        return path.startswith(admin_reverse('index'))
+    return False
+
+
 def get_page_queryset_from_path(path, preview=False, draft=False, site=None):
     """ Returns a queryset of pages corresponding to the path given
     """
-    if is_installed('django.contrib.admin'):
-        admin_base = admin_reverse('index')
-
-        # Check if this is called from an admin request
-        if path.startswith(admin_base):
-            # if so, get the page ID to request it directly
-            match = ADMIN_PAGE_RE.search(path)
-            if match:
-                return Page.objects.filter(pk=match.group(1))
-            else:
-                return Page.objects.none()
+    # Check if this is called from an admin request
+    if _is_admin_path(path):
+        # if so, get the page ID to request it directly
+        match = ADMIN_PAGE_RE.search(path)
+        if match:
+            return Page.objects.filter(pk=match.group(1))
+        else:
+            return Page.objects.none()
 
     if not site:
         site = Site.objects.get_current()
@@ -72,6 +76,16 @@ def get_page_from_path(path, preview=False, draft=False):
     """ Resolves a url path to a single page object.
     Returns None if page does not exist
     """
+    if not preview and not draft and not _is_admin_path(path):
+        # Published pages are resolved through the routing index,
+        # which already accounts for the ancestors publication dates.
+        site = Site.objects.get_current()
+        page_id = get_public_page_id_for_path(path, site_id=site.pk)
+
+        if page_id is None:
+            return None
+        return Page.objects.filter(pk=page_id).first()
+
     try:
         return get_page_queryset_from_path(path, preview, draft).get()
     except Page.DoesNotExist:
@@ -122,13 +136,20 @@ def get_page_from_request(request, use_path=None):
     if draft and page and not user_can_change_page(request.user, page):
         page = get_page_from_path(path, preview, draft=False)
 
-    # For public pages we check if any parent is hidden due to published dates
-    # In this case the selected page is not reachable
-    if page and not draft:
-        ancestors = page.get_ancestors().filter(
-            Q(publication_date__gt=timezone.now()) | Q(publication_end_date__lt=timezone.now()),
+    # For previewed public pages we check if any parent is hidden due to
+    # published dates. In this case the selected page is not reachable.
+    # Published pages are checked by the routing index.
+    if page and not draft and preview and page.parent_id:
+        now = timezone.now()
+        parent_is_hidden = (
+            Page
+            .objects
+            .filter(pk=page.parent_id)
+            .filter(
+                Q(effective_publication_date__gt=now) | Q(effective_publication_end_date__lt=now),
+            )
         )
-        if ancestors.exists():
+        if parent_is_hidden.exists():
             page = None
 
     request._current_page_cache = page
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Maintains the page search index and runs queries against it.
+
+Every page has one PageSearchIndex row per language holding the normalized
+text of its title (title, menu title, page title, slug and overwritten path)
+and, for public pages, the text of the plugins defining «search_fields».
+The title text is refreshed each time a title is saved, the plugin text
+each time the page is published.
+
+Queries are run by the backend configured in CMS_PAGE_SEARCH_BACKEND.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from django.utils.encoding import force_text
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+from django.utils.translation import ugettext_lazy as _
+
+from cms.utils.conf import get_cms_setting
+
+
+def normalize_search_text(*values):
+    """
+    Joins the given «values» into a single lowercase string
+    without markup and with collapsed whitespace.
+    """
+    text = u' '.join(force_text(value) for value in values if value)
+    return re.sub(r'\s+', u' ', strip_tags(text)).strip().lower()
+
+
+def get_title_search_text(title):
+    if title.has_url_overwrite:
+        # Path segments are indexed as separate words
+        path = title.path.replace('/', ' ')
+    else:
+        # The path is made of the slugs of the ancestors,
+        # which would make every descendant match them.
+        path = ''
+    return normalize_search_text(title.title, title.menu_title, title.page_title, title.slug, path)
+
+
+def get_plugin_search_text(page, language):
+    """
+    Returns the normalized text of all plugins with «search_fields»
+    on the given «page» in «language».
+    """
+    from cms.models import CMSPlugin
+    from cms.plugin_pool import plugin_pool
+
+    plugin_types = (
+        CMSPlugin
+        .objects
+        .filter(placeholder__page=page, language=language)
+        .values_list('plugin_type', flat=True)
+        .distinct()
+    )
+    models = set()
+
+    for plugin_type in plugin_types:
+        try:
+            model = plugin_pool.get_plugin(plugin_type).model
+        except KeyError:
+            continue
+
+        if getattr(model, 'search_fields', None) and hasattr(model, 'cmsplugin_ptr'):
+            models.add(model)
+
+    values = []
+
+    for model in models:
+        rows = (
+            model
+            .objects
+            .filter(placeholder__page=page, language=language)
+            .values_list(*model.search_fields)
+        )
+
+        for row in rows:
+            values.extend(row)
+    return normalize_search_text(*values)
+
+
+def update_page_search_index(page_id, language, **fields):
+    """
+    Sets the given «fields» (title and / or content)
+    of the search index row of a page in «language».
+    """
+    from cms.models import PageSearchIndex
+
+    rows = PageSearchIndex.objects.filter(page=page_id, language=language)
+
+    if not rows.update(**fields):
+        PageSearchIndex.objects.create(page_id=page_id, language=language, **fields)
+
+
+def delete_page_search_index(page_id, language):
+    from cms.models import PageSearchIndex
+
+    PageSearchIndex.objects.filter(page=page_id, language=language).delete()
+
+
+def rebuild_page_search_index(page):
+    """
+    Indexes the titles of the given «page» and, if it's public,
+    the text of its plugins.
+    """
+    for title in page.title_set.all():
+        fields = {'title': get_title_search_text(title)}
+
+        if not page.publisher_is_draft:
+            fields['content'] = get_plugin_search_text(page, title.language)
+        update_page_search_index(page.pk, title.language, **fields)
+
+
+class DatabaseSearchBackend(object):
+    """
+    Filters a PageSearchIndex queryset down to the rows whose text «fields»
+    match every word of the user supplied «query».
+
+    Uses the full text search of PostgreSQL when available, matching every
+    word as a prefix, and falls back to matching every word as a substring
+    on the other databases. Custom backends subclass it and override filter().
+    """
+
+    def get_terms(self, query):
+        return normalize_search_text(query).split()
+
+    def filter(self, queryset, query, fields):
+        terms = self.get_terms(query)
+
+        if not terms:
+            return queryset
+
+        if connections[queryset.db].vendor == 'postgresql':
+            return self.filter_fulltext(queryset, terms, fields)
+        return self.filter_substring(queryset, terms, fields)
+
+    def filter_fulltext(self, queryset, terms, fields):
+        # Matches the expressions of the indexes
+        # created in migration 0018_pagesearchindex
+        table = queryset.model._meta.db_table
+        document = u" || ' ' || ".join(u'"%s"."%s"' % (table, field) for field in fields)
+        words = [re.sub(r'[^\w]+', u' ', term, flags=re.UNICODE).split() for term in terms]
+        tsquery = u' & '.join(u'%s:*' % word for group in words for word in group)
+
+        if not tsquery:
+            return self.filter_substring(queryset, terms, fields)
+
+        where = u"to_tsvector('simple', {0}) @@ to_tsquery('simple', %s)".format(document)
+        return queryset.extra(where=[where], params=[tsquery])
+
+    def filter_substring(self, queryset, terms, fields):
+        for term in terms:
+            condition = Q()
+
+            for field in fields:
+                condition |= Q(**{field + '__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+def get_search_backend():
+    """
+    Returns an instance of the backend configured in CMS_PAGE_SEARCH_BACKEND.
+    """
+    path = get_cms_setting('PAGE_SEARCH_BACKEND')
+
+    try:
+        backend = import_string(path)
+    except ImportError:
+        raise ImproperlyConfigured(
+            _('Unable to find the specified CMS_PAGE_SEARCH_BACKEND: '
+              '"{0}".').format(path))
+    return backend()
+
+
+def get_search_page_ids(query, language=None, content=True):
+    """
+    Returns a subquery of the ids of the pages matching «query».
+    Plugin text is only searched if «content» is True.
+    """
+    from cms.models import PageSearchIndex
+
+    rows = PageSearchIndex.objects.all()
+
+    if language:
+        rows = rows.filter(language=language)
+
+    fields = ('title', 'content') if content else ('title',)
+    rows = get_search_backend().filter(rows, query, fields)
+    return rows.values('page')
@@ -7,13 +7,15 @@ from threading import local
 from django.contrib.auth import get_permission_codename, get_user_model
 from django.contrib.auth.models import Group
 from django.contrib.sites.models import Site
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils.decorators import available_attrs
 from django.utils.lru_cache import lru_cache
 
+from cms.cache.permissions import get_view_restrictions_cache, set_view_restrictions_cache
 from cms.constants import ROOT_USER_LEVEL
 from cms.exceptions import NoPermissionsException
 from cms.models import (Page, PagePermission, GlobalPagePermission)
+from cms.models.permissionmodels import get_grant_interval
 from cms.utils.conf import get_cms_setting
 
 
@@ -167,7 +169,15 @@ def get_global_actions_for_user(user, site):
 
 @cached_func
 def get_page_actions_for_user(user, site):
-    actions = defaultdict(set)
+    """
+    Returns a map of action -> grants for all page permissions
+    of «user» on «site».
+
+    Grants are stored as {path: ((min_depth, max_depth), ...)} where
+    «path» is the path of the (draft) page a permission is set on,
+    see PagePermission.get_page_interval().
+    """
+    actions = defaultdict(dict)
     page_permissions = (
         PagePermission
         .objects
@@ -177,13 +187,51 @@ def get_page_actions_for_user(user, site):
     )
 
     for permission in page_permissions.iterator():
-        page_ids = frozenset(permission.get_page_ids())
+        path, min_depth, max_depth = permission.get_page_interval()
 
         for action in permission.get_configured_actions():
-            actions[action].update(page_ids)
+            bounds = actions[action].setdefault(path, ())
+
+            if (min_depth, max_depth) not in bounds:
+                actions[action][path] = bounds + ((min_depth, max_depth),)
     return actions
 
 
+def grants_include_page(grants, path, depth):
+    """
+    Returns True if the page with the given tree «path» and «depth»
+    is covered by «grants».
+    """
+    steplen = Page.steplen
+
+    for ancestor_depth in range(1, depth + 1):
+        bounds = grants.get(path[:ancestor_depth * steplen], ())
+
+        for min_depth, max_depth in bounds:
+            if min_depth <= depth and (max_depth is None or depth <= max_depth):
+                return True
+    return False
+
+
+def get_page_ids_for_grants(grants):
+    """
+    Returns the ids of all pages covered by «grants».
+    """
+    if not grants:
+        return []
+
+    query = Q()
+
+    for path, bounds in grants.items():
+        for min_depth, max_depth in bounds:
+            interval = Q(path__startswith=path, depth__gte=min_depth)
+
+            if max_depth is not None:
+                interval &= Q(depth__lte=max_depth)
+            query |= interval
+    return list(Page.objects.filter(query).values_list('pk', flat=True))
+
+
 def has_global_permission(user, site, action, use_cache=True):
     if use_cache:
         actions = get_global_actions_for_user(user, site)
@@ -197,7 +245,7 @@ def has_page_permission(user, page, action, use_cache=True):
         actions = get_page_actions_for_user(user, page.site)
     else:
         actions = get_page_actions_for_user.without_cache(user, page.site)
-    return page.pk in actions[action]
+    return grants_include_page(actions[action], page.path, page.depth)
 
 
 def get_subordinate_users(user, site):
@@ -304,20 +352,33 @@ def load_ancestors(pages):
     :param pages: A queryset of pages to examine
     :return: The list of pages, including ancestors
     """
-    pages_by_id = dict((page.pk, page) for page in pages)
     pages_list = list(pages)
+    pages_by_id = dict((page.pk, page) for page in pages_list)
+    loaded_paths = set(page.path for page in pages_list)
+    steplen = Page.steplen
     # Ensure that all parent pages are present so that inheritance will work
+    # The path of a page starts with the paths of all its ancestors,
+    # so the missing ones are loaded in a single query.
     # For most use cases, this should not actually do any work
-    missing = list(pages)
-    while missing:
-        page = missing.pop()
-        page.ancestors_descending = []
+    missing_paths = set(
+        page.path[:depth * steplen]
+        for page in pages_list
+        for depth in range(1, page.depth)
+    )
+    missing_paths.difference_update(loaded_paths)
+
+    if missing_paths:
+        ancestors = Page.objects.filter(path__in=missing_paths)
+
+        for ancestor in ancestors:
+            pages_list.append(ancestor)
+            pages_by_id[ancestor.pk] = ancestor
+
+    for page in pages_list:
         page._cached_descendants = []
-        if page.parent_id and page.parent_id not in pages_by_id:
-            pages_list.append(page.parent)
-            pages_by_id[page.parent_id] = page.parent
-            missing.append(page.parent)
+
     pages_list.sort(key=lambda page: page.path)
+
     for page in pages_list:
         if page.parent_id:
             parent = pages_by_id[page.parent_id]
@@ -330,6 +391,52 @@ def load_ancestors(pages):
     return pages_list
 
 
+def _build_view_restrictions(site_id):
+    """
+    Returns a map of page path -> ((min_depth, max_depth, permission), ...)
+    for all the view permissions of the given «site_id».
+
+    Each permission is indexed on both the draft and the public
+    path of its page so that pages of both trees can be checked.
+    """
+    index = {}
+    page_permissions = (
+        PagePermission
+        .objects
+        .filter(page__site=site_id, can_view=True)
+        .annotate(
+            page_path=F('page__path'),
+            page_depth=F('page__depth'),
+            public_page_path=F('page__publisher_public__path'),
+        )
+        .order_by('pk')
+    )
+
+    for perm in page_permissions:
+        path, min_depth, max_depth = get_grant_interval(
+            perm.grant_on,
+            path=perm.page_path,
+            depth=perm.page_depth,
+        )
+
+        for tree_path in filter(None, (path, perm.public_page_path)):
+            index.setdefault(tree_path, []).append((min_depth, max_depth, perm))
+    return dict((path, tuple(bounds)) for path, bounds in index.items())
+
+
+def get_site_view_restrictions(site_id):
+    """
+    Returns the (cached) view restrictions map of the given «site_id».
+    See _build_view_restrictions().
+    """
+    restrictions = get_view_restrictions_cache(site_id)
+
+    if restrictions is None:
+        restrictions = _build_view_restrictions(site_id)
+        set_view_restrictions_cache(site_id, restrictions)
+    return restrictions
+
+
 def get_view_restrictions(pages):
     """
     Load all view restrictions for the pages
@@ -343,27 +450,37 @@ def get_view_restrictions(pages):
     if not pages:
         return restricted_pages
 
-    is_public_pages = not pages[0].publisher_is_draft
+    steplen = Page.steplen
+    restrictions_by_site = {}
+    page_ids = set()
 
-    if is_public_pages:
-        # Always use draft pages!!!
-        draft_ids = (page.publisher_public_id for page in pages)
-        pages = Page.objects.filter(pk__in=draft_ids).select_related('parent')
+    for page in pages:
+        if page.site_id not in restrictions_by_site:
+            restrictions_by_site[page.site_id] = get_site_view_restrictions(page.site_id)
 
-    pages_list = load_ancestors(pages)
-    pages_by_id = dict((page.pk, page) for page in pages_list)
+        restrictions = restrictions_by_site[page.site_id]
 
-    page_permissions = PagePermission.objects.filter(
-        page__in=pages_by_id,
-        can_view=True,
-    )
+        if not restrictions:
+            continue
 
-    for perm in page_permissions:
-        # set internal fk cache to our page with loaded ancestors and descendants
-        perm._page_cache = pages_by_id[perm.page_id]
+        if page.publisher_is_draft:
+            page_id = page.pk
+        else:
+            # Always use draft pages!!!
+            page_id = page.publisher_public_id
+
+        if page_id in page_ids:
+            continue
+
+        page_ids.add(page_id)
+        depth = page.depth
+
+        for ancestor_depth in range(1, depth + 1):
+            bounds = restrictions.get(page.path[:ancestor_depth * steplen], ())
 
-        for page_id in perm.get_page_ids():
-            restricted_pages[page_id].append(perm)
+            for min_depth, max_depth, perm in bounds:
+                if min_depth <= depth and (max_depth is None or depth <= max_depth):
+                    restricted_pages[page_id].append(perm)
     return restricted_pages
 
 
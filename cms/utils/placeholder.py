@@ -11,6 +11,7 @@ from django.template.base import VariableNode
 from django.template.loader import get_template
 from django.template.loader_tags import BlockNode, ExtendsNode, IncludeNode
 from django.utils import six
+from django.utils.translation import get_language
 
 from sekizai.helpers import get_varname, is_variable_extend_node
 
@@ -20,6 +21,9 @@ from cms.utils import get_cms_setting
 
 DeclaredPlaceholder = namedtuple('DeclaredPlaceholder', ['slot', 'inherit'])
 
+# (plugin classes, slot, template, language) -> (placeholder conf, plugin struct)
+_toolbar_plugin_structs = {}
+
 
 def _get_nodelist(tpl):
     if hasattr(tpl, 'template'):
@@ -101,6 +105,17 @@ def get_toolbar_plugin_struct(plugins, slot=None, page=None):
     if page:
         template = page.template
 
+    # The struct only depends on the plugin classes and the placeholder
+    # configuration, it's built once per process for every combination.
+    # A new CMS_PLACEHOLDER_CONF setting (override_settings) is a new object.
+    plugins = tuple(plugins)
+    placeholder_conf = get_cms_setting('PLACEHOLDER_CONF')
+    cache_key = (plugins, slot, template, get_language())
+    cached = _toolbar_plugin_structs.get(cache_key)
+
+    if cached and cached[0] is placeholder_conf:
+        return [dict(item) for item in cached[1]]
+
     modules = get_placeholder_conf("plugin_modules", slot, template, default={})
     names = get_placeholder_conf("plugin_labels", slot, template, default={})
 
@@ -112,7 +127,9 @@ def get_toolbar_plugin_struct(plugins, slot=None, page=None):
         main_list.append({'value': plugin.value,
                           'name': names.get(plugin.value, plugin.name),
                           'module': modules.get(plugin.value, plugin.module)})
-    return sorted(main_list, key=operator.itemgetter("module"))
+    main_list = sorted(main_list, key=operator.itemgetter("module"))
+    _toolbar_plugin_structs[cache_key] = (placeholder_conf, main_list)
+    return [dict(item) for item in main_list]
 
 
 def validate_placeholder_name(name):
@@ -3,6 +3,7 @@ from collections import defaultdict
 from itertools import groupby, starmap
 from operator import attrgetter, itemgetter
 
+from django.db.models import Case, IntegerField, Value, When
 from django.utils.encoding import force_text
 from django.utils.six.moves import filter, filterfalse
 from django.utils.translation import ugettext as _
@@ -18,6 +19,10 @@ from cms.utils.permissions import has_plugin_permission
 from cms.utils.placeholder import (get_placeholder_conf, get_placeholders)
 
 
+# Maximum number of plugins repositioned by a single query
+REORDER_BATCH_SIZE = 250
+
+
 def get_plugins(request, placeholder, template, lang=None):
     if not placeholder:
         return []
@@ -208,16 +213,59 @@ def reorder_plugins(placeholder, parent_id, language, order):
 
     if order:
         plugins = plugins.filter(pk__in=order)
-
-        for plugin in plugins.iterator():
-            position = order.index(plugin.pk)
-            plugin.update(position=position)
     else:
-        for position, plugin in enumerate(plugins.iterator()):
-            plugin.update(position=position)
+        order = list(plugins.values_list('pk', flat=True))
+
+    positions = {}
+
+    for position, plugin_id in enumerate(order):
+        # The first occurrence wins, like list.index()
+        positions.setdefault(int(plugin_id), position)
+
+    plugin_ids = list(positions)
+
+    # Keeps the number of query parameters within the sqlite limits
+    for offset in range(0, len(plugin_ids), REORDER_BATCH_SIZE):
+        batch = plugin_ids[offset:offset + REORDER_BATCH_SIZE]
+        position = Case(
+            *[When(pk=pk, then=Value(positions[pk])) for pk in batch],
+            output_field=IntegerField()
+        )
+        plugins.filter(pk__in=batch).update(position=position)
     return plugins
 
 
+def move_plugin_tree(plugin, placeholder, language, parent=None):
+    """
+    Moves «plugin» and its descendants to «placeholder» and «language»,
+    as the last child of «parent» or as a root plugin.
+
+    The placeholder and language of the whole tree are set with one update
+    and treebeard rewrites the paths of the tree in a single statement.
+    The position of the plugin is left as is, use reorder_plugins()
+    to place it among its new siblings.
+    """
+    parent_id = parent.pk if parent else None
+
+    CMSPlugin.get_tree(plugin).update(placeholder=placeholder, language=language)
+
+    if plugin.parent_id == parent_id and parent_id:
+        # Same parent, the tree doesn't change
+        return
+
+    CMSPlugin.objects.filter(pk=plugin.pk).update(parent=parent_id)
+
+    if parent:
+        target, position = parent, 'last-child'
+    else:
+        target, position = CMSPlugin.get_last_root_node(), 'right'
+
+    if target.pk != plugin.pk:
+        # CMSPlugin.move() also computes a new position,
+        # the plain tree move is enough here.
+        super(CMSPlugin, plugin).move(target, pos=position)
+
+
 def get_plugins_for_page(request, page, lang=None):
     if not page:
         return []
@@ -17,6 +17,15 @@ class Menu(object):
         """
         raise NotImplementedError
 
+    def get_breadcrumb_nodes(self, request):
+        """
+        Can return the nodes needed to render the breadcrumb, with the
+        modifiers applied, without building the whole menu. Only used
+        when no other menu is registered, except attached menus.
+        Returns None to use the nodes of the whole menu.
+        """
+        return None
+
 
 class Modifier(object):
 
@@ -28,11 +37,28 @@ class Modifier(object):
 
 
 class NavigationNode(object):
-
-    selected = None
-    sibling = False
-    ancestor = False
-    descendant = False
+    # Menus can have many thousands of nodes, slots keep them small.
+    # Other attributes can still be set on a node (__dict__).
+    __slots__ = (
+        'children',
+        'parent',
+        'namespace',
+        'title',
+        'url',
+        'id',
+        'parent_id',
+        'parent_namespace',
+        'visible',
+        'attr',
+        'selected',
+        'sibling',
+        'ancestor',
+        'descendant',
+        # Set when the tree is built
+        'level',
+        '__dict__',
+        '__weakref__',
+    )
 
     def __init__(self, title, url, id, parent_id=None, parent_namespace=None,
                  attr=None, visible=True):
@@ -46,6 +72,10 @@ class NavigationNode(object):
         self.parent_namespace = parent_namespace
         self.visible = visible
         self.attr = attr or {} # To avoid declaring a dict in defaults...
+        self.selected = None
+        self.sibling = False
+        self.ancestor = False
+        self.descendant = False
 
     def __repr__(self):
         return "<Navigation Node: %s>" % smart_str(self.title)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import time
 import warnings
 from functools import partial
 from logging import getLogger
@@ -9,42 +10,69 @@ from django.contrib.sites.models import Site
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.urlresolvers import NoReverseMatch
+from django.utils.six.moves import intern
 from django.utils.translation import ugettext_lazy as _
 
 from cms.utils import get_cms_setting, get_language_from_request
 from cms.utils.django_load import load
+from cms.utils.i18n import get_language_list
 from cms.utils.moderator import use_draft
 
 from menus.base import Menu
 from menus.exceptions import NamespaceAlreadyRegistered
-from menus.models import CacheKey
 
 logger = getLogger('menus')
 
 
+def _get_menu_version_key(site_id=None, language=None):
+    prefix = getattr(settings, 'CMS_CACHE_PREFIX', 'menu_cache_')
+
+    if site_id is None:
+        # Shared by all sites and languages
+        return '%smenu_nodes_version' % prefix
+    return '%smenu_nodes_version_%s_%s' % (prefix, language, site_id)
+
+
+def _get_new_menu_version():
+    return int(time.time() * 1000000)
+
+
+def get_menu_version(site_id, language):
+    """
+    Returns the version of the menu nodes cached for the given
+    «site_id» and «language», explicitly setting one if not defined.
+    """
+    keys = [_get_menu_version_key(), _get_menu_version_key(site_id, language)]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if not versions.get(key):
+            cache.add(key, _get_new_menu_version(), None)
+            versions[key] = cache.get(key)
+    return '%s.%s' % (versions[keys[0]], versions[keys[1]])
+
+
+def _bump_menu_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version is not set (or has been evicted),
+        # start over from a value that was never used before.
+        cache.set(key, _get_new_menu_version(), None)
+
+
 def _build_nodes_inner_for_one_menu(nodes, menu_class_name):
     '''
     This is an easier to test "inner loop" building the menu tree structure
     for one menu (one language, one site)
     '''
     done_nodes = {}  # Dict of node.id:Node
+    # Dict of (namespace, parent_id):[Node] for the nodes
+    # whose parent hasn't been seen yet.
+    waiting_nodes = {}
     final_nodes = []
 
-    # This is to prevent infinite loops - we need to compare the number of
-    # times we see a specific node to "something", and for the time being,
-    # it's the total number of nodes
-    list_total_length = len(nodes)
-
-    while nodes:
-        # For when the node has a parent_id but we haven't seen it yet.
-        # We must not append it to the final list in this case!
-        should_add_to_final_list = True
-
-        node = nodes.pop(0)
-
-        # Increment the "seen" counter for this specific node.
-        node._counter = getattr(node, '_counter', 0) + 1
-
+    for node in nodes:
         # Implicit namespacing by menu.__name__
         if not node.namespace:
             node.namespace = menu_class_name
@@ -52,31 +80,131 @@ def _build_nodes_inner_for_one_menu(nodes, menu_class_name):
             # We need to create the namespace dict to avoid KeyErrors
             done_nodes[node.namespace] = {}
 
-        # If we have seen the parent_id already...
-        if node.parent_id in done_nodes[node.namespace]:
-            # Implicit parent namespace by menu.__name__
-            if not node.parent_namespace:
-                node.parent_namespace = menu_class_name
-            parent = done_nodes[node.namespace][node.parent_id]
-            parent.children.append(node)
-            node.parent = parent
         # If it has a parent_id but we haven't seen it yet...
-        elif node.parent_id:
-            # We check for infinite loops here, by comparing the number of
-            # times we "saw" this node to the number of nodes in the list
-            if node._counter < list_total_length:
-                nodes.append(node)
+        if node.parent_id not in done_nodes[node.namespace] and node.parent_id:
             # Never add this node to the final list until it has a real
-            # parent (node.parent)
-            should_add_to_final_list = False
+            # parent (node.parent). It's added as soon as the parent is.
+            key = (node.namespace, node.parent_id)
+            waiting_nodes.setdefault(key, []).append(node)
+            continue
+
+        # Add the node, and every node that was waiting for it (recursively)
+        to_add = [node]
+
+        while to_add:
+            node = to_add.pop()
+
+            # If we have seen the parent_id already...
+            if node.parent_id in done_nodes[node.namespace]:
+                # Implicit parent namespace by menu.__name__
+                if not node.parent_namespace:
+                    node.parent_namespace = menu_class_name
+                parent = done_nodes[node.namespace][node.parent_id]
+                parent.children.append(node)
+                node.parent = parent
+                node.level = parent.level + 1
+            else:
+                node.level = 0
 
-        if should_add_to_final_list:
             final_nodes.append(node)
             # add it to the "seen" list
             done_nodes[node.namespace][node.id] = node
+            children = waiting_nodes.pop((node.namespace, node.id), [])
+            # Keep the children in the order they were given
+            to_add.extend(reversed(children))
+    # Nodes left waiting have a non-existing parent or are part
+    # of a loop, they can't be attached to the tree.
     return final_nodes
 
 
+def _get_node_fields(node_class):
+    fields = []
+
+    for cls in reversed(node_class.__mro__):
+        for name in cls.__dict__.get('__slots__', ()):
+            if name not in ('children', 'parent', 'attr', '__dict__', '__weakref__'):
+                fields.append(name)
+    return tuple(fields)
+
+
+def _dump_nodes(nodes):
+    """
+    Returns a flat representation of the given nodes for the cache.
+
+    Nodes with the same class, set fields and attr keys share a shape:
+        (node class, field names, attr keys)
+    Each node is then stored as a row:
+        (shape index, parent index, field and attr values, other attributes)
+    The parent index is the position of the parent in nodes, -1 for root nodes.
+    """
+    node_fields = {}
+    shapes = []
+    shape_indexes = {}
+    node_indexes = {}
+    rows = []
+
+    for index, node in enumerate(nodes):
+        node_class = node.__class__
+
+        if node_class not in node_fields:
+            node_fields[node_class] = _get_node_fields(node_class)
+
+        fields = tuple(name for name in node_fields[node_class] if hasattr(node, name))
+        attr_keys = tuple(node.attr)
+        shape = (node_class, fields, attr_keys)
+
+        if shape not in shape_indexes:
+            shape_indexes[shape] = len(shapes)
+            shapes.append(shape)
+
+        values = tuple(getattr(node, name) for name in fields)
+        values += tuple(node.attr.values())
+        parent_index = node_indexes.get(id(node.parent), -1)
+        rows.append((shape_indexes[shape], parent_index, values, dict(node.__dict__) or None))
+        node_indexes[id(node)] = index
+    return (tuple(shapes), tuple(rows))
+
+
+def _intern_key(key):
+    # Nodes share the same few attr keys
+    if isinstance(key, str):
+        return intern(key)
+    return key
+
+
+def _load_nodes(data):
+    """
+    Returns the nodes from the representation built by _dump_nodes().
+    """
+    shapes, rows = data
+    shapes = [
+        (node_class, fields, len(fields), tuple(_intern_key(key) for key in attr_keys))
+        for node_class, fields, attr_keys in shapes
+    ]
+    nodes = []
+
+    for shape_index, parent_index, values, extra in rows:
+        node_class, fields, field_count, attr_keys = shapes[shape_index]
+        node = node_class.__new__(node_class)
+
+        for name, value in zip(fields, values):
+            setattr(node, name, value)
+
+        node.attr = dict(zip(attr_keys, values[field_count:]))
+        node.children = []
+
+        if parent_index == -1:
+            node.parent = None
+        else:
+            node.parent = nodes[parent_index]
+            node.parent.children.append(node)
+
+        if extra:
+            node.__dict__.update(extra)
+        nodes.append(node)
+    return nodes
+
+
 def _get_menu_class_for_instance(menu_class, instance):
     """
     Returns a new menu class that subclasses
@@ -112,31 +240,23 @@ class MenuRenderer(object):
 
         prefix = getattr(settings, 'CMS_CACHE_PREFIX', 'menu_cache_')
 
+        # The nodes are shared by all users.
+        # Modifiers take care of what each user can see.
         key = '%smenu_nodes_%s_%s' % (prefix, self.language, site_id)
 
-        if self.request.user.is_authenticated():
-            key += '_%s_user' % self.request.user.pk
-
         if self.draft_mode_active:
             key += ':draft'
         else:
             key += ':public'
         return key
 
-    def _is_cached(self, site_id):
-        # This internal will change to a cached property on 3.5
-
-        _internal_cache = '_is_cached_{}'.format(site_id)
+    def _get_version(self, site_id):
+        # The version is looked up once per renderer (request)
+        # so that all menus in a page are built from the same nodes.
+        _internal_cache = '_menu_version_{}'.format(site_id)
 
         if not hasattr(self, _internal_cache):
-            cache_key = self._get_cache_key(site_id=site_id)
-            db_cache_key_lookup = CacheKey.objects.filter(
-                key=cache_key,
-                language=self.language,
-                site=site_id,
-            )
-            # Cache the lookup to avoid a query on every call to a menu tag
-            setattr(self, _internal_cache, db_cache_key_lookup.exists())
+            setattr(self, _internal_cache, get_menu_version(site_id, self.language))
         return getattr(self, _internal_cache)
 
     def _build_nodes(self, site_id):
@@ -154,7 +274,7 @@ class MenuRenderer(object):
             if it's found:
                 set the node as the node's parent's child (re-read this)
             else:
-                the node is put at the bottom of the list
+                the node waits for its parent and is added right after it
         """
         if site_id:
             warnings.warn(
@@ -166,14 +286,21 @@ class MenuRenderer(object):
             site_id = self.site.pk
 
         key = self._get_cache_key(site_id)
+        # Clearing the menu bumps the version,
+        # nodes cached for an older version are never read again.
+        version = self._get_version(site_id)
+
+        # The flat representation of the nodes is immutable, it's kept
+        # for the other menus rendered in the same request.
+        _internal_cache = '_nodes_data_{}'.format(site_id)
+        cached_data = getattr(self, _internal_cache, None)
 
-        cached_nodes = cache.get(key, None)
+        if cached_data is None:
+            cached_data = cache.get(key, None, version=version)
 
-        if cached_nodes and self._is_cached(site_id):
-            # Only use the cache if the key is present in the database.
-            # This prevents a condition where keys which have been removed
-            # from the database due to a change in content, are still used.
-            return cached_nodes
+        if cached_data:
+            setattr(self, _internal_cache, cached_data)
+            return _load_nodes(cached_data)
 
         final_nodes = []
         toolbar = getattr(self.request, 'toolbar', None)
@@ -197,18 +324,14 @@ class MenuRenderer(object):
             # nodes is a list of navigation nodes (page tree in cms + others)
             final_nodes += _build_nodes_inner_for_one_menu(nodes, menu_class_name)
 
-        cache.set(key, final_nodes, get_cms_setting('CACHE_DURATIONS')['menus'])
-
-        if not self._is_cached(site_id):
-            # No need to invalidate the internal lookup cache,
-            # just set the value directly.
-            setattr(self, '_is_cached_{}'.format(site_id), True)
-            # We need to have a list of the cache keys for languages and sites that
-            # span several processes - so we follow the Django way and share through
-            # the database. It's still cheaper than recomputing every time!
-            # This way we can selectively invalidate per-site and per-language,
-            # since the cache is shared but the keys aren't
-            CacheKey.objects.create(key=key, language=self.language, site=site_id)
+        cached_data = _dump_nodes(final_nodes)
+        cache.set(
+            key,
+            cached_data,
+            get_cms_setting('CACHE_DURATIONS')['menus'],
+            version=version,
+        )
+        setattr(self, _internal_cache, cached_data)
         return final_nodes
 
     def _mark_selected(self, nodes):
@@ -247,6 +370,25 @@ class MenuRenderer(object):
         )
         return nodes
 
+    def get_breadcrumb_nodes(self):
+        """
+        Returns the nodes needed to render the breadcrumb.
+
+        When a single menu is registered, besides attached menus
+        (which fall back on the whole menu themselves), it can provide
+        the nodes without building the whole menu.
+        """
+        menu_names = [name for name, menu_cls in self.menus.items()
+                      if not hasattr(menu_cls, 'get_instances')]
+        nodes = None
+
+        if len(menu_names) == 1:
+            nodes = self.get_menu(menu_names[0]).get_breadcrumb_nodes(self.request)
+
+        if nodes is None:
+            nodes = self.get_nodes(breadcrumb=True)
+        return nodes
+
     def get_menu(self, menu_name):
         MenuClass = self.menus[menu_name]
         return MenuClass(renderer=self)
@@ -331,16 +473,23 @@ class MenuPool(object):
         '''
         This invalidates the cache for a given menu (site_id and language)
         '''
-        if all:
-            cache_keys = CacheKey.objects.get_keys()
+        if all or (not site_id and not language):
+            _bump_menu_version(_get_menu_version_key())
+            return
+
+        if site_id:
+            site_ids = [site_id]
         else:
-            cache_keys = CacheKey.objects.get_keys(site_id, language)
+            site_ids = Site.objects.values_list('pk', flat=True)
 
-        to_be_deleted = cache_keys.distinct().values_list('key', flat=True)
+        for site_id in site_ids:
+            if language:
+                languages = [language]
+            else:
+                languages = get_language_list(site_id)
 
-        if to_be_deleted:
-            cache.delete_many(to_be_deleted)
-            cache_keys.delete()
+            for lang in languages:
+                _bump_menu_version(_get_menu_version_key(site_id, lang))
 
     def register_menu(self, menu_cls):
         import warnings
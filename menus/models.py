@@ -25,6 +25,9 @@ class CacheKey(models.Model):
     Multiple Django instances will then share the keys.
     This allows for selective invalidation of the menu trees (per site, per
     language), in the cache.
+
+    Deprecated: the menu cache is versioned in the cache itself
+    and no longer uses this model.
     '''
     language = models.CharField(max_length=255)
     site = models.PositiveIntegerField()
@@ -13,37 +13,29 @@ class Marker(Modifier):
     def modify(self, request, nodes, namespace, root_id, post_cut, breadcrumb):
         if post_cut or breadcrumb:
             return nodes
-        selected = None
+        selected_nodes = []
         root_nodes = []
         for node in nodes:
-            if not hasattr(node, "descendant"):
-                node.descendant = False
-            if not hasattr(node, "ancestor"):
-                node.ancestor = False
             if not node.parent:
-                if selected and not selected.parent:
-                    node.sibling = True
                 root_nodes.append(node)
             if node.selected:
-                if node.parent:
-                    newnode = node
-                    while newnode.parent:
-                        newnode = newnode.parent
-                        newnode.ancestor = True
-                    for sibling in node.parent.children:
-                        if not sibling.selected:
-                            sibling.sibling = True
-                else:
-                    for root_node in root_nodes:
-                        if not root_node.selected:
-                            root_node.sibling = True
-                if node.children:
-                    self.mark_descendants(node.children)
-                selected = node
-            if node.children:
-                node.is_leaf_node = False
+                selected_nodes.append(node)
+            node.is_leaf_node = not node.children
+
+        # Only the nodes around the selected ones need to be marked
+        for node in selected_nodes:
+            if node.parent:
+                newnode = node
+                while newnode.parent:
+                    newnode = newnode.parent
+                    newnode.ancestor = True
+                siblings = node.parent.children
             else:
-                node.is_leaf_node = True
+                siblings = root_nodes
+            for sibling in siblings:
+                if not sibling.selected:
+                    sibling.sibling = True
+            self.mark_descendants(node.children)
         return nodes
 
     def mark_descendants(self, nodes):
@@ -62,15 +54,28 @@ class Level(Modifier):
     def modify(self, request, nodes, namespace, root_id, post_cut, breadcrumb):
         if breadcrumb:
             return nodes
+        if post_cut:
+            for node in nodes:
+                if not node.parent:
+                    node.menu_level = 0
+                    self.mark_levels(node, post_cut)
+            return nodes
+
+        # The levels are set when the tree is built, only the nodes
+        # moved by other modifiers (nav extenders, soft roots) are marked again.
         for node in nodes:
+            if node.parent:
+                parent_level = getattr(node.parent, 'level', None)
 
-            if not node.parent:
-                if post_cut:
-                    node.menu_level = 0
-                else:
-                    node.level = 0
-                self.mark_levels(node, post_cut)
+                if parent_level is None:
+                    continue
+                level = parent_level + 1
+            else:
+                level = 0
 
+            if getattr(node, 'level', None) != level:
+                node.level = level
+                self.mark_levels(node, post_cut)
         return nodes
 
 
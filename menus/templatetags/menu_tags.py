@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
+import hashlib
+
 from classytags.arguments import IntegerArgument, Argument, StringArgument
 from classytags.core import Options
 from classytags.helpers import InclusionTag
+from cms.utils import get_cms_setting, get_language_from_request
 from cms.utils.i18n import force_language, get_language_objects
+from cms.utils.moderator import use_draft
 from django import template
+from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.urlresolvers import reverse, NoReverseMatch
-from django.utils.encoding import force_text
+from django.utils.encoding import force_text, iri_to_uri
 from django.utils.six.moves.urllib.parse import unquote
 from django.utils.translation import get_language, ugettext
-from menus.menu_pool import menu_pool
+from menus.menu_pool import menu_pool, get_menu_version
 from menus.utils import DefaultLanguageChanger
 
 
@@ -29,21 +35,29 @@ def cut_after(node, levels, removed):
         node.children = []
     else:
         removed_local = []
+        visible = []
         for child in node.children:
             if child.visible:
                 cut_after(child, levels - 1, removed)
+                visible.append(child)
             else:
                 removed_local.append(child)
-        for removed_child in removed_local:
-            node.children.remove(removed_child)
+        if removed_local:
+            node.children[:] = visible
         removed.extend(removed_local)
 
 
-def remove(node, removed):
-    removed.append(node)
+def _detach(node, detached):
+    """
+    Marks the node to be removed from the children of its parent.
+    Children are filtered once per parent instead of once per node.
+    """
     if node.parent:
-        if node in node.parent.children:
-            node.parent.children.remove(node)
+        parent_id = id(node.parent)
+
+        if parent_id not in detached:
+            detached[parent_id] = (node.parent, set())
+        detached[parent_id][1].add(id(node))
 
 
 def cut_levels(nodes, from_level, to_level, extra_inactive, extra_active):
@@ -52,11 +66,13 @@ def cut_levels(nodes, from_level, to_level, extra_inactive, extra_active):
     """
     final = []
     removed = []
+    detached = {}
     selected = None
     for node in nodes:
         if not hasattr(node, 'level'):
             # remove and ignore nodes that don't have level information
-            remove(node, removed)
+            removed.append(node)
+            _detach(node, detached)
             continue
         if node.level == from_level:
             # turn nodes that are on from_level into root nodes
@@ -69,17 +85,20 @@ def cut_levels(nodes, from_level, to_level, extra_inactive, extra_active):
         if node.level > to_level and node.parent:
             # remove nodes that are too deep, but not nodes that are on
             # from_level (local root nodes)
-            remove(node, removed)
+            removed.append(node)
+            _detach(node, detached)
         if node.selected:
             selected = node
         if not node.visible:
-            remove(node, removed)
+            removed.append(node)
+            _detach(node, detached)
+    for parent, child_ids in detached.values():
+        parent.children[:] = [child for child in parent.children if id(child) not in child_ids]
     if selected:
         cut_after(selected, extra_active, removed)
     if removed:
-        for node in removed:
-            if node in final:
-                final.remove(node)
+        removed_ids = set(id(node) for node in removed)
+        final = [node for node in final if id(node) not in removed_ids]
     return final
 
 
@@ -91,7 +110,67 @@ def flatten(nodes):
     return flat
 
 
-class ShowMenu(InclusionTag):
+class MenuFragmentCacheMixin(object):
+    """
+    Caches the rendered menu for anonymous users when
+    CMS_MENU_FRAGMENT_CACHE is enabled.
+
+    The output is cached per site, language, selected page (and path)
+    and tag arguments, under the version of the menu nodes so that
+    clearing the menu clears the rendered fragments as well.
+    """
+
+    def get_fragment_cache_key(self, context, **kwargs):
+        request = context.get('request')
+
+        if request is None or not get_cms_setting('MENU_FRAGMENT_CACHE'):
+            return None
+
+        user = getattr(request, 'user', None)
+
+        if user and user.is_authenticated():
+            # The menu depends on the user's permissions
+            return None
+
+        if use_draft(request):
+            return None
+
+        current_page = getattr(request, 'current_page', None)
+        arguments = sorted((key, force_text(value)) for key, value in kwargs.items())
+        fragment = '%s:%s:%s:%s' % (
+            self.name,
+            getattr(current_page, 'pk', None),
+            iri_to_uri(request.path),
+            arguments,
+        )
+        return '%smenu_fragment_%s_%s_%s' % (
+            getattr(settings, 'CMS_CACHE_PREFIX', 'menu_cache_'),
+            get_language_from_request(request),
+            Site.objects.get_current(request).pk,
+            hashlib.sha1(fragment.encode('utf-8')).hexdigest(),
+        )
+
+    def render_tag(self, context, **kwargs):
+        cache_key = self.get_fragment_cache_key(context, **kwargs)
+
+        if not cache_key:
+            return super(MenuFragmentCacheMixin, self).render_tag(context, **kwargs)
+
+        request = context['request']
+        version = get_menu_version(
+            site_id=Site.objects.get_current(request).pk,
+            language=get_language_from_request(request),
+        )
+        output = cache.get(cache_key, version=version)
+
+        if output is None:
+            output = super(MenuFragmentCacheMixin, self).render_tag(context, **kwargs)
+            duration = get_cms_setting('CACHE_DURATIONS')['menus']
+            cache.set(cache_key, output, duration, version=version)
+        return output
+
+
+class ShowMenu(MenuFragmentCacheMixin, InclusionTag):
     """
     render a nested list of all children of the pages
     - from_level: starting level
@@ -116,6 +195,12 @@ class ShowMenu(InclusionTag):
         Argument('next_page', default=None, required=False),
     )
 
+    def get_fragment_cache_key(self, context, **kwargs):
+        if kwargs.get('next_page'):
+            # Nested menus are cached with the menu they belong to
+            return None
+        return super(ShowMenu, self).get_fragment_cache_key(context, **kwargs)
+
     def get_context(self, context, from_level, to_level, extra_inactive,
                     extra_active, template, namespace, root_id, next_page):
         try:
@@ -182,7 +267,7 @@ class ShowMenuBelowId(ShowMenu):
 register.tag(ShowMenuBelowId)
 
 
-class ShowSubMenu(InclusionTag):
+class ShowSubMenu(MenuFragmentCacheMixin, InclusionTag):
     """
     show the sub menu of the current nav-node.
     - levels: how many levels deep
@@ -257,7 +342,7 @@ class ShowSubMenu(InclusionTag):
 register.tag(ShowSubMenu)
 
 
-class ShowBreadcrumb(InclusionTag):
+class ShowBreadcrumb(MenuFragmentCacheMixin, InclusionTag):
     """
     Shows the breadcrumb from the node that has the same url as the current request
 
@@ -294,7 +379,7 @@ class ShowBreadcrumb(InclusionTag):
         if not menu_renderer:
             menu_renderer = menu_pool.get_renderer(request)
 
-        nodes = menu_renderer.get_nodes(breadcrumb=True)
+        nodes = menu_renderer.get_breadcrumb_nodes()
 
         # Find home
         home = None